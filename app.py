@@ -1,7 +1,9 @@
 import os
+import json
 import requests
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from dotenv import load_dotenv
+from src.utils import http_client
 
 load_dotenv()
 
@@ -30,7 +32,8 @@ def create_app():
     @app.route("/query", methods=["POST"])
     def query():
         """
-        Proxy endpoint: forwards the user's query to the FastAPI backend and returns the answer.
+        Proxy endpoint: forwards the user's query to the FastAPI streaming endpoint
+        and relays its Server-Sent Events to the browser chunk by chunk.
         """
         data = request.get_json(silent=True) or {}
         user_query = (data.get("query") or "").strip()
@@ -39,28 +42,92 @@ def create_app():
             return jsonify({"error": "Query cannot be empty."}), 400
 
         try:
-            resp = requests.post(
-                f"{app.config['BACKEND_URL'].rstrip('/')}/query",
+            # Shared keep-alive pool; a POST is only retried if it could not connect
+            resp = http_client.request(
+                "POST",
+                f"{app.config['BACKEND_URL'].rstrip('/')}/query/stream",
                 json={"query": user_query},
-                timeout=60,
+                stream=True,
+                # (connect, read) - the read timeout applies between chunks, not to the whole answer
+                timeout=(10, 60),
             )
         except requests.RequestException as e:
             return jsonify({"error": f"Failed to reach backend: {e}"}), 502
 
         if resp.status_code != 200:
-            # Bubble up backend error text
+            # Bubble up backend error text (and its Retry-After hint when overloaded)
+            headers = {"Retry-After": resp.headers["Retry-After"]} if "Retry-After" in resp.headers else {}
             try:
-                return jsonify({"error": resp.json().get("detail", resp.text)}), resp.status_code
+                return jsonify({"error": resp.json().get("detail", resp.text)}), resp.status_code, headers
             except Exception:
-                return jsonify({"error": resp.text}), resp.status_code
+                return jsonify({"error": resp.text}), resp.status_code, headers
+            finally:
+                resp.close()
 
+        def relay():
+            try:
+                for chunk in resp.iter_content(chunk_size=None):
+                    if chunk:
+                        yield chunk
+            except requests.RequestException as e:
+                yield f"event: error\ndata: {json.dumps({'detail': f'Backend stream failed: {e}'})}\n\n"
+            finally:
+                resp.close()
+
+        return Response(
+            stream_with_context(relay()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def _relay_json(resp):
+        """Return a backend JSON response (or its error text) with the same status."""
         try:
             payload = resp.json()
         except Exception:
             return jsonify({"error": "Invalid JSON from backend."}), 502
+        if resp.status_code >= 400:
+            headers = {"Retry-After": resp.headers["Retry-After"]} if "Retry-After" in resp.headers else {}
+            return jsonify({"error": payload.get("detail", resp.text)}), resp.status_code, headers
+        return jsonify(payload), resp.status_code
+
+    @app.route("/jobs", methods=["POST"])
+    def submit_job():
+        """
+        Proxy endpoint: submits the user's query as a background job and returns its id
+        immediately, so no connection is held open while the plan is generated.
+        """
+        data = request.get_json(silent=True) or {}
+        user_query = (data.get("query") or "").strip()
 
-        answer = payload.get("answer", "No answer returned.")
-        return jsonify({"answer": answer}), 200
+        if not user_query:
+            return jsonify({"error": "Query cannot be empty."}), 400
+
+        try:
+            resp = http_client.request(
+                "POST",
+                f"{app.config['BACKEND_URL'].rstrip('/')}/jobs",
+                json={"query": user_query},
+                timeout=10,
+            )
+        except requests.RequestException as e:
+            return jsonify({"error": f"Failed to reach backend: {e}"}), 502
+        return _relay_json(resp)
+
+    @app.route("/jobs/<job_id>", methods=["GET"])
+    def get_job(job_id):
+        """
+        Proxy endpoint: returns the status (and answer once finished) of a job.
+        """
+        try:
+            resp = http_client.request(
+                "GET",
+                f"{app.config['BACKEND_URL'].rstrip('/')}/jobs/{job_id}",
+                timeout=10,
+            )
+        except requests.RequestException as e:
+            return jsonify({"error": f"Failed to reach backend: {e}"}), 502
+        return _relay_json(resp)
 
     return app
 
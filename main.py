@@ -1,22 +1,396 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import importlib.metadata
+import json
+import os
+import secrets
+import time
+import weakref
+from collections import Counter
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import List, Optional, Tuple
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from pydantic import BaseModel
 from src.agent.agentic_workflow import GraphBuilder
 from src.logger import logger
 from src.exception import CustomException
-import os
+from src.utils.metrics import metrics
+from src.utils.models import ConfigLoader
+from src.utils.http_client import aclose_async_client
+from src.utils.single_flight import SingleFlight, normalize_query
+from src.utils.response_cache import ResponseCache
+from src.utils.admission import AdmissionController, AdmissionRejected
+from src.utils.deadline import DeadlineExceeded, deadline_scope
+from src.utils.job_store import JobStore, JobWorkerPool
+from src.utils.shared_resources import SharedResources
+
+
+def save_graph_image(travel_agent, path: str = "graph.png") -> None:
+    """
+    Save the execution graph as a PNG for debugging/visualization (once).
+    """
+    try:
+        if not os.path.exists(path):
+            png_graph = travel_agent.get_graph().draw_mermaid_png()
+            with open(path, "wb") as f:
+                f.write(png_graph)
+            logger.info(f"Execution graph saved as {path}")
+        else:
+            logger.info("Execution graph already exists, skipping save.")
+    except Exception as e:
+        logger.warning(f"Failed to save execution graph: {e}")
+
+
+async def load_travel_agent(app: FastAPI) -> dict:
+    """
+    Build the LLM client, tools and compiled graph, then publish them on `app.state`.
+
+    The compiled graph keeps no per-run state, so one instance is shared by
+    every request. Swapping `app.state.travel_agent` is atomic: requests that
+    already picked up the previous graph finish on it undisturbed, and the
+    previous builder is closed once they are over. Caches and stores come
+    from `app.state.shared_resources`, so a rebuild reuses the warm ones.
+
+    Returns
+    -------
+    dict
+        Startup latency breakdown in milliseconds.
+    """
+    started = time.perf_counter()
+    graph_builder = await asyncio.to_thread(GraphBuilder, resources=app.state.shared_resources)
+    try:
+        travel_agent = await asyncio.to_thread(graph_builder)
+        session_graph = None
+        if app.state.checkpointer is not None:
+            session_graph = await asyncio.to_thread(graph_builder.build_graph, app.state.checkpointer)
+    except BaseException:
+        graph_builder.close()
+        raise
+
+    timings = {name: round(value, 2) for name, value in graph_builder.timings.items()}
+    timings["total_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    previous = getattr(app.state, "graph_builder", None)
+    app.state.graph_builder = graph_builder
+    app.state.travel_agent = travel_agent
+    app.state.session_agent = session_graph
+    app.state.startup_timings = timings
+    if previous is not None:
+        task = asyncio.create_task(retire_graph_builder(app, previous))
+        app.state.retiring.add(task)
+        task.add_done_callback(app.state.retiring.discard)
+    metrics.incr("agent.builds")
+    logger.info(f"Travel agent graph ready: {timings}")
+    return timings
+
+
+def pick_agent(app: FastAPI, session: bool = False):
+    """
+    The current builder and its graph (the session graph with `session`) for
+    one run. The builder is not closed by a reload before `drop_agent`.
+    """
+    graph_builder = app.state.graph_builder
+    graph = session_agent(app) if session else app.state.travel_agent
+    app.state.agent_runs[graph_builder] += 1
+    return graph_builder, graph
+
+
+def drop_agent(app: FastAPI, graph_builder: GraphBuilder) -> None:
+    """End a run started with `pick_agent`."""
+    app.state.agent_runs[graph_builder] -= 1
+    if app.state.agent_runs[graph_builder] <= 0:
+        del app.state.agent_runs[graph_builder]
+
+
+@contextmanager
+def agent_run(app: FastAPI, session: bool = False):
+    """`pick_agent` / `drop_agent` around a block; yields the graph."""
+    graph_builder, graph = pick_agent(app, session)
+    try:
+        yield graph
+    finally:
+        drop_agent(app, graph_builder)
+
+
+async def retire_graph_builder(app: FastAPI, graph_builder: GraphBuilder) -> None:
+    """
+    Close a replaced builder once the runs that picked it up are over, or
+    when they have outlived their deadline by a minute.
+    """
+    give_up = time.monotonic() + (request_deadline(app) or 120) + 60
+    try:
+        while app.state.agent_runs.get(graph_builder) and time.monotonic() < give_up:
+            await asyncio.sleep(0.5)
+        if app.state.agent_runs.get(graph_builder):
+            logger.warning("Closing the previous travel agent with runs still in flight.")
+    finally:
+        graph_builder.close()
+        metrics.incr("agent.retired")
+
+
+def check_checkpointer(checkpointer: AsyncSqliteSaver) -> None:
+    """
+    Fail at startup when the installed aiosqlite is incompatible with the
+    SQLite checkpointer, instead of failing every session request with a 500.
+
+    langgraph-checkpoint-sqlite calls `Connection.is_alive()`, which aiosqlite
+    0.22 removed (pinned to <0.22 in pyproject.toml / uv.lock).
+
+    Raises
+    ------
+    CustomException
+        If the checkpointer's connection lacks `is_alive`.
+    """
+    if not hasattr(checkpointer.conn, "is_alive"):
+        try:
+            installed = importlib.metadata.version("aiosqlite")
+        except importlib.metadata.PackageNotFoundError:
+            installed = "unknown"
+        raise CustomException(
+            f"aiosqlite {installed} is incompatible with langgraph-checkpoint-sqlite "
+            "(Connection.is_alive is missing). Install the locked versions (`uv sync`) "
+            "or `pip install 'aiosqlite<0.22'`, or set sessions.enabled: false."
+        )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Build the travel agent once per process and keep it for the app's lifetime.
+    """
+    app.state.reload_lock = asyncio.Lock()
+    app.state.query_flight = SingleFlight("query.singleflight")
+    app.state.session_locks = weakref.WeakValueDictionary()
+    # Caches and stores outliving any one agent build; runs in flight per builder
+    app.state.shared_resources = SharedResources()
+    app.state.agent_runs = Counter()
+    app.state.retiring = set()
+    resources = AsyncExitStack()
+
+    # Conversation sessions are checkpointed per thread_id in SQLite
+    app.state.checkpointer = None
+    config = ConfigLoader()
+    if config.get("sessions", "enabled", default=True):
+        path = config.get("sessions", "path", default=".cache/sessions.sqlite3")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        app.state.checkpointer = await resources.enter_async_context(AsyncSqliteSaver.from_conn_string(path))
+        try:
+            check_checkpointer(app.state.checkpointer)
+        except CustomException:
+            await resources.aclose()
+            raise
+
+    await load_travel_agent(app)
+    await asyncio.to_thread(save_graph_image, app.state.travel_agent)
+
+    config = app.state.graph_builder.config
+    app.state.admission = AdmissionController(
+        max_concurrent=config.get("server", "admission", "max_concurrent", default=16),
+        max_queue=config.get("server", "admission", "max_queue", default=64),
+        queue_timeout=config.get("server", "admission", "queue_timeout_seconds", default=20),
+    )
+    app.state.response_cache = None
+    if config.get("cache", "response", "enabled", default=False):
+        app.state.response_cache = ResponseCache(
+            config.get("cache", "response", "path", default=".cache/responses.sqlite3"),
+            ttl_seconds=config.get("cache", "response", "ttl_seconds", default=86400),
+            max_entries=config.get("cache", "response", "max_entries", default=5000),
+        )
+
+    app.state.jobs = None
+    if config.get("jobs", "enabled", default=True):
+        job_store = JobStore(
+            config.get("jobs", "path", default=".cache/jobs.sqlite3"),
+            max_age_seconds=config.get("jobs", "retention", "max_age_seconds", default=604800),
+            max_jobs=config.get("jobs", "retention", "max_jobs", default=10000),
+        )
+        app.state.jobs = JobWorkerPool(
+            job_store,
+            handler=lambda query, thread_id: run_job(app, query, thread_id),
+            workers=config.get("jobs", "workers", default=4),
+        )
+        app.state.jobs.start()
+    yield
+    logger.info("Shutting down AI Travel Agent API.")
+    if app.state.jobs is not None:
+        await app.state.jobs.stop()
+        app.state.jobs.store.close()
+    # Builders still waiting for their runs to finish are closed by the cancelled task
+    for task in list(app.state.retiring):
+        task.cancel()
+    await asyncio.gather(*app.state.retiring, return_exceptions=True)
+    app.state.graph_builder.close()
+    app.state.shared_resources.close()
+    if app.state.response_cache is not None:
+        app.state.response_cache.close()
+    await resources.aclose()
+    await aclose_async_client()
 
-app = FastAPI(title="AI Travel Agent API", version="1.0")
+
+app = FastAPI(title="AI Travel Agent API", version="1.0", lifespan=lifespan)
 
 
 class QueryRequest(BaseModel):
     """
     Request schema for travel agent queries.
+
+    Requests sharing a `thread_id` form one conversation: follow-ups see the
+    earlier turns and the tool results gathered for them.
     """
     query: str
+    thread_id: Optional[str] = None
+
+
+class BatchQueryRequest(BaseModel):
+    """
+    Request schema for batch travel agent queries.
+    """
+    queries: List[str]
+    concurrency: Optional[int] = None
+
+
+def extract_answer(output) -> str:
+    """
+    Extract the final response text from a graph output.
+    """
+    if isinstance(output, dict) and "messages" in output:
+        last_message = output["messages"][-1]
+        return getattr(last_message, "content", str(last_message))
+    return str(output)
+
+
+def request_deadline(app: FastAPI) -> Optional[float]:
+    """
+    Seconds a graph run may take once admitted (`agent.deadline_seconds`).
+    """
+    return app.state.graph_builder.config.get("agent", "deadline_seconds", default=120)
+
+
+async def run_query(travel_agent, query: str, deadline_seconds: Optional[float] = None) -> str:
+    """
+    Run a single query through the compiled graph and return the final answer.
+    """
+    with deadline_scope(deadline_seconds):
+        output = await travel_agent.ainvoke({"messages": [query]})
+    logger.debug(f"Raw agent output: {output}")
+    return extract_answer(output)
+
+
+def response_cache_key(app: FastAPI, query: str) -> str:
+    """
+    Response cache key for a query under the current models and system prompt.
+    """
+    graph_builder = app.state.graph_builder
+    return ResponseCache.make_key(
+        query,
+        "+".join(f"{role}={name}" for role, name in sorted(graph_builder.model_names.items())),
+        graph_builder.system_prompt.content,
+    )
+
+
+async def answer_query(app: FastAPI, query: str) -> Tuple[str, str, Optional[float]]:
+    """
+    Answer a query on the shared graph, going through the response cache and
+    coalescing identical in-flight queries.
+
+    Concurrent requests whose normalized text matches share a single graph
+    execution (see `server.coalescing.enabled` in config.yaml).
+
+    Returns
+    -------
+    tuple of (str, str, float or None)
+        The answer, its cache status (HIT, MISS or BYPASS) and, on a hit,
+        the cached entry's age in seconds.
+    """
+    cache = app.state.response_cache
+
+    key = None
+    if cache is not None:
+        key = response_cache_key(app, query)
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            logger.info("Serving travel query from response cache.")
+            return cached[0], "HIT", cached[1]
+
+    async def execute() -> str:
+        async with app.state.admission.admit():
+            with agent_run(app) as travel_agent:
+                answer = await run_query(travel_agent, query, request_deadline(app))
+        if cache is not None:
+            await asyncio.to_thread(cache.set, key, query, answer)
+        return answer
+
+    if app.state.graph_builder.config.get("server", "coalescing", "enabled", default=True):
+        answer = await app.state.query_flight.run(normalize_query(query), execute)
+    else:
+        answer = await execute()
+    return answer, "BYPASS" if cache is None else "MISS", None
+
+
+def session_config(thread_id: str) -> dict:
+    """
+    Graph config selecting a session's checkpoint thread.
+    """
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def session_agent(app: FastAPI):
+    """
+    Return the checkpointed session graph or fail with 404 when sessions are disabled.
+    """
+    if app.state.session_agent is None:
+        raise HTTPException(status_code=404, detail="Sessions are disabled.")
+    return app.state.session_agent
+
+
+def session_lock(app: FastAPI, thread_id: str) -> asyncio.Lock:
+    """
+    Lock serializing the turns of one session, so concurrent follow-ups do not
+    interleave their messages in the same checkpoint thread.
+    """
+    lock = app.state.session_locks.get(thread_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        app.state.session_locks[thread_id] = lock
+    return lock
+
+
+async def answer_session_query(app: FastAPI, query: str, thread_id: str) -> str:
+    """
+    Answer the next turn of a session.
+
+    Session turns depend on the conversation so far, so they bypass the
+    response cache and request coalescing.
+    """
+    session_agent(app)  # 404 before queueing when sessions are disabled
+    async with session_lock(app, thread_id):
+        async with app.state.admission.admit():
+            with agent_run(app, session=True) as travel_agent, deadline_scope(request_deadline(app)):
+                output = await travel_agent.ainvoke({"messages": [query]}, session_config(thread_id))
+    metrics.incr("sessions.turns")
+    return extract_answer(output)
+
+
+async def run_job(app: FastAPI, query: str, thread_id: Optional[str] = None) -> str:
+    """
+    Job handler: answer a query, or the next turn of session `thread_id`,
+    waiting out admission rejections instead of failing, since the job's
+    client is not holding a connection open.
+    """
+    while True:
+        try:
+            if thread_id:
+                return await answer_session_query(app, query, thread_id)
+            answer, _, _ = await answer_query(app, query)
+            return answer
+        except AdmissionRejected as ar:
+            logger.info(f"Job deferred by admission control, retrying in {ar.retry_after}s.")
+            await asyncio.sleep(ar.retry_after)
 
 
 @app.post("/query")
-async def query_travel_agent(query: QueryRequest):
+async def query_travel_agent(query: QueryRequest, request: Request, response: Response):
     """
     Endpoint for querying the AI Travel Agent.
 
@@ -32,45 +406,381 @@ async def query_travel_agent(query: QueryRequest):
     """
     try:
         logger.info(f"Received travel query: {query.query}")
+        started = time.perf_counter()
 
-        # Initialize agent workflow
-        graph = GraphBuilder()
-        travel_agent = graph()
-
-        # Optional: Save execution graph for debugging/visualization
-        try:
-            if not os.path.exists("graph.png"):
-                png_graph = travel_agent.get_graph().draw_mermaid_png()
-                with open("graph.png", "wb") as f:
-                    f.write(png_graph)
-                logger.info("Execution graph saved as graph.png")
-            else:
-                logger.info("Execution graph already exists, skipping save.")
-        except Exception as e:
-            logger.warning(f"Failed to save execution graph: {e}")
-
-        # Run query through the agent
-        output = travel_agent.invoke({"messages": [query.query]})
-        logger.debug(f"Raw agent output: {output}")
-
-        # Extract final response
-        if isinstance(output, dict) and "messages" in output:
-            last_message = output["messages"][-1]
-            final_output = getattr(last_message, "content", str(last_message))
+        # Run query through the shared graph without blocking the event loop
+        if query.thread_id:
+            final_output = await answer_session_query(request.app, query.query, query.thread_id)
+            response.headers["X-Cache"] = "BYPASS"
         else:
-            final_output = str(output)
+            final_output, cache_status, age = await answer_query(request.app, query.query)
+            response.headers["X-Cache"] = cache_status
+            if age is not None:
+                response.headers["Age"] = str(int(age))
 
+        metrics.observe("query.latency_ms", (time.perf_counter() - started) * 1000)
         logger.info("Travel query processed successfully.")
         return {"answer": final_output}
 
+    except AdmissionRejected as ar:
+        raise HTTPException(
+            status_code=ar.status_code,
+            detail=ar.reason,
+            headers={"Retry-After": str(ar.retry_after)},
+        )
+
+    except HTTPException:
+        raise
+
+    except DeadlineExceeded as de:
+        metrics.incr("query.errors")
+        logger.warning(f"Travel query exceeded its deadline: {de}")
+        raise HTTPException(status_code=504, detail=str(de))
+
     except CustomException as ce:
+        metrics.incr("query.errors")
         logger.error(f"Custom exception encountered: {ce}")
         raise HTTPException(status_code=500, detail=str(ce))
 
     except Exception as e:
+        metrics.incr("query.errors")
         logger.exception("Unexpected error in /query endpoint.")
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
+
+@app.post("/query/batch")
+async def batch_travel_agent(batch: BatchQueryRequest, request: Request):
+    """
+    Run many queries through the shared graph with bounded concurrency.
+
+    Results are streamed as NDJSON in completion order, one object per line:
+    `{"index", "query", "answer", "error", "cache", "elapsed_ms"}`. A failing item
+    reports its `error` without affecting the rest of the batch.
+
+    Parameters
+    ----------
+    batch : BatchQueryRequest
+        The queries and an optional concurrency limit, capped by
+        `server.batch.max_concurrency` in config.yaml.
+    """
+    config = request.app.state.graph_builder.config
+    max_queries = config.get("server", "batch", "max_queries", default=500)
+    max_concurrency = config.get("server", "batch", "max_concurrency", default=8)
+    concurrency = batch.concurrency or config.get("server", "batch", "default_concurrency", default=4)
+    concurrency = max(1, min(concurrency, max_concurrency))
+
+    if not batch.queries:
+        raise HTTPException(status_code=400, detail="queries cannot be empty.")
+    if len(batch.queries) > max_queries:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_queries} queries.")
+
+    logger.info(f"Received batch of {len(batch.queries)} travel queries (concurrency={concurrency}).")
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_item(index: int, text: str) -> dict:
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                answer, cache_status, _ = await answer_query(request.app, text)
+                error = None
+            except AdmissionRejected as ar:
+                metrics.incr("batch.errors")
+                answer, cache_status, error = None, None, f"{ar.status_code}: {ar.reason}"
+            except Exception as e:
+                logger.exception(f"Batch item {index} failed.")
+                metrics.incr("batch.errors")
+                answer, cache_status, error = None, None, getattr(e, "error_message", str(e))
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            metrics.observe("batch.item_latency_ms", elapsed_ms)
+            return {
+                "index": index,
+                "query": text,
+                "answer": answer,
+                "error": error,
+                "cache": cache_status,
+                "elapsed_ms": round(elapsed_ms, 2),
+            }
+
+    async def result_stream():
+        metrics.incr("batch.requests")
+        metrics.incr("batch.items", len(batch.queries))
+        tasks = [asyncio.create_task(run_item(i, q)) for i, q in enumerate(batch.queries)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done) + "\n"
+        finally:
+            # Stop outstanding work if the client disconnects mid-batch
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that calls `on_close` once the response is over, however
+    it ends: body finished, client gone, send failed or task cancelled - also
+    when the body was never iterated. Releases what the endpoint acquired
+    before the stream started.
+    """
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self.on_close = on_close
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            try:
+                # Runs the generator's own cleanup if it stopped mid-stream
+                await self.body_iterator.aclose()
+            finally:
+                self.on_close()
+
+
+def sse_event(event: str, data: dict) -> str:
+    """
+    Format a single Server-Sent Event frame.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/query/stream")
+async def stream_travel_agent(query: QueryRequest, request: Request):
+    """
+    Stream the agent's answer as Server-Sent Events.
+
+    Events
+    ------
+    start      : the query was accepted.
+    tool_start : a tool call began (`tool`, `input`).
+    tool_end   : a tool call finished (`tool`).
+    token      : a chunk of LLM output text (`content`); with the parallel-plans
+                 topology also the plan it belongs to (`section`).
+    done       : the final answer (`answer`); clients should prefer it over the
+                 concatenated tokens, which may include intermediate turns.
+    error      : the run failed (`detail`).
+
+    With a `thread_id` the query continues that session (see `/query`).
+    """
+    logger.info(f"Received streaming travel query: {query.query}")
+    run_config = None
+    lock = None
+    if query.thread_id:
+        session_agent(request.app)  # 404 before taking the session lock
+        run_config = session_config(query.thread_id)
+        lock = session_lock(request.app, query.thread_id)
+        await lock.acquire()
+
+    admission = request.app.state.admission
+    try:
+        admitted_at = await admission.acquire()
+    except AdmissionRejected as ar:
+        if lock is not None:
+            lock.release()
+        raise HTTPException(
+            status_code=ar.status_code,
+            detail=ar.reason,
+            headers={"Retry-After": str(ar.retry_after)},
+        )
+    except BaseException:
+        # e.g. the client went away while queued
+        if lock is not None:
+            lock.release()
+        raise
+    graph_builder, travel_agent = pick_agent(request.app, session=bool(query.thread_id))
+
+    async def event_stream():
+        started = time.perf_counter()
+        first_token_at = None
+        try:
+            yield sse_event("start", {"query": query.query})
+            with deadline_scope(request_deadline(request.app)):
+                async for event in travel_agent.astream_events(
+                    {"messages": [query.query]}, run_config, version="v2"
+                ):
+                    kind = event["event"]
+                    # The session history summarizer's, the tool-gathering turns' and hedged
+                    # duplicate calls' output is not part of the streamed answer
+                    node = event.get("metadata", {}).get("langgraph_node") or ""
+                    tags = event.get("tags", [])
+                    internal = node in ("history", "gather") or "router" in tags or "hedge" in tags
+                    if kind == "on_chat_model_stream" and not internal:
+                        content = getattr(event["data"].get("chunk"), "content", None)
+                        if isinstance(content, str) and content:
+                            if first_token_at is None:
+                                first_token_at = time.perf_counter()
+                                metrics.observe("query.stream.first_token_ms", (first_token_at - started) * 1000)
+                            token = {"content": content}
+                            if node.startswith("plan_"):
+                                # Plan branches stream concurrently; tell their tokens apart
+                                token["section"] = node[len("plan_"):]
+                            yield sse_event("token", token)
+                    elif kind == "on_tool_start":
+                        yield sse_event("tool_start", {"tool": event["name"], "input": event["data"].get("input")})
+                    elif kind == "on_tool_end":
+                        yield sse_event("tool_end", {"tool": event["name"]})
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        # End of the root graph run carries the final state
+                        answer = extract_answer(event["data"].get("output"))
+                        metrics.observe("query.latency_ms", (time.perf_counter() - started) * 1000)
+                        logger.info("Streaming travel query processed successfully.")
+                        yield sse_event("done", {"answer": answer})
+        except DeadlineExceeded as de:
+            metrics.incr("query.errors")
+            logger.warning(f"Streaming travel query exceeded its deadline: {de}")
+            yield sse_event("error", {"detail": str(de)})
+        except Exception as e:
+            metrics.incr("query.errors")
+            logger.exception("Unexpected error in /query/stream endpoint.")
+            yield sse_event("error", {"detail": f"Internal server error: {e}"})
+
+    def close() -> None:
+        drop_agent(request.app, graph_builder)
+        admission.release(admitted_at)
+        if lock is not None:
+            lock.release()
+
+    return ReleasingStreamingResponse(
+        event_stream(),
+        on_close=close,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def require_admin(authorization: Optional[str]) -> None:
+    """
+    Check an admin request's `Authorization: Bearer <token>` header against
+    the `ADMIN_TOKEN` environment variable. Without a token configured the
+    admin endpoints are disabled (404).
+    """
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, supplied = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(supplied.strip().encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token.", headers={"WWW-Authenticate": "Bearer"})
+
+
+@app.post("/admin/reload")
+async def reload_travel_agent(request: Request, authorization: Optional[str] = Header(None)):
+    """
+    Rebuild the LLM client, tools and graph (e.g. after editing config.yaml).
+
+    Requires `Authorization: Bearer $ADMIN_TOKEN`; disabled (404) when
+    `ADMIN_TOKEN` is not set.
+
+    Returns
+    -------
+    dict
+        Latency breakdown of the rebuild.
+    """
+    require_admin(authorization)
+    async with request.app.state.reload_lock:
+        try:
+            timings = await load_travel_agent(request.app)
+            return {"status": "reloaded", "timings": timings}
+        except Exception as e:
+            logger.exception("Travel agent reload failed; keeping the previous graph.")
+            raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+
+
+def job_pool(request: Request) -> JobWorkerPool:
+    """
+    Return the job worker pool or fail with 404 when job mode is disabled.
+    """
+    if request.app.state.jobs is None:
+        raise HTTPException(status_code=404, detail="Job mode is disabled.")
+    return request.app.state.jobs
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(query: QueryRequest, request: Request, response: Response):
+    """
+    Submit a travel query to be planned in the background.
+
+    With a `thread_id` the job answers the next turn of that session (see `/query`).
+
+    Returns
+    -------
+    dict
+        The job id and its initial status; poll `GET /jobs/{job_id}` for the result.
+    """
+    jobs = job_pool(request)
+    if query.thread_id:
+        session_agent(request.app)  # 404 when sessions are disabled
+    max_pending = request.app.state.graph_builder.config.get("jobs", "max_pending", default=1000)
+    if jobs.queue_depth() >= max_pending:
+        raise HTTPException(status_code=429, detail="Too many pending jobs.", headers={"Retry-After": "30"})
+
+    job_id = await asyncio.to_thread(jobs.store.create, query.query, query.thread_id)
+    jobs.submit(job_id)
+    logger.info(f"Queued travel job {job_id}: {query.query}")
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return {"job_id": job_id, "status": "queued"}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """
+    Return a job's status, and its answer or error once finished.
+    """
+    job = await asyncio.to_thread(job_pool(request).store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "query": job["query"],
+        "thread_id": job["thread_id"],
+        "answer": job["answer"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
+@app.delete("/cache")
+async def invalidate_response_cache(request: Request, query: Optional[str] = None):
+    """
+    Invalidate cached `/query` answers.
+
+    Parameters
+    ----------
+    query : str, optional
+        Only drop the entry for this query (under the current model and
+        system prompt); without it the whole cache is cleared.
+
+    Returns
+    -------
+    dict
+        Number of deleted entries.
+    """
+    cache = request.app.state.response_cache
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Response cache is disabled.")
+    key = response_cache_key(request.app, query) if query else None
+    deleted = await asyncio.to_thread(cache.invalidate, key)
+    return {"deleted": deleted}
+
+
+@app.get("/metrics")
+async def get_metrics(request: Request):
+    """
+    Startup-vs-request latency breakdown and runtime counters.
+
+    `startup` is the one-off cost of building the agent, which used to be
+    paid again on every `/query` call before the graph was shared.
+    """
+    startup = getattr(request.app.state, "startup_timings", {})
+    return {
+        "startup": startup,
+        "per_request_build_saved_ms": startup.get("total_ms"),
+        **metrics.snapshot(),
+    }
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=120)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, timeout_keep_alive=120)
@@ -0,0 +1,27 @@
+from langgraph.graph import MessagesState
+
+
+class AgentState(MessagesState, total=False):
+    """
+    Graph state: the conversation messages plus per-run bookkeeping.
+
+    Attributes
+    ----------
+    prefetch_key : str
+        Handle of the speculative tool lookups started for this run (if any).
+    history_summary : str
+        Summary of older session turns trimmed from `messages` to fit the
+        history token budget (sessions only).
+    compaction_tokens_saved : int
+        Prompt tokens per agent turn removed from this run's tool results by
+        the compaction node.
+    mainstream_plan, offbeat_plan : str
+        Plans written by the concurrent synthesis branches (parallel-plans
+        topology only), combined by the merge node.
+    """
+
+    prefetch_key: str
+    history_summary: str
+    compaction_tokens_saved: int
+    mainstream_plan: str
+    offbeat_plan: str
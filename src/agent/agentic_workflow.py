@@ -1,13 +1,41 @@
-from langgraph.graph import StateGraph, START, END, MessagesState
-from langgraph.prebuilt import ToolNode, tools_condition
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from functools import partial
+from typing import Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.prebuilt import tools_condition
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 from src.logger import logger
 from src.exception import CustomException
 from src.utils.models import ModelLoader
-from src.prompts.system_prompt import SYSTEM_PROMPT
+from src.prompts.system_prompt import (
+    SYSTEM_PROMPT, PLAN_SYSTEM_PROMPT, HISTORY_SUMMARY_PROMPT, FINAL_SYNTHESIS_PROMPT, ROUTER_PROMPT,
+    MAINSTREAM_PLAN_PROMPT, OFFBEAT_PLAN_PROMPT,
+)
 from src.tools.weather_info_tool import WeatherInfoTool
 from src.tools.place_search_tool import PlaceSearchTool
 from src.tools.expense_calculator_tool import CalculatorTool
 from src.tools.currency_converter_tool import CurrencyConverterTool
+from src.agent.agent_state import AgentState
+from src.agent.compaction import ToolOutputCompactor
+from src.agent.history import count_tokens, format_for_summary, select_messages_to_drop
+from src.agent.prefetch import Prefetcher
+from src.agent.tool_node import ConcurrentToolNode
+from src.utils import deadline
+from src.utils.deadline import DeadlineExceeded
+from src.utils.hedging import HedgedLLM
+from src.utils.metrics import metrics
+from src.utils.shared_resources import SharedResources
+
+
+# Parallel-plans topology: state key and section prompt of each synthesis branch, in output order
+PLAN_BRANCHES = {
+    "mainstream": MAINSTREAM_PLAN_PROMPT,
+    "offbeat": OFFBEAT_PLAN_PROMPT,
+}
 
 
 class GraphBuilder:
@@ -23,7 +51,7 @@ class GraphBuilder:
     The agent uses a system prompt for structured travel planning responses.
     """
 
-    def __init__(self, model_provider: str = "groq"):
+    def __init__(self, model_provider: str = "groq", resources: Optional[SharedResources] = None):
         """
         Initialize the GraphBuilder with LLM and integrated tools.
 
@@ -31,19 +59,43 @@ class GraphBuilder:
         ----------
         model_provider : str, optional
             The LLM provider to load, by default "groq".
+        resources : SharedResources, optional
+            Process-wide caches and stores to reuse (e.g. across reloads);
+            private ones, closed with the builder, when not given.
         """
+        # Private resources are closed by `close`; shared ones only released
+        self._owned_resources = SharedResources() if resources is None else None
+        self._resources = (resources or self._owned_resources).lease()
         try:
             logger.info("Initializing GraphBuilder...")
+            # Wall-clock cost of each construction phase, in milliseconds
+            self.timings = {}
 
-            # Load LLM
+            # Load config and LLM
+            started = time.perf_counter()
             self.model_loader = ModelLoader(model_provider=model_provider)
-            self.llm = self.model_loader.load_llm()
+            self.config = self.model_loader.config
+            self.timings["config_ms"] = (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            self.llm = self.model_loader.load_llm("synthesis")
+            # Fast model for turns that only pick tools; unset or equal to the
+            # synthesis model means every turn runs on the synthesis model
+            self.model_names = {
+                "router": self.model_loader.model_name_for("router"),
+                "synthesis": self.model_loader.model_name_for("synthesis"),
+            }
+            self.router_llm = None
+            if self.model_names["router"] != self.model_names["synthesis"]:
+                self.router_llm = self.model_loader.load_llm("router")
+            self.timings["llm_client_ms"] = (time.perf_counter() - started) * 1000
 
             # Initialize tools
-            self.weather_tools = WeatherInfoTool()
-            self.place_search_tools = PlaceSearchTool()
+            started = time.perf_counter()
+            self.weather_tools = WeatherInfoTool(self.config, self._resources)
+            self.place_search_tools = PlaceSearchTool(self.config, self._resources)
             self.calculator_tools = CalculatorTool()
-            self.currency_converter_tools = CurrencyConverterTool()
+            self.currency_converter_tools = CurrencyConverterTool(self.config, self._resources)
 
             # Merge all tools
             self.tools = [
@@ -53,26 +105,365 @@ class GraphBuilder:
                 *self.currency_converter_tools.currency_converter_tool_list,
             ]
 
+            # Speculative destination lookups started before the first LLM turn
+            self.prefetcher = None
+            if self.config.get("prefetch", "enabled", default=False):
+                self.prefetcher = Prefetcher(
+                    self.tools,
+                    tool_args=self.config.get("prefetch", "tools", default={}),
+                    covers=self.config.get("prefetch", "covers", default={}),
+                    max_workers=self.config.get("prefetch", "max_workers", default=8),
+                    max_queued=self.config.get("prefetch", "max_queued", default=None),
+                    max_wait_fraction=self.config.get("prefetch", "max_wait_fraction", default=0.25),
+                )
+
+            # Executes each turn's tool calls concurrently with per-tool timeouts
+            self.tool_node = ConcurrentToolNode(
+                self.tools,
+                default_timeout=self.config.get("tools", "default_timeout_seconds", default=20),
+                timeouts=self.config.get("tools", "timeouts", default={}),
+                max_workers=self.config.get("tools", "max_workers", default=8),
+                prefetcher=self.prefetcher,
+            )
+
+            # Shrinks tool results before they are sent back to the LLM
+            self.compactor = None
+            if self.config.get("compaction", "enabled", default=True):
+                self.compactor = ToolOutputCompactor(
+                    default_max_tokens=self.config.get("compaction", "default_max_tokens", default=800),
+                    max_tokens=self.config.get("compaction", "max_tokens", default={}),
+                )
+            self.timings["tools_ms"] = (time.perf_counter() - started) * 1000
+
             # Bind tools to LLM
+            started = time.perf_counter()
             self.llm_with_tools = self.llm.bind_tools(tools=self.tools)
+            # Same tools in context, but the model may not call them (final synthesis turn)
+            self.llm_final = self.llm.bind_tools(tools=self.tools, tool_choice="none")
+            self.router_with_tools = None
+            if self.router_llm is not None:
+                # Tagged so streaming clients can skip the router's (discarded) text
+                self.router_with_tools = self.router_llm.bind_tools(tools=self.tools).with_config(tags=["router"])
+
+            # Sync-path LLM calls run here so they can be abandoned at the request deadline
+            self._llm_executor = ThreadPoolExecutor(
+                max_workers=self.config.get("llm", "max_workers", default=16), thread_name_prefix="llm"
+            )
+
+            # Optional hedged requests against slow completions
+            if self.config.get("llm", "hedging", "enabled", default=False):
+                self._enable_hedging()
+            self.timings["bind_tools_ms"] = (time.perf_counter() - started) * 1000
             self.graph = None
+            self.session_graph = None
             self.system_prompt = SYSTEM_PROMPT
 
+            # "single": one agent writes both plans; "parallel_plans": shared tool
+            # gathering, then one synthesis branch per plan running concurrently
+            self.topology = self.config.get("agent", "topology", default="single")
+
+            # Iteration and time budget of the agent <-> tools loop
+            self.max_tool_rounds = self.config.get("agent", "max_tool_rounds", default=6)
+            self.synthesis_reserve = self.config.get("agent", "synthesis_reserve_seconds", default=20)
+
+            # Session history budget (only applies to graphs built with a checkpointer)
+            self.max_history_tokens = self.config.get("sessions", "max_history_tokens", default=6000)
+            self.summarize_history = self.config.get("sessions", "summarize", default=True)
+
             logger.info("GraphBuilder initialized successfully.")
 
         except Exception as e:
             logger.exception("GraphBuilder initialization failed.")
+            self._resources.release()
+            if self._owned_resources is not None:
+                self._owned_resources.close()
             raise CustomException(f"GraphBuilder init failed: {e}")
 
-    def agent_function(self, state: MessagesState) -> dict:
+    def close(self) -> None:
+        """
+        Release what the builder holds: stop its tool, prefetch, hedging,
+        weather and search thread pools, and give back its shared caches and
+        stores (closed once no other builder holds them).
+
+        Call it once no run uses the builder's graphs anymore; calls still
+        running on a pool finish in the background.
+        """
+        hedged = [llm for llm in (self.llm_with_tools, self.llm_final, self.router_with_tools)
+                  if isinstance(llm, HedgedLLM)]
+        closeables = [self.tool_node, self.prefetcher, self.weather_tools, self.place_search_tools, *hedged]
+        self._llm_executor.shutdown(wait=False, cancel_futures=True)
+        for closeable in closeables:
+            if closeable is None:
+                continue
+            try:
+                closeable.close()
+            except Exception:
+                logger.exception(f"Closing {type(closeable).__name__} failed.")
+        self._resources.release()
+        if self._owned_resources is not None:
+            self._owned_resources.close()
+        logger.info("GraphBuilder closed.")
+
+    def _enable_hedging(self) -> None:
+        """
+        Wrap the agent's LLM calls in `HedgedLLM`. Synthesis turns hedge onto
+        the `llm.roles.fallback` model when one is configured, otherwise onto
+        the same model; router turns always hedge onto the router model.
+        """
+        settings = dict(
+            percentile=self.config.get("llm", "hedging", "percentile", default=95),
+            min_samples=self.config.get("llm", "hedging", "min_samples", default=20),
+            initial_delay=self.config.get("llm", "hedging", "initial_delay_seconds", default=8),
+            max_workers=self.config.get("llm", "hedging", "max_workers", default=8),
+        )
+        fallback = None
+        if self.config.get("llm", "roles", "fallback", "model_name"):
+            fallback = self.model_loader.load_llm("fallback")
+            self.model_names["fallback"] = self.model_loader.model_name_for("fallback")
+
+        self.llm_with_tools = HedgedLLM(
+            self.llm_with_tools, fallback.bind_tools(tools=self.tools) if fallback else None,
+            name="synthesis", **settings,
+        )
+        self.llm_final = HedgedLLM(
+            self.llm_final, fallback.bind_tools(tools=self.tools, tool_choice="none") if fallback else None,
+            name="final", **settings,
+        )
+        if self.router_with_tools is not None:
+            self.router_with_tools = HedgedLLM(self.router_with_tools, name="router", **settings)
+        logger.info("Hedged LLM requests enabled.")
+
+    def prefetch_function(self, state: AgentState) -> dict:
+        """
+        Start speculative tool lookups for the destination in the latest user message.
+
+        Parameters
+        ----------
+        state : AgentState
+            Current state in the LangGraph.
+
+        Returns
+        -------
+        dict
+            The prefetch key for this run ("" when nothing was prefetched).
+        """
+        try:
+            key = self.prefetcher.start(str(state["messages"][-1].content))
+            return {"prefetch_key": key or ""}
+        except Exception:
+            # Prefetching is an optimisation only; never fail the run over it
+            logger.exception("Prefetch failed, continuing without it.")
+            return {"prefetch_key": ""}
+
+    def _finish_run(self, state: AgentState, response) -> None:
+        """Close the run's prefetch bookkeeping and report its savings once the final answer is produced."""
+        if getattr(response, "tool_calls", None):
+            return
+        if self.prefetcher is not None:
+            self.prefetcher.finish(state.get("prefetch_key"))
+        if self.compactor is not None:
+            saved = state.get("compaction_tokens_saved", 0)
+            metrics.incr("compaction.requests")
+            metrics.set_gauge("compaction.last_request_tokens_saved", saved)
+            metrics.set_gauge(
+                "compaction.avg_tokens_saved_per_request",
+                round(metrics.counter("compaction.tokens_saved") / metrics.counter("compaction.requests"), 1),
+            )
+            logger.info(f"Tool output compaction saved ~{saved} prompt tokens per agent turn in this run.")
+
+    def _trim_history(self, state: AgentState):
+        """
+        Work out which old session turns to drop to stay within the token budget.
+
+        Returns
+        -------
+        tuple
+            (messages to drop, text for the summarizer or None when nothing is summarized)
+        """
+        summary = state.get("history_summary", "")
+        dropped = select_messages_to_drop(state["messages"], self.max_history_tokens, summary)
+        metrics.set_gauge("sessions.last_history_tokens", count_tokens(state["messages"], summary))
+        if not dropped:
+            return [], None
+        metrics.incr("sessions.trimmed_messages", len(dropped))
+        logger.info(f"Trimming {len(dropped)} old message(s) from the session history.")
+        if not self.summarize_history:
+            return dropped, None
+        return dropped, format_for_summary(dropped, summary)
+
+    @staticmethod
+    def _history_update(dropped, summary=None) -> dict:
+        # Per-run counters live in the checkpointed state too; start them afresh each turn
+        update = {"messages": [RemoveMessage(id=message.id) for message in dropped], "compaction_tokens_saved": 0}
+        if summary is not None:
+            update["history_summary"] = summary
+        return update
+
+    def history_function(self, state: AgentState) -> dict:
+        """
+        Keep a session's history under the token budget before the agent runs.
+
+        The oldest whole turns are removed from the checkpointed state and,
+        when enabled, folded into a running summary the agent still sees.
+
+        Parameters
+        ----------
+        state : AgentState
+            Current state in the LangGraph.
+
+        Returns
+        -------
+        dict
+            Removals for the dropped messages and the updated summary.
+        """
+        try:
+            dropped, summary_input = self._trim_history(state)
+            if summary_input is None:
+                return self._history_update(dropped)
+            started = time.perf_counter()
+            summary = self.llm.invoke([HISTORY_SUMMARY_PROMPT, HumanMessage(content=summary_input)])
+            metrics.observe("sessions.summarize_ms", (time.perf_counter() - started) * 1000)
+            return self._history_update(dropped, str(summary.content))
+
+        except Exception as e:
+            logger.exception("History trimming failed.")
+            raise CustomException(f"History function failed: {e}")
+
+    async def ahistory_function(self, state: AgentState) -> dict:
+        """
+        Async twin of `history_function`.
+        """
+        try:
+            dropped, summary_input = self._trim_history(state)
+            if summary_input is None:
+                return self._history_update(dropped)
+            started = time.perf_counter()
+            summary = await self.llm.ainvoke([HISTORY_SUMMARY_PROMPT, HumanMessage(content=summary_input)])
+            metrics.observe("sessions.summarize_ms", (time.perf_counter() - started) * 1000)
+            return self._history_update(dropped, str(summary.content))
+
+        except Exception as e:
+            logger.exception("History trimming failed.")
+            raise CustomException(f"History function failed: {e}")
+
+    def _build_prompt(self, state: AgentState, system_prompt: Optional[SystemMessage] = None) -> list:
+        """System prompt (the agent's unless given), then the session summary (if any), then the conversation."""
+        prompt = [system_prompt or self.system_prompt]
+        if state.get("history_summary"):
+            prompt.append(SystemMessage(
+                content=f"Summary of the earlier conversation in this session:\n{state['history_summary']}"
+            ))
+        return prompt + state["messages"]
+
+    @staticmethod
+    def _tool_rounds(state: AgentState) -> int:
+        """Number of tool-calling turns since the latest user message."""
+        rounds = 0
+        for message in reversed(state["messages"]):
+            if isinstance(message, HumanMessage):
+                break
+            if isinstance(message, AIMessage) and message.tool_calls:
+                rounds += 1
+        return rounds
+
+    def _must_synthesize(self, state: AgentState) -> bool:
+        """
+        Whether the budget is (nearly) spent, so this turn must produce the
+        final answer without calling tools.
+        """
+        if self._tool_rounds(state) >= self.max_tool_rounds:
+            metrics.incr("agent.forced_synthesis.max_rounds")
+            logger.warning(f"Tool round limit ({self.max_tool_rounds}) reached, forcing final answer.")
+            return True
+        left = deadline.remaining()
+        if left is not None and left < self.synthesis_reserve:
+            metrics.incr("agent.forced_synthesis.deadline")
+            logger.warning(f"Only {left:.1f}s left before the deadline, forcing final answer.")
+            return True
+        return False
+
+    @staticmethod
+    def _final_only(response, forced: bool):
+        """Drop tool calls the model still emitted on a forced final turn, so the loop ends."""
+        if forced and getattr(response, "tool_calls", None):
+            return response.model_copy(update={"tool_calls": []})
+        return response
+
+    @staticmethod
+    def _record_call(role: str, started: float, response) -> float:
+        """Record latency and token usage of one LLM call under its role."""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.observe(f"llm.{role}.latency_ms", elapsed_ms)
+        metrics.incr(f"llm.{role}.calls")
+        usage = getattr(response, "usage_metadata", None) or {}
+        metrics.incr(f"llm.{role}.input_tokens", usage.get("input_tokens", 0))
+        metrics.incr(f"llm.{role}.output_tokens", usage.get("output_tokens", 0))
+        if getattr(response, "tool_calls", None):
+            # Tool-selection turns: compare across roles (or against a single-model run)
+            metrics.observe(f"llm.{role}.tool_turn_ms", elapsed_ms)
+        return elapsed_ms
+
+    def _record_route(self, response, elapsed_ms: float) -> bool:
+        """
+        Account for a router turn. Returns True when the router picked tools
+        (its answer is used), False when it hands the turn to the synthesis model.
+        """
+        if response.tool_calls:
+            # The synthesis model would otherwise have processed this turn
+            usage = getattr(response, "usage_metadata", None) or {}
+            metrics.incr("routing.tool_turns")
+            metrics.incr("routing.synthesis_tokens_avoided", usage.get("total_tokens", 0))
+            return True
+        metrics.incr("routing.handoffs")
+        metrics.observe("routing.handoff_ms", elapsed_ms)
+        return False
+
+    def _call_llm(self, role: str, llm, prompt: list):
+        """
+        Call the LLM and record the call; the call may not outlive the request deadline.
+
+        With a deadline the call runs on the LLM thread pool and is abandoned
+        (left to finish in the background) once the deadline passes.
+        """
+        started = time.perf_counter()
+        left = deadline.remaining()
+        if left is None:
+            response = llm.invoke(prompt)
+        else:
+            future = self._llm_executor.submit(contextvars.copy_context().run, llm.invoke, prompt)
+            try:
+                response = future.result(timeout=max(0.0, left))
+            except FuturesTimeout:
+                future.cancel()
+                metrics.incr("agent.deadline_exceeded")
+                raise DeadlineExceeded("Request deadline exceeded while waiting for the LLM.")
+        return response, self._record_call(role, started, response)
+
+    async def _acall_llm(self, role: str, llm, prompt: list):
+        """Async `_call_llm`; the call may not outlive the request deadline."""
+        started = time.perf_counter()
+        left = deadline.remaining()
+        try:
+            response = await asyncio.wait_for(llm.ainvoke(prompt), None if left is None else max(0.0, left))
+        except asyncio.TimeoutError:
+            metrics.incr("agent.deadline_exceeded")
+            raise DeadlineExceeded("Request deadline exceeded while waiting for the LLM.")
+        return response, self._record_call(role, started, response)
+
+    def agent_function(self, state: AgentState) -> dict:
         """
         Main agent function. Receives user messages, prepends system prompt, 
         and invokes the LLM with tools.
 
+        With a router model configured, the router decides on tool calls first
+        and the synthesis model only runs once the router has nothing more to
+        look up. A forced final turn goes straight to the synthesis model with
+        tool calling disabled.
+
         Parameters
         ----------
-        state : MessagesState
-            Current messages state in the LangGraph.
+        state : AgentState
+            Current state in the LangGraph.
 
         Returns
         -------
@@ -81,43 +472,294 @@ class GraphBuilder:
         """
         try:
             logger.info("Agent function invoked.")
-            user_question = state["messages"]
+            # Prepend system prompt (and the session summary, if any)
+            input_question = self._build_prompt(state)
 
-            # Prepend system prompt
-            input_question = [self.system_prompt] + user_question
+            if self._must_synthesize(state):
+                response, _ = self._call_llm("synthesis", self.llm_final, input_question + [FINAL_SYNTHESIS_PROMPT])
+                response = self._final_only(response, True)
+            else:
+                response = None
+                if self.router_with_tools is not None:
+                    routed, elapsed_ms = self._call_llm("router", self.router_with_tools, input_question + [ROUTER_PROMPT])
+                    if self._record_route(routed, elapsed_ms):
+                        response = routed
+                if response is None:
+                    # Invoke LLM with tools
+                    response, _ = self._call_llm("synthesis", self.llm_with_tools, input_question)
 
-            # Invoke LLM with tools
-            response = self.llm_with_tools.invoke(input_question)
             logger.debug(f"Agent response generated: {response}")
+            self._finish_run(state, response)
             return {"messages": [response]}
 
+        except DeadlineExceeded:
+            raise
+
         except Exception as e:
             logger.exception("Agent function execution failed.")
             raise CustomException(f"Agent function failed: {e}")
 
-    def build_graph(self):
+    async def aagent_function(self, state: AgentState) -> dict:
+        """
+        Async twin of `agent_function`, used when the graph runs via `ainvoke`/`astream`.
+
+        Parameters
+        ----------
+        state : AgentState
+            Current state in the LangGraph.
+
+        Returns
+        -------
+        dict
+            Dictionary containing the response messages.
+        """
+        try:
+            logger.info("Agent function invoked (async).")
+            input_question = self._build_prompt(state)
+
+            if self._must_synthesize(state):
+                response, _ = await self._acall_llm(
+                    "synthesis", self.llm_final, input_question + [FINAL_SYNTHESIS_PROMPT]
+                )
+                response = self._final_only(response, True)
+            else:
+                response = None
+                if self.router_with_tools is not None:
+                    routed, elapsed_ms = await self._acall_llm(
+                        "router", self.router_with_tools, input_question + [ROUTER_PROMPT]
+                    )
+                    if self._record_route(routed, elapsed_ms):
+                        response = routed
+                if response is None:
+                    response, _ = await self._acall_llm("synthesis", self.llm_with_tools, input_question)
+
+            logger.debug(f"Agent response generated: {response}")
+            self._finish_run(state, response)
+            return {"messages": [response]}
+
+        except DeadlineExceeded:
+            raise
+
+        except Exception as e:
+            logger.exception("Agent function execution failed.")
+            raise CustomException(f"Agent function failed: {e}")
+
+    def _gather_llm(self):
+        """Role and runnable deciding the tool calls of the parallel-plans topology."""
+        if self.router_with_tools is not None:
+            return "router", self.router_with_tools
+        return "synthesis", self.llm_with_tools
+
+    def _gather_update(self, role: str, response, elapsed_ms: float) -> dict:
+        if role == "router":
+            self._record_route(response, elapsed_ms)
+        # A "READY" reply only ends the gathering; it is not kept in the conversation
+        return {"messages": [response] if response.tool_calls else []}
+
+    def gather_function(self, state: AgentState) -> dict:
+        """
+        Tool-gathering turn of the parallel-plans topology: call tools, or hand
+        over to the plan branches once everything needed has been gathered.
+
+        Parameters
+        ----------
+        state : AgentState
+            Current state in the LangGraph.
+
+        Returns
+        -------
+        dict
+            The tool-calling AI message, or no messages when gathering is done.
+        """
+        try:
+            logger.info("Gather function invoked.")
+            if self._must_synthesize(state):
+                return {"messages": []}
+            role, llm = self._gather_llm()
+            response, elapsed_ms = self._call_llm(role, llm, self._build_prompt(state) + [ROUTER_PROMPT])
+            return self._gather_update(role, response, elapsed_ms)
+
+        except DeadlineExceeded:
+            raise
+
+        except Exception as e:
+            logger.exception("Gather function execution failed.")
+            raise CustomException(f"Gather function failed: {e}")
+
+    async def agather_function(self, state: AgentState) -> dict:
+        """
+        Async twin of `gather_function`.
+        """
+        try:
+            logger.info("Gather function invoked (async).")
+            if self._must_synthesize(state):
+                return {"messages": []}
+            role, llm = self._gather_llm()
+            response, elapsed_ms = await self._acall_llm(role, llm, self._build_prompt(state) + [ROUTER_PROMPT])
+            return self._gather_update(role, response, elapsed_ms)
+
+        except DeadlineExceeded:
+            raise
+
+        except Exception as e:
+            logger.exception("Gather function execution failed.")
+            raise CustomException(f"Gather function failed: {e}")
+
+    @staticmethod
+    def route_after_gather(state: AgentState):
+        """Run the requested tools, or fan out to every plan branch at once."""
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage) and last_message.tool_calls:
+            return "tools"
+        return [f"plan_{section}" for section in PLAN_BRANCHES]
+
+    def plan_function(self, section: str, state: AgentState) -> dict:
+        """
+        Synthesis branch writing one plan from the gathered tool results.
+
+        Parameters
+        ----------
+        section : str
+            Key of `PLAN_BRANCHES`.
+        state : AgentState
+            Current state in the LangGraph.
+
+        Returns
+        -------
+        dict
+            The plan's Markdown under `<section>_plan`.
+        """
+        try:
+            logger.info(f"Writing {section} plan.")
+            prompt = self._build_prompt(state, PLAN_SYSTEM_PROMPT) + [PLAN_BRANCHES[section]]
+            response, elapsed_ms = self._call_llm("synthesis", self.llm_final, prompt)
+            metrics.observe(f"plans.{section}_ms", elapsed_ms)
+            return {f"{section}_plan": str(response.content)}
+
+        except DeadlineExceeded:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Writing the {section} plan failed.")
+            raise CustomException(f"Plan function failed: {e}")
+
+    async def aplan_function(self, section: str, state: AgentState) -> dict:
+        """
+        Async twin of `plan_function`.
+        """
+        try:
+            logger.info(f"Writing {section} plan (async).")
+            prompt = self._build_prompt(state, PLAN_SYSTEM_PROMPT) + [PLAN_BRANCHES[section]]
+            response, elapsed_ms = await self._acall_llm("synthesis", self.llm_final, prompt)
+            metrics.observe(f"plans.{section}_ms", elapsed_ms)
+            return {f"{section}_plan": str(response.content)}
+
+        except DeadlineExceeded:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Writing the {section} plan failed.")
+            raise CustomException(f"Plan function failed: {e}")
+
+    def merge_function(self, state: AgentState) -> dict:
+        """
+        Combine the branch plans into the final Markdown answer.
+
+        Returns
+        -------
+        dict
+            Dictionary containing the final AI message.
+        """
+        plans = [state.get(f"{section}_plan", "").strip() for section in PLAN_BRANCHES]
+        response = AIMessage(content="\n\n---\n\n".join(plan for plan in plans if plan))
+        self._finish_run(state, response)
+        return {"messages": [response]}
+
+    def _add_parallel_plans(self, graph_builder: StateGraph) -> None:
+        """Plan branches fanned out from the gather node and joined by the merge node."""
+        for section in PLAN_BRANCHES:
+            name = f"plan_{section}"
+            graph_builder.add_node(
+                name,
+                RunnableLambda(
+                    partial(self.plan_function, section), afunc=partial(self.aplan_function, section), name=name
+                ),
+            )
+            graph_builder.add_edge(name, "merge")
+        graph_builder.add_node("merge", self.merge_function)
+        graph_builder.add_edge("merge", END)
+
+    def build_graph(self, checkpointer=None):
         """
         Build and compile the LangGraph execution pipeline with tools and agent.
 
+        Parameters
+        ----------
+        checkpointer : BaseCheckpointSaver, optional
+            Persists state per `thread_id`, turning runs into resumable sessions.
+            Session graphs also get a history node that trims old turns.
+
         Returns
         -------
         Compiled LangGraph object
         """
         try:
             logger.info("Building LangGraph pipeline...")
+            started = time.perf_counter()
 
-            graph_builder = StateGraph(MessagesState)
-            graph_builder.add_node("agent", self.agent_function)
-            graph_builder.add_node("tools", ToolNode(tools=self.tools))
+            graph_builder = StateGraph(AgentState)
+            parallel_plans = self.topology == "parallel_plans"
+            if parallel_plans:
+                agent = "gather"
+                graph_builder.add_node(
+                    agent, RunnableLambda(self.gather_function, afunc=self.agather_function, name=agent)
+                )
+            else:
+                agent = "agent"
+                graph_builder.add_node(
+                    agent, RunnableLambda(self.agent_function, afunc=self.aagent_function, name=agent)
+                )
+            graph_builder.add_node("tools", self.tool_node.as_runnable())
 
             # Define edges
-            graph_builder.add_edge(START, "agent")
-            graph_builder.add_conditional_edges("agent", tools_condition)
-            graph_builder.add_edge("tools", "agent")
-            graph_builder.add_edge("agent", END)
+            entry = START
+            if checkpointer is not None:
+                graph_builder.add_node(
+                    "history",
+                    RunnableLambda(self.history_function, afunc=self.ahistory_function, name="history"),
+                )
+                graph_builder.add_edge(START, "history")
+                entry = "history"
+            if self.prefetcher is not None:
+                graph_builder.add_node("prefetch", self.prefetch_function)
+                graph_builder.add_edge(entry, "prefetch")
+                graph_builder.add_edge("prefetch", agent)
+            else:
+                graph_builder.add_edge(entry, agent)
+            if parallel_plans:
+                graph_builder.add_conditional_edges(
+                    agent, self.route_after_gather, ["tools", *(f"plan_{section}" for section in PLAN_BRANCHES)]
+                )
+                self._add_parallel_plans(graph_builder)
+            else:
+                graph_builder.add_conditional_edges(agent, tools_condition)
+                graph_builder.add_edge(agent, END)
+            if self.compactor is not None:
+                graph_builder.add_node("compact", self.compactor.run)
+                graph_builder.add_edge("tools", "compact")
+                graph_builder.add_edge("compact", agent)
+            else:
+                graph_builder.add_edge("tools", agent)
 
             # Compile graph
-            self.graph = graph_builder.compile()
+            graph = graph_builder.compile(checkpointer=checkpointer)
+            if checkpointer is not None:
+                self.session_graph = graph
+                self.timings["session_compile_ms"] = (time.perf_counter() - started) * 1000
+                logger.info("LangGraph session pipeline built successfully.")
+                return graph
+            self.graph = graph
+            self.timings["compile_ms"] = (time.perf_counter() - started) * 1000
             logger.info("LangGraph pipeline built successfully.")
             return self.graph
 
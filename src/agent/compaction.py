@@ -0,0 +1,246 @@
+import json
+import re
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from src.agent.agent_state import AgentState
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+# Same ratio `count_tokens_approximately` uses
+CHARS_PER_TOKEN = 4
+
+# Fields of a search hit the planner actually reads
+KEPT_RESULT_FIELDS = ("title", "url", "content")
+
+# Lines that are page chrome rather than content
+_BOILERPLATE_LINE = re.compile(
+    r"^\s*(?:skip to (?:main )?content|cookie|accept (?:all )?cookies|sign in|log in|subscribe|"
+    r"share (?:this|on)|follow us|advertisement|all rights reserved|©|privacy policy|terms of (?:use|service)|"
+    r"read more|click here|loading\.\.\.|menu|home\s*[|>»/])",
+    re.IGNORECASE,
+)
+_MARKDOWN_NOISE = re.compile(r"!\[[^\]]*\]\([^)]*\)|\[([^\]]*)\]\([^)]*\)")
+_WHITESPACE = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{2,}")
+
+
+def _tokens(text: str) -> int:
+    return count_tokens_approximately([ToolMessage(content=text, tool_call_id="")])
+
+
+def _clean_text(text: str) -> str:
+    """Drop page chrome, markdown links/images and redundant whitespace from a snippet."""
+    text = _MARKDOWN_NOISE.sub(lambda m: m.group(1) or "", str(text))
+    lines = [_WHITESPACE.sub(" ", line).strip() for line in text.splitlines()]
+    lines = [line for line in lines if line and not _BOILERPLATE_LINE.match(line)]
+    return _BLANK_LINES.sub("\n", "\n".join(lines))
+
+
+def _url_key(url: str) -> str:
+    """Compare URLs ignoring scheme, `www.`, query string, fragment and trailing slash."""
+    parts = urlsplit(str(url).strip().casefold())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    return f"{host}{parts.path.rstrip('/')}"
+
+
+def _snippet_key(text: str) -> str:
+    return re.sub(r"\W+", " ", text.casefold()).strip()[:200]
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(0, max_chars - 1)]
+    # Prefer ending on a sentence or word boundary
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary < max_chars // 2:
+        boundary = cut.rfind(" ")
+    return (cut[:boundary + 1] if boundary > 0 else cut).rstrip() + "…"
+
+
+class ToolOutputCompactor:
+    """
+    Shrinks tool results before they re-enter the LLM context.
+
+    Every tool message is resent to the LLM on each later agent turn, so its
+    size is paid once per remaining iteration. The compactor, run as a graph
+    node between the tools and the agent, rewrites the latest turn's results:
+
+    - search hits are reduced to their title, URL and snippet, dropping raw
+      page content, images, scores and response metadata;
+    - hits with an already-seen URL or snippet are dropped;
+    - boilerplate lines (cookie banners, navigation, "read more") and
+      markdown links are stripped from text;
+    - the result is truncated to the category's token budget.
+
+    Example:
+        compactor = ToolOutputCompactor(default_max_tokens=800, max_tokens={"hotels": 600})
+        graph_builder.add_node("compact", compactor.run)
+        graph_builder.add_edge("tools", "compact")
+    """
+
+    def __init__(self, default_max_tokens: int = 800, max_tokens: Optional[Dict[str, int]] = None):
+        """
+        Parameters
+        ----------
+        default_max_tokens : int, optional
+            Token budget for a tool result without an explicit entry, by default 800.
+        max_tokens : Dict[str, int], optional
+            Per-category budgets, keyed by the result's `category` (place
+            searches) or by tool name.
+        """
+        self.default_max_tokens = default_max_tokens
+        self.max_tokens = max_tokens or {}
+
+    def budget_for(self, category: str) -> int:
+        """Token budget for a result category or tool name."""
+        return int(self.max_tokens.get(category, self.default_max_tokens))
+
+    def _compact_hits(self, hits: list, seen_urls: set, seen_snippets: set) -> List[dict]:
+        compacted = []
+        for hit in hits:
+            if not isinstance(hit, dict):
+                continue
+            url = hit.get("url")
+            if url:
+                if _url_key(url) in seen_urls:
+                    continue
+                seen_urls.add(_url_key(url))
+            content = _clean_text(hit.get("content") or "")
+            if content:
+                if _snippet_key(content) in seen_snippets:
+                    continue
+                seen_snippets.add(_snippet_key(content))
+            kept = {field: hit[field] for field in KEPT_RESULT_FIELDS if hit.get(field)}
+            if content:
+                kept["content"] = content
+            compacted.append(kept)
+        return compacted
+
+    def _compact_results(self, results, seen_urls: set, seen_snippets: set):
+        """Reduce a raw Tavily response (or its answer text) to what the planner uses."""
+        if isinstance(results, str):
+            return _clean_text(results)
+        if isinstance(results, list):
+            return self._compact_hits(results, seen_urls, seen_snippets)
+        if isinstance(results, dict):
+            compacted = {}
+            if results.get("answer"):
+                compacted["answer"] = _clean_text(results["answer"])
+            hits = self._compact_hits(results.get("results") or [], seen_urls, seen_snippets)
+            if hits:
+                compacted["results"] = hits
+            return compacted
+        return results
+
+    @staticmethod
+    def _fit_hits(payload: dict, max_chars: int) -> dict:
+        """Shorten snippets, then drop trailing hits, until the payload fits."""
+        results = payload["results"]
+        hits = results.get("results", []) if isinstance(results, dict) else results
+        while hits:
+            excess = len(json.dumps(payload, ensure_ascii=False)) - max_chars
+            if excess <= 0:
+                break
+            longest = max(hits, key=lambda hit: len(hit.get("content", "")))
+            if len(longest.get("content", "")) > 120:
+                longest["content"] = _truncate(longest["content"], max(120, len(longest["content"]) - excess))
+            else:
+                hits.pop()
+        return payload
+
+    def _compact_payload(self, payload: dict, tool_name: str, seen_urls: set, seen_snippets: set) -> dict:
+        """Compact one normalized search payload to its category's budget."""
+        budget = self.budget_for(payload.get("category") or tool_name)
+        payload = {key: value for key, value in payload.items() if value not in (None, "", [], {})}
+        payload["results"] = self._compact_results(payload.get("results"), seen_urls, seen_snippets)
+        if isinstance(payload["results"], str):
+            payload["results"] = _truncate(payload["results"], budget * CHARS_PER_TOKEN)
+        elif isinstance(payload["results"], dict) and "answer" in payload["results"]:
+            payload["results"]["answer"] = _truncate(payload["results"]["answer"], budget * CHARS_PER_TOKEN)
+        if isinstance(payload["results"], (list, dict)):
+            payload = self._fit_hits(payload, budget * CHARS_PER_TOKEN)
+        return payload
+
+    def compact(self, message: ToolMessage, seen_urls: set, seen_snippets: set) -> str:
+        """
+        Compacted content for one tool message.
+
+        Parameters
+        ----------
+        message : ToolMessage
+            The tool result.
+        seen_urls, seen_snippets : set
+            Keys of hits already kept in this turn, updated in place.
+
+        Returns
+        -------
+        str
+            The new message content (unchanged when nothing could be saved).
+        """
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        try:
+            payload = json.loads(content)
+        except ValueError:
+            payload = None
+
+        if isinstance(payload, dict) and "results" in payload:
+            payload = self._compact_payload(payload, message.name, seen_urls, seen_snippets)
+            compacted = json.dumps(payload, ensure_ascii=False)
+        elif isinstance(payload, dict) and isinstance(payload.get("sections"), list):
+            # Multi-category result (place overview): each section gets its category's budget
+            payload = {key: value for key, value in payload.items() if value not in (None, "", [], {})}
+            payload["sections"] = [
+                self._compact_payload(section, message.name, seen_urls, seen_snippets)
+                if isinstance(section, dict) and "results" in section else section
+                for section in payload["sections"]
+            ]
+            compacted = json.dumps(payload, ensure_ascii=False)
+        else:
+            budget = self.budget_for(message.name)
+            compacted = _truncate(_clean_text(content), budget * CHARS_PER_TOKEN)
+
+        return compacted if len(compacted) < len(content) else content
+
+    def run(self, state: AgentState) -> dict:
+        """
+        Compact the tool results of the latest turn.
+
+        Returns
+        -------
+        dict
+            Replacement messages (same ids) for the compacted results, and the
+            run's cumulative number of prompt tokens saved per agent turn.
+        """
+        latest: List[ToolMessage] = []
+        for message in reversed(state["messages"]):
+            if isinstance(message, AIMessage):
+                break
+            if isinstance(message, ToolMessage) and message.status != "error":
+                latest.append(message)
+
+        seen_urls, seen_snippets = set(), set()
+        replacements: List[ToolMessage] = []
+        saved = 0
+        for message in reversed(latest):
+            try:
+                content = self.compact(message, seen_urls, seen_snippets)
+            except Exception:
+                # Compaction only saves tokens; never fail the run over it
+                logger.exception(f"Could not compact {message.name} output, keeping it as is.")
+                continue
+            if content != message.content:
+                saved += _tokens(str(message.content)) - _tokens(content)
+                replacements.append(message.model_copy(update={"content": content}))
+
+        metrics.incr("compaction.messages", len(replacements))
+        metrics.incr("compaction.tokens_saved", saved)
+        if saved:
+            logger.info(f"Compacted {len(replacements)} tool result(s), saving ~{saved} tokens per agent turn.")
+        return {
+            "messages": replacements,
+            "compaction_tokens_saved": state.get("compaction_tokens_saved", 0) + saved,
+        }
@@ -0,0 +1,68 @@
+from typing import List, Optional, Sequence
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+
+def count_tokens(messages: Sequence[AnyMessage], summary: str = "") -> int:
+    """
+    Approximate prompt tokens of a message list plus an optional summary.
+    """
+    total = count_tokens_approximately(list(messages)) if messages else 0
+    if summary:
+        total += count_tokens_approximately([SystemMessage(content=summary)])
+    return total
+
+
+def select_messages_to_drop(messages: Sequence[AnyMessage], max_tokens: int,
+                            summary: str = "") -> List[AnyMessage]:
+    """
+    Pick the oldest whole turns to drop so the history fits in `max_tokens`.
+
+    Cuts only happen right before a user message, so an AI tool call is never
+    separated from its tool results, and the latest turn is always kept.
+
+    Parameters
+    ----------
+    messages : Sequence[AnyMessage]
+        Conversation history, oldest first.
+    max_tokens : int
+        Approximate token budget for the kept messages plus the summary.
+    summary : str, optional
+        Summary of turns dropped earlier, which also counts against the budget.
+
+    Returns
+    -------
+    List[AnyMessage]
+        The leading messages to drop (empty when the history already fits).
+    """
+    if count_tokens(messages, summary) <= max_tokens:
+        return []
+
+    boundaries = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if not boundaries:
+        return []
+
+    cut: Optional[int] = None
+    for index in boundaries:
+        if index == 0:
+            continue
+        cut = index
+        if count_tokens(messages[index:], summary) <= max_tokens:
+            break
+    return list(messages[:cut]) if cut else []
+
+
+def format_for_summary(messages: Sequence[AnyMessage], existing_summary: str = "") -> str:
+    """
+    Render dropped messages (and the previous summary) as plain text for the summarizer.
+    """
+    lines = []
+    if existing_summary:
+        lines.append(f"Existing summary:\n{existing_summary}\n")
+    lines.append("Older conversation turns:")
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else str(message.content)
+        if not content and getattr(message, "tool_calls", None):
+            content = "called " + ", ".join(call["name"] for call in message.tool_calls)
+        lines.append(f"[{message.type}] {content}")
+    return "\n".join(lines)
@@ -0,0 +1,363 @@
+import asyncio
+import contextvars
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FuturesTimeout, wait
+from typing import Any, Dict, List, Optional, Tuple
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+# "trip to Goa", "3 days in Paris", "visiting Kyoto" -> the words after the preposition,
+# up to the next connector word or punctuation.
+_DESTINATION_PATTERN = re.compile(
+    r"\b(?:to|in|visit|visiting|explore|exploring|around)\s+"
+    r"(?P<place>[a-z][a-z .'\-]{1,60}?)"
+    r"(?=\s+(?:for|with|from|on|in|to|during|next|this|under|within|and|by|at|starting|over|around)\b"
+    r"|\s*[,.!?;:]|\s*$)",
+    re.IGNORECASE,
+)
+# Words that can follow "to"/"in" without being part of the destination
+_LEADING_FILLERS = {
+    "the", "beautiful", "lovely", "go", "travel", "fly", "see", "visit", "explore", "stay", "spend", "to",
+}
+_NOT_DESTINATIONS = {
+    "a", "an", "my", "our", "me", "us", "budget", "plan", "detail", "details", "know",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december", "summer", "winter", "spring",
+    "autumn", "monsoon", "total", "usd", "inr", "eur",
+}
+# Country-level places, used only when the query names nothing more specific
+_BROAD_DESTINATIONS = {"india"}
+
+
+def extract_destination(text: str) -> Optional[str]:
+    """
+    Cheaply guess the destination named in a travel query (no LLM call).
+
+    Returns
+    -------
+    str or None
+        Title-cased destination, e.g. "Goa" for "plan a 3 day trip to goa"
+        or "India" for "10 days in India", or None when nothing
+        destination-like is found.
+    """
+    broad = None
+    for match in _DESTINATION_PATTERN.finditer(text or ""):
+        words = match.group("place").split()
+        while words and words[0].casefold() in _LEADING_FILLERS:
+            words.pop(0)
+        place = " ".join(words)
+        if not place or place.casefold() in _NOT_DESTINATIONS:
+            continue
+        if place.casefold() not in _BROAD_DESTINATIONS:
+            return place.title()
+        broad = broad or place.title()
+    return broad
+
+
+def _normalize(value) -> str:
+    return re.sub(r"\s+", " ", str(value)).strip().casefold()
+
+
+class _Prefetch:
+    """One speculative lookup: its future, start time and completion time."""
+
+    def __init__(self, future: Future, started_at: float):
+        self.future = future
+        self.started_at = started_at
+        self.done_at: Optional[float] = None
+        future.add_done_callback(self._mark_done)
+
+    def _mark_done(self, _future: Future) -> None:
+        self.done_at = time.perf_counter()
+
+
+class Prefetcher:
+    """
+    Starts likely tool lookups for the query's destination before the first
+    LLM turn, and hands the results to the tool node when the LLM asks for them.
+
+    Tools listed in `covers` (e.g. `search_place_overview`) are answered from
+    the same lookups: their call waits for the matching prefetches, which have
+    then filled the shared search cache, weather caches and knowledge index,
+    and the tool runs against those.
+
+    A tool call never queues behind other lookups: a matching prefetch that
+    has not started yet is cancelled and the tool runs live, and one that is
+    running is waited for at most `max_wait_fraction` of the tool's timeout.
+    Lookups that would queue beyond `max_queued` are not started.
+
+    Example:
+        prefetcher = Prefetcher(tools, {"get_current_weather": "city", "search_hotels": "place"})
+        key = prefetcher.start("3 day trip to Goa")
+        message = prefetcher.claim(key, tool_call)  # ToolMessage or None
+        prefetcher.finish(key)
+    """
+
+    def __init__(self, tools: List[BaseTool], tool_args: Dict[str, str],
+                 covers: Optional[Dict[str, Dict[str, Any]]] = None,
+                 max_workers: int = 8, max_queued: Optional[int] = None,
+                 max_wait_fraction: float = 0.25, ttl_seconds: float = 300):
+        """
+        Parameters
+        ----------
+        tools : List[BaseTool]
+            All graph tools; only those named in `tool_args` are prefetched.
+        tool_args : Dict[str, str]
+            Tool name -> name of its destination argument.
+        covers : Dict[str, Dict[str, Any]], optional
+            Tool name -> `{"arg": <destination argument>, "tools": [...]}`,
+            the prefetched tools whose lookups that tool repeats. Entries of
+            `tools` are formatted with the call's arguments
+            (`"search_{category}"`).
+        max_workers : int, optional
+            Thread pool size for the lookups, by default 8.
+        max_queued : int, optional
+            Most lookups waiting for a worker; a run's lookups beyond it are
+            dropped, in `tool_args` order. By default `max_workers`.
+        max_wait_fraction : float, optional
+            Share of a tool's timeout its call waits for a running prefetch
+            before running live, by default 0.25.
+        ttl_seconds : float, optional
+            Unclaimed lookups of runs that never called `finish` are dropped
+            after this long, by default 300.
+        """
+        tools_by_name = {tool.name: tool for tool in tools}
+        self.tool_args = {name: arg for name, arg in tool_args.items() if name in tools_by_name}
+        self.tools_by_name = tools_by_name
+        self.covers = {name: cover for name, cover in (covers or {}).items() if name in tools_by_name}
+        self._max_workers = max_workers
+        self.max_queued = max_workers if max_queued is None else max_queued
+        self.max_wait_fraction = max_wait_fraction
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._runs: Dict[str, Dict[Tuple[str, str], _Prefetch]] = {}
+        self._created: Dict[str, float] = {}
+        self._saved_ms: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def close(self) -> None:
+        """Drop every run's lookups and stop the thread pool."""
+        with self._lock:
+            keys = list(self._runs)
+        for key in keys:
+            self.finish(key)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _sweep(self) -> None:
+        """Finish runs older than the TTL (e.g. runs that errored out)."""
+        cutoff = time.perf_counter() - self.ttl_seconds
+        with self._lock:
+            expired = [key for key, created in self._created.items() if created < cutoff]
+        for key in expired:
+            self.finish(key)
+
+    def start(self, text: str) -> Optional[str]:
+        """
+        Launch lookups for the destination found in `text`.
+
+        Returns
+        -------
+        str or None
+            Key identifying this run's lookups, or None if no destination was found.
+        """
+        self._sweep()
+        destination = extract_destination(text)
+        if not destination or not self.tool_args:
+            metrics.incr("prefetch.no_destination")
+            return None
+
+        key = uuid.uuid4().hex
+        entries = {}
+        room = self._max_workers + self.max_queued - self._pending()
+        for name, arg in self.tool_args.items():
+            if len(entries) >= room:
+                metrics.incr("prefetch.dropped", len(self.tool_args) - len(entries))
+                break
+            call = {"name": name, "args": {arg: destination}, "id": f"prefetch-{name}", "type": "tool_call"}
+            future = self._executor.submit(
+                contextvars.copy_context().run, self.tools_by_name[name].invoke, call
+            )
+            entries[(name, _normalize(destination))] = _Prefetch(future, time.perf_counter())
+
+        if not entries:
+            logger.info(f"Prefetch queue full, not prefetching {destination!r}.")
+            return None
+        with self._lock:
+            self._runs[key] = entries
+            self._created[key] = time.perf_counter()
+            self._saved_ms[key] = 0.0
+        metrics.incr("prefetch.launched", len(entries))
+        logger.info(f"Prefetching {len(entries)} lookups for destination {destination!r}.")
+        return key
+
+    def _pending(self) -> int:
+        """Lookups of open runs running or waiting for a worker."""
+        with self._lock:
+            return sum(1 for entries in self._runs.values() for entry in entries.values() if not entry.future.done())
+
+    def _wait_limit(self, timeout: Optional[float]) -> Optional[float]:
+        """How long a tool call waits for a running prefetch."""
+        return None if timeout is None else timeout * self.max_wait_fraction
+
+    @staticmethod
+    def _started(entries: List[_Prefetch]) -> List[_Prefetch]:
+        """Cancel the lookups still queued and return those already running or done."""
+        started = []
+        for entry in entries:
+            if entry.future.cancel():
+                metrics.incr("prefetch.cancelled")
+            else:
+                started.append(entry)
+        return started
+
+    def _take(self, key: Optional[str], call: dict) -> Optional[_Prefetch]:
+        arg = self.tool_args.get(call["name"])
+        if not key or arg is None:
+            return None
+        with self._lock:
+            entries = self._runs.get(key)
+            if entries is None:
+                return None
+            return entries.pop((call["name"], _normalize(call["args"].get(arg, ""))), None)
+
+    def _take_covered(self, key: Optional[str], call: dict) -> List[_Prefetch]:
+        """Pop the prefetches whose lookups a covering tool call repeats."""
+        cover = self.covers.get(call["name"])
+        if not key or cover is None:
+            return []
+        destination = _normalize(call["args"].get(cover.get("arg", "place"), ""))
+        names = []
+        for template in cover.get("tools", []):
+            try:
+                names.append(template.format(**call["args"]))
+            except (KeyError, IndexError, ValueError):
+                continue
+        with self._lock:
+            entries = self._runs.get(key)
+            if entries is None:
+                return []
+            return [entry for entry in (entries.pop((name, destination), None) for name in names) if entry]
+
+    def _used(self, key: str, call: dict, entry: _Prefetch) -> float:
+        """Record a prefetch as used and return the milliseconds it saved."""
+        used_at = time.perf_counter()
+        saved_ms = (min(used_at, entry.done_at or used_at) - entry.started_at) * 1000
+        with self._lock:
+            # Claimed calls of a turn run concurrently, so the run saves the largest head start
+            if key in self._saved_ms:
+                self._saved_ms[key] = max(self._saved_ms[key], saved_ms)
+        metrics.incr("prefetch.hits")
+        return saved_ms
+
+    def _claimed(self, key: str, call: dict, entry: _Prefetch, result: ToolMessage) -> ToolMessage:
+        saved_ms = self._used(key, call, entry)
+        logger.info(f"Prefetch hit for {call['name']} (saved {saved_ms:.0f} ms).")
+        return result.model_copy(update={"tool_call_id": call["id"]})
+
+    def _covered(self, key: str, call: dict, entries: List[_Prefetch]) -> None:
+        """Count the finished prefetches of a covering call as used."""
+        used = 0
+        for entry in entries:
+            if not entry.future.done():
+                # Still running; the tool runs live and the lookup lands in the caches later
+                metrics.incr("prefetch.late")
+            elif not entry.future.cancelled() and entry.future.exception() is None:
+                self._used(key, call, entry)
+                used += 1
+            else:
+                metrics.incr("prefetch.failed")
+        if used:
+            logger.info(f"{call['name']} served from {used} prefetched lookups.")
+
+    def _unusable(self, call: dict, error: Exception) -> None:
+        if isinstance(error, (FuturesTimeout, asyncio.TimeoutError)):
+            metrics.incr("prefetch.late")
+            logger.info(f"Prefetched {call['name']} still running, running it live.")
+        else:
+            metrics.incr("prefetch.failed")
+            logger.warning(f"Prefetched {call['name']} unusable, running it live: {error}")
+
+    def claim(self, key: Optional[str], call: dict, timeout: Optional[float] = None) -> Optional[ToolMessage]:
+        """
+        Return the prefetched result for a tool call, waiting briefly for it if still running.
+
+        For a covering tool, waits for its prefetched lookups instead and
+        returns None, so the tool runs against the results they cached.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The tool call's timeout; a running prefetch is waited for at most
+            `max_wait_fraction` of it.
+
+        Returns
+        -------
+        ToolMessage or None
+            The result re-addressed to `call["id"]`, or None when nothing
+            matching was prefetched, it had not started yet, is still running
+            after the wait, or failed - the caller then runs the tool itself.
+        """
+        entry = self._take(key, call)
+        if entry is None:
+            covered = self._started(self._take_covered(key, call))
+            if covered:
+                wait([entry.future for entry in covered], timeout=self._wait_limit(timeout))
+                self._covered(key, call, covered)
+            return None
+        if not self._started([entry]):
+            return None
+        try:
+            return self._claimed(key, call, entry, entry.future.result(timeout=self._wait_limit(timeout)))
+        except Exception as e:
+            self._unusable(call, e)
+            return None
+
+    async def aclaim(self, key: Optional[str], call: dict, timeout: Optional[float] = None) -> Optional[ToolMessage]:
+        """Async twin of `claim`."""
+        entry = self._take(key, call)
+        if entry is None:
+            covered = self._started(self._take_covered(key, call))
+            if covered:
+                await asyncio.wait(
+                    [asyncio.wrap_future(entry.future) for entry in covered], timeout=self._wait_limit(timeout)
+                )
+                self._covered(key, call, covered)
+            return None
+        if not self._started([entry]):
+            return None
+        try:
+            # shield: a late prefetch keeps running and still fills the caches
+            result = await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(entry.future)), self._wait_limit(timeout)
+            )
+            return self._claimed(key, call, entry, result)
+        except Exception as e:
+            self._unusable(call, e)
+            return None
+
+    def finish(self, key: Optional[str]) -> None:
+        """
+        Close a run: count unclaimed lookups as wasted and report the latency saved.
+        """
+        if not key:
+            return
+        with self._lock:
+            entries = self._runs.pop(key, None)
+            self._created.pop(key, None)
+            saved_ms = self._saved_ms.pop(key, 0.0)
+        if entries is None:
+            return
+        for entry in entries.values():
+            entry.future.cancel()
+        metrics.incr("prefetch.wasted", len(entries))
+        metrics.observe("prefetch.saved_ms_per_request", saved_ms)
+
+        launched = metrics.counter("prefetch.launched")
+        if launched:
+            metrics.set_gauge("prefetch.hit_rate", round(metrics.counter("prefetch.hits") / launched, 4))
@@ -0,0 +1,206 @@
+import asyncio
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from typing import Dict, List, Optional
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tools import BaseTool
+from src.agent.agent_state import AgentState
+from src.agent.prefetch import Prefetcher
+from src.logger import logger
+from src.utils import deadline
+from src.utils.metrics import metrics
+
+
+class ConcurrentToolNode:
+    """
+    Graph node that executes every tool call of the last AI message concurrently.
+
+    Each tool call gets its own timeout; a call that times out or raises is
+    answered with a structured error `ToolMessage` so the LLM can react to it,
+    instead of failing the whole run. The sync path uses a bounded thread pool,
+    the async path uses asyncio. When a `Prefetcher` is attached, calls it
+    already started for this run are served from its results.
+
+    Example:
+        tool_node = ConcurrentToolNode(tools, default_timeout=20, timeouts={"search_hotels": 30})
+        graph_builder.add_node("tools", tool_node.as_runnable())
+    """
+
+    def __init__(self, tools: List[BaseTool], default_timeout: float = 20.0,
+                 timeouts: Optional[Dict[str, float]] = None, max_workers: int = 8,
+                 prefetcher: Optional[Prefetcher] = None):
+        """
+        Parameters
+        ----------
+        tools : List[BaseTool]
+            Tools the LLM may call.
+        default_timeout : float, optional
+            Timeout in seconds for tools without an explicit entry, by default 20.
+        timeouts : Dict[str, float], optional
+            Per-tool timeouts in seconds, keyed by tool name.
+        max_workers : int, optional
+            Size of the thread pool used on the sync path, by default 8.
+        prefetcher : Prefetcher, optional
+            Source of speculatively started lookups for the run.
+        """
+        self.tools_by_name = {tool.name: tool for tool in tools}
+        self.default_timeout = default_timeout
+        self.timeouts = timeouts or {}
+        self.prefetcher = prefetcher
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def close(self) -> None:
+        """Stop the thread pool; calls already running finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def timeout_for(self, name: str) -> float:
+        """Timeout in seconds for the named tool, capped by the time left before the request deadline."""
+        timeout = float(self.timeouts.get(name, self.default_timeout))
+        left = deadline.remaining()
+        return timeout if left is None else max(0.0, min(timeout, left))
+
+    @staticmethod
+    def _tool_calls(state: AgentState) -> List[dict]:
+        last_message = state["messages"][-1]
+        if isinstance(last_message, AIMessage):
+            return last_message.tool_calls
+        return []
+
+    @staticmethod
+    def _error_message(call: dict, error: str, detail: str, **extra) -> ToolMessage:
+        """Structured error result for a failed tool call."""
+        payload = {"error": error, "tool": call["name"], "detail": detail, **extra}
+        return ToolMessage(
+            content=json.dumps(payload),
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+        )
+
+    @staticmethod
+    def _record(call: dict, started: float, durations: List[float]) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        metrics.observe(f"tools.{call['name']}.latency_ms", elapsed_ms)
+        durations.append(elapsed_ms)
+
+    @staticmethod
+    def _record_turn(started: float, durations: List[float]) -> None:
+        """Wall-clock time of the turn next to what running the calls back to back would cost."""
+        metrics.observe("tools.turn_ms", (time.perf_counter() - started) * 1000)
+        metrics.observe("tools.turn_serial_ms", sum(durations))
+
+    def _invoke_tool(self, call: dict, config: RunnableConfig, durations: List[float],
+                     prefetch_key: Optional[str] = None) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, "unknown_tool", f"No tool named {call['name']!r}.")
+        started = time.perf_counter()
+        try:
+            if self.prefetcher is not None:
+                prefetched = self.prefetcher.claim(prefetch_key, call, timeout=self.timeout_for(call["name"]))
+                if prefetched is not None:
+                    return prefetched
+            return tool.invoke({**call, "type": "tool_call"}, config)
+        except Exception as e:
+            logger.exception(f"Tool {call['name']} failed.")
+            metrics.incr("tools.errors")
+            return self._error_message(call, "tool_error", getattr(e, "error_message", str(e)))
+        finally:
+            self._record(call, started, durations)
+
+    async def _ainvoke_tool(self, call: dict, config: RunnableConfig, durations: List[float],
+                            prefetch_key: Optional[str] = None) -> ToolMessage:
+        tool = self.tools_by_name.get(call["name"])
+        if tool is None:
+            return self._error_message(call, "unknown_tool", f"No tool named {call['name']!r}.")
+
+        timeout = self.timeout_for(call["name"])
+
+        async def execute() -> ToolMessage:
+            if self.prefetcher is not None:
+                prefetched = await self.prefetcher.aclaim(prefetch_key, call, timeout=timeout)
+                if prefetched is not None:
+                    return prefetched
+            return await tool.ainvoke({**call, "type": "tool_call"}, config)
+
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(execute(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {call['name']} timed out after {timeout}s.")
+            metrics.incr("tools.timeouts")
+            return self._error_message(
+                call, "timeout", "The tool did not respond in time.", timeout_seconds=timeout
+            )
+        except Exception as e:
+            logger.exception(f"Tool {call['name']} failed.")
+            metrics.incr("tools.errors")
+            return self._error_message(call, "tool_error", getattr(e, "error_message", str(e)))
+        finally:
+            self._record(call, started, durations)
+
+    def run(self, state: AgentState, config: RunnableConfig) -> dict:
+        """
+        Execute all pending tool calls on the thread pool.
+
+        Returns
+        -------
+        dict
+            Dictionary containing one ToolMessage per tool call, in call order.
+        """
+        calls = self._tool_calls(state)
+        logger.info(f"Running {len(calls)} tool call(s) concurrently.")
+        started = time.perf_counter()
+        durations: List[float] = []
+        futures = [
+            (call, self._executor.submit(
+                contextvars.copy_context().run,
+                self._invoke_tool, call, config, durations, state.get("prefetch_key"),
+            ))
+            for call in calls
+        ]
+
+        messages = []
+        for call, future in futures:
+            timeout = self.timeout_for(call["name"])
+            remaining = timeout - (time.perf_counter() - started)
+            try:
+                messages.append(future.result(timeout=max(0.0, remaining)))
+            except FuturesTimeout:
+                # The worker thread cannot be interrupted; its result is discarded
+                future.cancel()
+                logger.warning(f"Tool {call['name']} timed out after {timeout}s.")
+                metrics.incr("tools.timeouts")
+                messages.append(self._error_message(
+                    call, "timeout", "The tool did not respond in time.", timeout_seconds=timeout
+                ))
+
+        self._record_turn(started, durations)
+        return {"messages": messages}
+
+    async def arun(self, state: AgentState, config: RunnableConfig) -> dict:
+        """
+        Execute all pending tool calls concurrently on the event loop.
+
+        Returns
+        -------
+        dict
+            Dictionary containing one ToolMessage per tool call, in call order.
+        """
+        calls = self._tool_calls(state)
+        logger.info(f"Running {len(calls)} tool call(s) concurrently (async).")
+        started = time.perf_counter()
+        durations: List[float] = []
+        prefetch_key = state.get("prefetch_key")
+        messages = await asyncio.gather(
+            *(self._ainvoke_tool(call, config, durations, prefetch_key) for call in calls)
+        )
+        self._record_turn(started, durations)
+        return {"messages": list(messages)}
+
+    def as_runnable(self, name: str = "tools") -> RunnableLambda:
+        """Wrap the node so LangGraph uses `run` for invoke and `arun` for ainvoke."""
+        return RunnableLambda(self.run, afunc=self.arun, name=name)
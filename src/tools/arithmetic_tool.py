@@ -2,7 +2,7 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from langchain.tools import tool
-from langchain_community.utilities.alpha_vantage import AlphaVantageAPIWrapper
+from src.utils import http_client
 
 @tool
 def multiply(a: int, b: int) -> int:
@@ -34,8 +34,28 @@ def add(a: int, b: int) -> int:
 
 @tool
 def currency_converter(from_curr: str, to_curr: str, value: float)->float:
-    os.environ["ALPHAVANTAGE_API_KEY"] = os.getenv('ALPHAVANTAGE_API_KEY')
-    alpha_vantage = AlphaVantageAPIWrapper()
-    response = alpha_vantage._get_exchange_rate(from_curr, to_curr)
-    exchange_rate = response['Realtime Currency Exchange Rate']['5. Exchange Rate']
-    return value * float(exchange_rate)
\ No newline at end of file
+    """
+    Convert an amount between currencies at the AlphaVantage real-time rate.
+
+    Args:
+        from_curr (str): Currency code to convert from.
+        to_curr (str): Currency code to convert to.
+        value (float): The amount to convert.
+
+    Returns:
+        float: The converted amount.
+    """
+    # Same request as AlphaVantageAPIWrapper, but on the shared keep-alive session
+    response = http_client.request(
+        "GET",
+        "https://www.alphavantage.co/query/",
+        params={
+            "function": "CURRENCY_EXCHANGE_RATE",
+            "from_currency": from_curr,
+            "to_currency": to_curr,
+            "apikey": os.getenv("ALPHAVANTAGE_API_KEY"),
+        },
+    )
+    response.raise_for_status()
+    exchange_rate = response.json()['Realtime Currency Exchange Rate']['5. Exchange Rate']
+    return value * float(exchange_rate)
@@ -1,26 +1,51 @@
 import os
-from typing import List
+from typing import List, Optional
 from dotenv import load_dotenv
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
 from src.utils.currency_converter import CurrencyConverter
+from src.utils.models import ConfigLoader
+from src.utils.shared_resources import ResourceLease, acquire
 from src.logger import logger
 from src.exception import CustomException
 
 
+class CurrencyConversion(BaseModel):
+    """One conversion of a `convert_currency_bulk` call."""
+
+    amount: float = Field(description="The amount of money to convert.")
+    from_currency: str = Field(description="Source currency code (e.g., 'USD').")
+    to_currency: str = Field(description="Target currency code (e.g., 'INR').")
+
+
 class CurrencyConverterTool:
     """
     Wraps the CurrencyConverter utility as LangChain-compatible tools.
     """
 
-    def __init__(self):
+    def __init__(self, config: Optional[ConfigLoader] = None, resources: Optional[ResourceLease] = None):
         """
         Initialize the CurrencyConverter tool with API key from environment variables.
+
+        Parameters
+        ----------
+        config : ConfigLoader, optional
+            Application config (`currency.*` settings); loaded when not given.
+        resources : ResourceLease, optional
+            Source of the process-wide converter (and its rates table); a private one when not given.
         """
         load_dotenv()
+        config = config or ConfigLoader()
         self.api_key = os.environ.get("EXCHANGE_RATE_API_KEY")
         if not self.api_key:
             logger.warning("EXCHANGE_RATE_API_KEY not found in environment variables.")
-        self.currency_service = CurrencyConverter(self.api_key)
+        settings = {
+            "api_key": self.api_key,
+            "base_currency": config.get("currency", "base_currency", default="USD"),
+            "ttl_seconds": config.get("currency", "rates_ttl_seconds", default=3600),
+            "retry_seconds": config.get("currency", "refresh_retry_seconds", default=60),
+        }
+        self.currency_service = acquire(resources, "currency.converter", settings, lambda: CurrencyConverter(**settings))
         self.currency_converter_tool_list = self._setup_tools()
 
     def _setup_tools(self) -> List:
@@ -33,7 +58,6 @@ class CurrencyConverterTool:
             List of LangChain tool functions.
         """
 
-        @tool
         def convert_currency(amount: float, from_currency: str, to_currency: str) -> float:
             """
             Convert amount from one currency to another.
@@ -64,4 +88,71 @@ class CurrencyConverterTool:
                 logger.exception("Currency conversion tool failed.")
                 raise CustomException(f"convert_currency tool error: {e}")
 
-        return [convert_currency]
+        async def aconvert_currency(amount: float, from_currency: str, to_currency: str) -> float:
+            try:
+                logger.info(f"Converting {amount} from {from_currency} to {to_currency}")
+                return await self.currency_service.aconvert(amount, from_currency, to_currency)
+            except Exception as e:
+                logger.exception("Currency conversion tool failed.")
+                raise CustomException(f"convert_currency tool error: {e}")
+
+        def _bulk_result(conversions: List[CurrencyConversion], converted: List[Optional[float]]) -> List[dict]:
+            return [
+                {
+                    **item.model_dump(),
+                    "converted": None if value is None else round(value, 2),
+                    **({"error": "unknown currency code"} if value is None else {}),
+                }
+                for item, value in zip(conversions, converted)
+            ]
+
+        def convert_currency_bulk(conversions: List[CurrencyConversion]) -> List[dict]:
+            """
+            Convert many amounts in one call, e.g. every hotel, meal and ticket
+            price of a plan. Prefer this over repeated convert_currency calls.
+
+            Parameters
+            ----------
+            conversions : List[CurrencyConversion]
+                Amounts with their source and target currency codes.
+
+            Returns
+            -------
+            List[dict]
+                One entry per conversion, in input order, with the `converted`
+                amount (or an `error` for an unknown currency code).
+
+            Raises
+            ------
+            CustomException
+                If the exchange rates cannot be fetched.
+            """
+            try:
+                logger.info(f"Converting {len(conversions)} amounts in bulk")
+                converted = self.currency_service.convert_many(
+                    [item.amount for item in conversions],
+                    [item.from_currency for item in conversions],
+                    [item.to_currency for item in conversions],
+                )
+                return _bulk_result(conversions, converted)
+            except Exception as e:
+                logger.exception("Bulk currency conversion tool failed.")
+                raise CustomException(f"convert_currency_bulk tool error: {e}")
+
+        async def aconvert_currency_bulk(conversions: List[CurrencyConversion]) -> List[dict]:
+            try:
+                logger.info(f"Converting {len(conversions)} amounts in bulk")
+                converted = await self.currency_service.aconvert_many(
+                    [item.amount for item in conversions],
+                    [item.from_currency for item in conversions],
+                    [item.to_currency for item in conversions],
+                )
+                return _bulk_result(conversions, converted)
+            except Exception as e:
+                logger.exception("Bulk currency conversion tool failed.")
+                raise CustomException(f"convert_currency_bulk tool error: {e}")
+
+        return [
+            StructuredTool.from_function(func=convert_currency, coroutine=aconvert_currency),
+            StructuredTool.from_function(func=convert_currency_bulk, coroutine=aconvert_currency_bulk),
+        ]
@@ -1,8 +1,15 @@
+import asyncio
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-from langchain.tools import tool
+from langchain_core.tools import StructuredTool
 from src.utils.place_search import TavilyPlaceSearchTool
+from src.utils.search_cache import SearchCache
+from src.utils.knowledge_index import KnowledgeIndex
+from src.utils.shared_resources import ResourceLease, acquire
+from src.utils.metrics import metrics
+from src.utils.models import ConfigLoader
+from src.logger import logger
 
 # Load environment variables
 load_dotenv()
@@ -10,11 +17,38 @@ os.environ["TAVILY_API_KEY"] = os.getenv("TAVILY_API_KEY")
 
 
 class PlaceSearchTool:
-    def __init__(self):
+    def __init__(self, config: Optional[ConfigLoader] = None, resources: Optional[ResourceLease] = None):
         load_dotenv()
-        self.tavily_search = TavilyPlaceSearchTool()
+        config = config or ConfigLoader()
+        # The SQLite stores are shared through `resources` when given, owned (and closed) here otherwise
+        self._owns_stores = resources is None
+        self.search_cache = None
+        if config.get("cache", "search", "enabled", default=False):
+            settings = config.get("cache", "search", default={})
+            self.search_cache = acquire(resources, "cache.search", settings, lambda: SearchCache(
+                config.get("cache", "search", "path", default=".cache/searches.sqlite3"),
+                ttl_seconds=config.get("cache", "search", "ttl_seconds", default={}),
+                default_ttl_seconds=config.get("cache", "search", "default_ttl_seconds", default=86400),
+                max_bytes=int(config.get("cache", "search", "max_megabytes", default=64) * (1 << 20)),
+            ))
+        self.knowledge_index = None
+        if config.get("knowledge", "enabled", default=False):
+            path = config.get("knowledge", "path", default=".cache/knowledge.sqlite3")
+            self.knowledge_index = acquire(resources, "knowledge", {"path": path}, lambda: KnowledgeIndex(path))
+        self.knowledge_top_k = config.get("knowledge", "top_k", default=8)
+        self.knowledge_max_age = config.get("knowledge", "max_age_seconds", default={})
+        self.knowledge_default_max_age = config.get("knowledge", "default_max_age_seconds", default=2592000)
+        self.tavily_search = TavilyPlaceSearchTool(cache=self.search_cache)
         self.place_search_tool_list = self._setup_tools()
 
+    def close(self) -> None:
+        """Stop the Tavily thread pool, and close the stores unless a lease shares them."""
+        self.tavily_search.close()
+        if self._owns_stores:
+            for store in (self.search_cache, self.knowledge_index):
+                if store is not None:
+                    store.close()
+
     def _normalize_result(self, source: str, category: str, place: str, result: Any, error: str = None) -> Dict:
         """
         Normalize result into a clean JSON structure.
@@ -27,53 +61,193 @@ class PlaceSearchTool:
             "results": result if result else []
         }
 
-    def _setup_tools(self) -> List:
-        """Setup all tools for the place search tool"""
+    def _normalize_overview(self, place: str, results: Dict[str, Any]) -> Dict:
+        """
+        Combine per-category results into one payload with a normalized
+        section per category; a failed category carries its own error.
+        """
+        sections = [
+            self._normalize_result("tavily", category, place, [], str(result))
+            if isinstance(result, Exception)
+            else self._normalize_result("tavily", category, place, result)
+            for category, result in results.items()
+        ]
+        failed = [section["category"] for section in sections if section["error"]]
+        return {
+            "source": "tavily",
+            "category": "overview",
+            "place": place,
+            "error": "All category searches failed." if len(failed) == len(sections) else None,
+            "sections": sections,
+        }
 
-        @tool
-        def search_attractions(place: str) -> Dict:
-            """Search attractions of a place"""
-            try:
-                tavily_result = self.tavily_search.tavily_search_attractions(place)
-                return self._normalize_result("tavily", "attractions", place, tavily_result)
-            except Exception as e:
-                return self._normalize_result("tavily", "attractions", place, [], str(e))
+    def _remember(self, category: str, place: str, result: Any) -> None:
+        """
+        Add a search result to the knowledge index; indexing failures are
+        logged and never fail the search.
+
+        A result served from the search cache is indexed with the time its
+        cache entry was fetched, so a days-old result does not count as fresh.
+        """
+        if self.knowledge_index is None or not result:
+            return
+        try:
+            fetched_at = self.search_cache.created_at(place, category) if self.search_cache is not None else None
+            self.knowledge_index.add(place, category, result, fetched_at=fetched_at)
+        except Exception:
+            logger.exception(f"Indexing {category} of {place!r} failed")
 
-        @tool
-        def search_restaurants(place: str) -> Dict:
-            """Search restaurants of a place"""
+    def _remember_overview(self, place: str, results: Dict[str, Any]) -> None:
+        for category, result in results.items():
+            if not isinstance(result, Exception):
+                self._remember(category, place, result)
+
+    def _local_hits(self, place: str, category: str) -> Optional[List[Dict]]:
+        """
+        Best indexed documents of a place and category, or None when the
+        index has none or its newest one is older than the category's max age.
+        """
+        age = self.knowledge_index.age(place, category)
+        max_age = self.knowledge_max_age.get(category, self.knowledge_default_max_age)
+        if age is None or age > max_age:
+            return None
+        query = TavilyPlaceSearchTool.QUERY_TEMPLATES[category].format(place=place)
+        hits = self.knowledge_index.search(query, place=place, category=category, top_k=self.knowledge_top_k)
+        # The query templates are generic, so fill up with the newest documents of the category
+        seen = {(hit["url"], hit["content"]) for hit in hits}
+        hits += [hit for hit in self.knowledge_index.recent(place, category, limit=self.knowledge_top_k)
+                 if (hit["url"], hit["content"]) not in seen][:self.knowledge_top_k - len(hits)]
+        return [
+            {field: hit[field] for field in ("title", "url", "content") if hit[field]}
+            for hit in hits
+        ] or None
+
+    def _make_local_knowledge_tool(self) -> StructuredTool:
+        """
+        Build the tool answering place searches from the knowledge index,
+        searching Tavily only when the index is missing or stale for the category.
+        """
+        categories = list(TavilyPlaceSearchTool.QUERY_TEMPLATES)
+
+        def unknown(place: str, category: str) -> Dict:
+            return self._normalize_result(
+                "local", category, place, [], f"Unknown category {category!r}; expected one of {categories}."
+            )
+
+        def local(place: str, category: str, hits: Optional[List[Dict]]) -> Optional[Dict]:
+            if hits:
+                metrics.incr("knowledge.local_hits")
+                return self._normalize_result("local", category, place, hits)
+            metrics.incr("knowledge.fallbacks")
+            return None
+
+        def search_local_knowledge(place: str, category: str) -> Dict:
+            if category not in categories:
+                return unknown(place, category)
             try:
-                tavily_result = self.tavily_search.tavily_search_restaurants(place)
-                return self._normalize_result("tavily", "restaurants", place, tavily_result)
+                hits = self._local_hits(place, category)
+            except Exception:
+                logger.exception("Knowledge index lookup failed")
+                hits = None
+            answer = local(place, category, hits)
+            if answer is not None:
+                return answer
+            try:
+                tavily_result = self.tavily_search.search(category, place)
             except Exception as e:
-                return self._normalize_result("tavily", "restaurants", place, [], str(e))
+                return self._normalize_result("tavily", category, place, [], str(e))
+            self._remember(category, place, tavily_result)
+            return self._normalize_result("tavily", category, place, tavily_result)
 
-        @tool
-        def search_activities(place: str) -> Dict:
-            """Search activities of a place"""
+        async def asearch_local_knowledge(place: str, category: str) -> Dict:
+            if category not in categories:
+                return unknown(place, category)
+            try:
+                hits = await asyncio.to_thread(self._local_hits, place, category)
+            except Exception:
+                logger.exception("Knowledge index lookup failed")
+                hits = None
+            answer = local(place, category, hits)
+            if answer is not None:
+                return answer
             try:
-                tavily_result = self.tavily_search.tavily_search_activity(place)
-                return self._normalize_result("tavily", "activities", place, tavily_result)
+                tavily_result = await self.tavily_search.asearch(category, place)
             except Exception as e:
-                return self._normalize_result("tavily", "activities", place, [], str(e))
+                return self._normalize_result("tavily", category, place, [], str(e))
+            await asyncio.to_thread(self._remember, category, place, tavily_result)
+            return self._normalize_result("tavily", category, place, tavily_result)
+
+        return StructuredTool.from_function(
+            func=search_local_knowledge,
+            coroutine=asearch_local_knowledge,
+            name="search_local_knowledge",
+            description=(
+                f"Search what is already known about a place for one category ({', '.join(categories)}). "
+                "Answers from earlier searches when they are recent enough and only searches the web otherwise; "
+                "prefer it over the single-category searches."
+            ),
+        )
+
+    def _make_overview_tool(self) -> StructuredTool:
+        """
+        Build the tool searching every category of a place in one call.
+        """
 
-        @tool
-        def search_transportation(place: str) -> Dict:
-            """Search transportation of a place"""
+        def search_place_overview(place: str) -> Dict:
+            results = self.tavily_search.search_many(place)
+            self._remember_overview(place, results)
+            return self._normalize_overview(place, results)
+
+        async def asearch_place_overview(place: str) -> Dict:
+            results = await self.tavily_search.asearch_many(place)
+            await asyncio.to_thread(self._remember_overview, place, results)
+            return self._normalize_overview(place, results)
+
+        return StructuredTool.from_function(
+            func=search_place_overview,
+            coroutine=asearch_place_overview,
+            name="search_place_overview",
+            description=(
+                "Search attractions, restaurants, activities, transportation and hotels of a place "
+                "in one call. Prefer this over the single-category searches when researching a destination."
+            ),
+        )
+
+    def _make_tool(self, name: str, category: str, description: str) -> StructuredTool:
+        """
+        Build a place search tool with both sync and async implementations.
+        """
+
+        def search(place: str) -> Dict:
             try:
-                tavily_result = self.tavily_search.tavily_search_transportation(place)
-                return self._normalize_result("tavily", "transportation", place, tavily_result)
+                tavily_result = self.tavily_search.search(category, place)
             except Exception as e:
-                return self._normalize_result("tavily", "transportation", place, [], str(e))
-        
-        @tool
-        def search_hotels(place: str) -> dict:
-            """Search hotels in a place"""
+                return self._normalize_result("tavily", category, place, [], str(e))
+            self._remember(category, place, tavily_result)
+            return self._normalize_result("tavily", category, place, tavily_result)
+
+        async def asearch(place: str) -> Dict:
             try:
-                result = self.tavily_search.tavily_search_hotels(place)
-                return self._normalize_result("tavily", "hotels", place, result)
+                tavily_result = await self.tavily_search.asearch(category, place)
             except Exception as e:
-                return self._normalize_result("tavily", "hotels", place, None, str(e))
+                return self._normalize_result("tavily", category, place, [], str(e))
+            await asyncio.to_thread(self._remember, category, place, tavily_result)
+            return self._normalize_result("tavily", category, place, tavily_result)
 
+        return StructuredTool.from_function(
+            func=search, coroutine=asearch, name=name, description=description
+        )
 
-        return [search_attractions, search_restaurants, search_activities, search_transportation, search_hotels]
+    def _setup_tools(self) -> List:
+        """Setup all tools for the place search tool"""
+        tools = [
+            self._make_tool("search_attractions", "attractions", "Search attractions of a place"),
+            self._make_tool("search_restaurants", "restaurants", "Search restaurants of a place"),
+            self._make_tool("search_activities", "activities", "Search activities of a place"),
+            self._make_tool("search_transportation", "transportation", "Search transportation of a place"),
+            self._make_tool("search_hotels", "hotels", "Search hotels in a place"),
+            self._make_overview_tool(),
+        ]
+        if self.knowledge_index is not None:
+            tools.append(self._make_local_knowledge_tool())
+        return tools
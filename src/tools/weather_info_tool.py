@@ -1,23 +1,39 @@
 import os
-from typing import List
+from datetime import date
+from typing import List, Optional
 from dotenv import load_dotenv
-from langchain.tools import tool
-from src.utils.weather_info import WeatherForecastTool
+from langchain_core.tools import StructuredTool
+from src.utils.weather_info import WeatherForecastTool, daily_forecast
+from src.utils.ttl_cache import TTLCache
+from src.utils.shared_resources import ResourceLease, acquire
+from src.utils.models import ConfigLoader
 from src.logger import logger
 from src.exception import CustomException
 
 
+# Slots listed by `get_weather_forecast` (about 30 hours); the full forecast backs `get_trip_weather`
+FORECAST_PREVIEW_SLOTS = 10
+
+
 class WeatherInfoTool:
     """
     Wrapper class to expose weather-related tools (current weather and forecast)
     as LangChain-compatible tools using OpenWeatherMap API.
     """
 
-    def __init__(self):
+    def __init__(self, config: Optional[ConfigLoader] = None, resources: Optional[ResourceLease] = None):
         """
         Initialize the WeatherInfoTool with API key from environment variables.
+
+        Parameters
+        ----------
+        config : ConfigLoader, optional
+            Application config (`weather.cache.*` settings); loaded when not given.
+        resources : ResourceLease, optional
+            Source of the process-wide weather caches; private caches when not given.
         """
         load_dotenv()
+        config = config or ConfigLoader()
         self.api_key = os.environ.get("OPENWEATHERMAP_API_KEY")
 
         if not self.api_key:
@@ -25,18 +41,146 @@ class WeatherInfoTool:
             raise CustomException("Missing API key for OpenWeatherMap.")
 
         logger.info("Initializing WeatherInfoTool with OpenWeatherMap API.")
-        self.weather_service = WeatherForecastTool(self.api_key)
+        self._owns_caches = resources is None
+        self.weather_service = WeatherForecastTool(self.api_key, *self._build_caches(config, resources))
         self.weather_tool_list = self._setup_tools()
 
+    @staticmethod
+    def _build_caches(config: ConfigLoader, resources: Optional[ResourceLease] = None):
+        """Current-weather and forecast caches from `weather.cache`, or (None, None) when disabled."""
+        if not config.get("weather", "cache", "enabled", default=True):
+            return None, None
+        settings = config.get("weather", "cache", default={})
+        max_entries = settings.get("max_entries", 1000)
+        align = settings.get("align_to_cadence", True)
+        current = acquire(resources, "weather.current.cache", settings, lambda: TTLCache(
+            "weather.current.cache",
+            ttl_seconds=settings.get("current_ttl_seconds", 600),
+            stale_seconds=settings.get("current_stale_seconds", 300),
+            max_entries=max_entries,
+            align=align,
+        ))
+        forecast = acquire(resources, "weather.forecast.cache", settings, lambda: TTLCache(
+            "weather.forecast.cache",
+            ttl_seconds=settings.get("forecast_ttl_seconds", 10800),
+            stale_seconds=settings.get("forecast_stale_seconds", 1800),
+            max_entries=max_entries,
+            align=align,
+        ))
+        return current, forecast
+
+    def close(self) -> None:
+        """Stop the weather service's thread pool, and its caches unless a lease shares them."""
+        self.weather_service.close()
+        if self._owns_caches:
+            for cache in (self.weather_service.current_cache, self.weather_service.forecast_cache):
+                if cache is not None:
+                    cache.close()
+
+    @staticmethod
+    def _format_current_weather(city: str, weather_data: dict) -> str:
+        """Render a current-weather API payload as a one-line summary."""
+        if weather_data:
+            temp = weather_data.get("main", {}).get("temp", "N/A")
+            desc = (
+                weather_data.get("weather", [{}])[0].get("description", "N/A")
+            )
+            logger.info(f"✅ Current weather fetched successfully for {city}")
+            return f"Current weather in {city}: {temp}°C, {desc}"
+
+        logger.warning(f"❌ Could not fetch current weather for {city}")
+        return f"Could not fetch weather for {city}"
+
+    @staticmethod
+    def _format_forecast(city: str, forecast_data: dict) -> str:
+        """Render a forecast API payload as one line per forecast slot."""
+        if forecast_data and "list" in forecast_data:
+            forecast_summary = []
+            for item in forecast_data["list"][:FORECAST_PREVIEW_SLOTS]:
+                date = item.get("dt_txt", "").split(" ")[0]
+                temp = item.get("main", {}).get("temp", "N/A")
+                desc = (
+                    item.get("weather", [{}])[0].get("description", "N/A")
+                )
+                forecast_summary.append(f"{date}: {temp}°C, {desc}")
+
+            logger.info(f"✅ Forecast weather fetched successfully for {city}")
+            return f"Weather forecast for {city}:\n" + "\n".join(forecast_summary)
+
+        logger.warning(f"❌ Could not fetch forecast weather for {city}")
+        return f"Could not fetch forecast for {city}"
+
+    def _format_multi(self, weather_by_city: dict) -> str:
+        """Render the current weather of several cities, one line each."""
+        if not weather_by_city:
+            return "No cities given."
+        return "\n".join(
+            self._format_current_weather(city, weather_data) for city, weather_data in weather_by_city.items()
+        )
+
+    @staticmethod
+    def _parse_trip_dates(start_date: str, end_date: str):
+        """Parse ISO trip dates, rejecting malformed or reversed ranges."""
+        try:
+            start, end = date.fromisoformat(start_date.strip()), date.fromisoformat(end_date.strip())
+        except ValueError:
+            raise CustomException(
+                f"Invalid trip dates {start_date!r} - {end_date!r}; use YYYY-MM-DD."
+            )
+        if end < start:
+            raise CustomException(f"Trip end date {end} is before start date {start}.")
+        return start, end
+
+    @staticmethod
+    def _format_trip_weather(city: str, start: date, end: date, current: dict, forecast: dict) -> str:
+        """
+        Render current conditions and the trip days' forecast as one compact
+        Markdown table, noting days beyond the forecast horizon.
+        """
+        lines = [f"Trip weather for {city} ({start} to {end})"]
+        if current:
+            temp = current.get("main", {}).get("temp", "N/A")
+            desc = current.get("weather", [{}])[0].get("description", "N/A")
+            lines.append(f"Now: {temp}°C, {desc}")
+
+        days = daily_forecast(forecast)
+        trip_days = [day for day in days if start <= day["date"] <= end]
+        if trip_days:
+            lines.append("| Date | Min °C | Max °C | Precip mm | Rain chance | Conditions |")
+            lines.append("|---|---|---|---|---|---|")
+            for day in trip_days:
+                partial = " (partial day)" if day["slots"] < 8 else ""
+                lines.append(
+                    f"| {day['date']} | {day['min_c']} | {day['max_c']} | {day['precip_mm']} | "
+                    f"{day['pop']:.0%} | {day['conditions']}{partial} |"
+                )
+        elif not days:
+            lines.append("Forecast unavailable.")
+
+        if days:
+            last = days[-1]["date"]
+            if end > last:
+                beyond = max(start, date.fromordinal(last.toordinal() + 1))
+                lines.append(
+                    f"No forecast for {beyond} to {end} (beyond the 5-day horizon); "
+                    "use typical seasonal conditions."
+                )
+            elif end < days[0]["date"]:
+                lines.append("The trip dates are in the past.")
+        logger.info(f"✅ Trip weather summarised for {city}: {len(trip_days)} forecast day(s)")
+        return "\n".join(lines)
+
     def _setup_tools(self) -> List:
         """
         Setup all weather-related tools.
 
+        Each tool has a sync implementation and an async twin, so the graph
+        can run on either `invoke` or `ainvoke`.
+
         Returns:
             List: A list of LangChain tool functions.
         """
 
-        @tool
         def get_current_weather(city: str) -> str:
             """
             Get the current weather for a city.
@@ -50,24 +194,20 @@ class WeatherInfoTool:
             try:
                 logger.info(f"Fetching current weather for: {city}")
                 weather_data = self.weather_service.get_current_weather(city)
+                return self._format_current_weather(city, weather_data)
+            except Exception as e:
+                logger.exception(f"Error in get_current_weather tool for {city}")
+                raise CustomException(f"Weather tool error: {e}")
 
-                if weather_data:
-                    temp = weather_data.get("main", {}).get("temp", "N/A")
-                    desc = (
-                        weather_data.get("weather", [{}])[0].get("description", "N/A")
-                    )
-                    result = f"Current weather in {city}: {temp}°C, {desc}"
-                    logger.info(f"✅ Current weather fetched successfully for {city}")
-                    return result
-
-                logger.warning(f"❌ Could not fetch current weather for {city}")
-                return f"Could not fetch weather for {city}"
-
+        async def aget_current_weather(city: str) -> str:
+            try:
+                logger.info(f"Fetching current weather for: {city}")
+                weather_data = await self.weather_service.aget_current_weather(city)
+                return self._format_current_weather(city, weather_data)
             except Exception as e:
                 logger.exception(f"Error in get_current_weather tool for {city}")
                 raise CustomException(f"Weather tool error: {e}")
 
-        @tool
         def get_weather_forecast(city: str) -> str:
             """
             Get the weather forecast for a city.
@@ -81,28 +221,82 @@ class WeatherInfoTool:
             try:
                 logger.info(f"Fetching forecast weather for: {city}")
                 forecast_data = self.weather_service.get_forecast_weather(city)
+                return self._format_forecast(city, forecast_data)
+            except Exception as e:
+                logger.exception(f"Error in get_weather_forecast tool for {city}")
+                raise CustomException(f"Forecast tool error: {e}")
 
-                if forecast_data and "list" in forecast_data:
-                    forecast_summary = []
-                    for item in forecast_data["list"]:
-                        date = item.get("dt_txt", "").split(" ")[0]
-                        temp = item.get("main", {}).get("temp", "N/A")
-                        desc = (
-                            item.get("weather", [{}])[0].get("description", "N/A")
-                        )
-                        forecast_summary.append(f"{date}: {temp}°C, {desc}")
-
-                    result = f"Weather forecast for {city}:\n" + "\n".join(
-                        forecast_summary
-                    )
-                    logger.info(f"✅ Forecast weather fetched successfully for {city}")
-                    return result
-
-                logger.warning(f"❌ Could not fetch forecast weather for {city}")
-                return f"Could not fetch forecast for {city}"
-
+        async def aget_weather_forecast(city: str) -> str:
+            try:
+                logger.info(f"Fetching forecast weather for: {city}")
+                forecast_data = await self.weather_service.aget_forecast_weather(city)
+                return self._format_forecast(city, forecast_data)
             except Exception as e:
                 logger.exception(f"Error in get_weather_forecast tool for {city}")
                 raise CustomException(f"Forecast tool error: {e}")
 
-        return [get_current_weather, get_weather_forecast]
+        def get_trip_weather(city: str, start_date: str, end_date: str) -> str:
+            """
+            Get the weather for a trip in one call: current conditions plus a
+            daily min/max temperature, precipitation and conditions table for
+            the trip dates (forecast covers the next 5 days).
+
+            Args:
+                city (str): Name of the city.
+                start_date (str): First day of the trip, YYYY-MM-DD.
+                end_date (str): Last day of the trip, YYYY-MM-DD.
+
+            Returns:
+                str: Compact daily weather table for the trip.
+            """
+            start, end = self._parse_trip_dates(start_date, end_date)
+            try:
+                logger.info(f"Fetching trip weather for: {city} ({start} to {end})")
+                current, forecast = self.weather_service.get_current_and_forecast(city)
+                return self._format_trip_weather(city, start, end, current, forecast)
+            except Exception as e:
+                logger.exception(f"Error in get_trip_weather tool for {city}")
+                raise CustomException(f"Trip weather tool error: {e}")
+
+        async def aget_trip_weather(city: str, start_date: str, end_date: str) -> str:
+            start, end = self._parse_trip_dates(start_date, end_date)
+            try:
+                logger.info(f"Fetching trip weather for: {city} ({start} to {end})")
+                current, forecast = await self.weather_service.aget_current_and_forecast(city)
+                return self._format_trip_weather(city, start, end, current, forecast)
+            except Exception as e:
+                logger.exception(f"Error in get_trip_weather tool for {city}")
+                raise CustomException(f"Trip weather tool error: {e}")
+
+        def get_weather_multi(cities: List[str]) -> str:
+            """
+            Get the current weather for several cities in one call, e.g. every
+            stop of a multi-destination trip.
+
+            Args:
+                cities (List[str]): Names of the cities.
+
+            Returns:
+                str: One weather summary line per city.
+            """
+            try:
+                logger.info(f"Fetching current weather for {len(cities)} cities")
+                return self._format_multi(self.weather_service.get_current_weather_many(cities))
+            except Exception as e:
+                logger.exception("Error in get_weather_multi tool")
+                raise CustomException(f"Weather tool error: {e}")
+
+        async def aget_weather_multi(cities: List[str]) -> str:
+            try:
+                logger.info(f"Fetching current weather for {len(cities)} cities")
+                return self._format_multi(await self.weather_service.aget_current_weather_many(cities))
+            except Exception as e:
+                logger.exception("Error in get_weather_multi tool")
+                raise CustomException(f"Weather tool error: {e}")
+
+        return [
+            StructuredTool.from_function(func=get_current_weather, coroutine=aget_current_weather),
+            StructuredTool.from_function(func=get_weather_multi, coroutine=aget_weather_multi),
+            StructuredTool.from_function(func=get_weather_forecast, coroutine=aget_weather_forecast),
+            StructuredTool.from_function(func=get_trip_weather, coroutine=aget_trip_weather),
+        ]
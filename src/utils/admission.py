@@ -0,0 +1,135 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request cannot be admitted; carries the HTTP status and
+    the `Retry-After` hint (seconds) to send back to the client.
+    """
+
+    def __init__(self, status_code: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Bounds concurrent graph executions with a bounded, deadline-limited wait queue.
+
+    - At most `max_concurrent` executions run at once.
+    - At most `max_queue` requests wait for a slot; beyond that requests are
+      rejected immediately with 429.
+    - A queued request that does not get a slot within `queue_timeout` seconds
+      is rejected with 503.
+
+    Example:
+        admission = AdmissionController(max_concurrent=16, max_queue=64, queue_timeout=20)
+        async with admission.admit():
+            await travel_agent.ainvoke(...)
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float,
+                 metrics_prefix: str = "admission"):
+        """
+        Parameters
+        ----------
+        max_concurrent : int
+            Maximum number of concurrently admitted executions.
+        max_queue : int
+            Maximum number of requests waiting for a slot.
+        queue_timeout : float
+            Seconds a request may wait in the queue before being rejected.
+        metrics_prefix : str, optional
+            Prefix for the controller's metrics, by default "admission".
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.metrics_prefix = metrics_prefix
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _publish(self) -> None:
+        metrics.set_gauge(f"{self.metrics_prefix}.in_flight", self._in_flight)
+        metrics.set_gauge(f"{self.metrics_prefix}.queue_depth", self._waiting)
+
+    def _retry_after(self) -> int:
+        """
+        Estimate when a slot frees up: median execution time scaled by how many
+        requests are ahead per slot, clamped to [1, 60] seconds.
+        """
+        median_ms = metrics.tracker(f"{self.metrics_prefix}.execution_ms").percentile(50) or 1000
+        ahead = (self._waiting + 1) / max(1, self.max_concurrent)
+        return int(min(60, max(1, math.ceil(median_ms / 1000 * ahead))))
+
+    async def acquire(self) -> float:
+        """
+        Wait for an execution slot.
+
+        Returns
+        -------
+        float
+            `time.perf_counter()` at admission, to be passed back to `release`.
+
+        Raises
+        ------
+        AdmissionRejected
+            429 when the wait queue is full, 503 when the queue deadline passes.
+        """
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                metrics.incr(f"{self.metrics_prefix}.rejected.queue_full")
+                logger.warning("Admission queue full, rejecting request.")
+                raise AdmissionRejected(429, self._retry_after(), "Server busy: admission queue is full.")
+
+            self._waiting += 1
+            self._publish()
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                metrics.incr(f"{self.metrics_prefix}.rejected.timeout")
+                logger.warning(f"Request waited {self.queue_timeout}s for admission, rejecting.")
+                raise AdmissionRejected(
+                    503, self._retry_after(), "Server busy: timed out waiting for capacity."
+                )
+            finally:
+                self._waiting -= 1
+                metrics.observe(f"{self.metrics_prefix}.wait_ms", (time.perf_counter() - started) * 1000)
+                self._publish()
+        else:
+            await self._semaphore.acquire()
+            metrics.observe(f"{self.metrics_prefix}.wait_ms", 0.0)
+
+        self._in_flight += 1
+        metrics.incr(f"{self.metrics_prefix}.admitted")
+        self._publish()
+        return time.perf_counter()
+
+    def release(self, admitted_at: float) -> None:
+        """
+        Free the slot taken by `acquire` and record how long it was held.
+        """
+        self._in_flight -= 1
+        self._semaphore.release()
+        metrics.observe(f"{self.metrics_prefix}.execution_ms", (time.perf_counter() - admitted_at) * 1000)
+        self._publish()
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Context manager holding an execution slot for the duration of the block.
+        """
+        admitted_at = await self.acquire()
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
@@ -1,4 +1,10 @@
-import requests
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.utils import http_client
+from src.utils.metrics import metrics
+from src.utils.single_flight import SingleFlight
 from src.logger import logger
 from src.exception import CustomException
 
@@ -6,9 +12,22 @@ from src.exception import CustomException
 class CurrencyConverter:
     """
     A utility class for converting amounts between currencies using ExchangeRate API.
+
+    One rates table (all currencies against `base_currency`) is fetched and
+    cached for `ttl_seconds`; every pair is derived from it through cross
+    rates, so a whole plan's conversions cost at most one upstream call.
+    Concurrent refreshes are coalesced into a single fetch. After a failed
+    refresh the previous table is served for `retry_seconds` without asking
+    the upstream again.
+
+    Example:
+        converter = CurrencyConverter(api_key, base_currency="USD", ttl_seconds=3600)
+        converter.convert(100, "EUR", "INR")          # EUR->INR = rates[INR] / rates[EUR]
+        await converter.aconvert(100, "EUR", "INR")
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, base_currency: str = "USD", ttl_seconds: float = 3600,
+                 retry_seconds: float = 60):
         """
         Initialize the CurrencyConverter with an API key.
 
@@ -16,12 +35,163 @@ class CurrencyConverter:
         ----------
         api_key : str
             API key for exchangerate-api.com
+        base_currency : str, optional
+            Currency whose rates table is fetched and cached, by default "USD".
+        ttl_seconds : float, optional
+            How long a fetched table is used before refreshing, by default one hour.
+        retry_seconds : float, optional
+            How long the previous table is served after a failed refresh
+            before the next attempt, by default 60.
         """
         if not api_key:
             raise ValueError("API key for CurrencyConverter is required.")
         self.base_url = f"https://v6.exchangerate-api.com/v6/{api_key}/latest"
+        self.base_currency = base_currency.upper()
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+        self._rates: Optional[Dict[str, float]] = None
+        self._fetched_at = 0.0
+        # Monotonic time before which a failed refresh is not retried
+        self._retry_at = 0.0
+        self._refresh_lock = threading.Lock()
+        self._refresh_flight = SingleFlight("currency.rates.singleflight")
         logger.info("CurrencyConverter initialized successfully.")
 
+    def _fresh_rates(self) -> Optional[Dict[str, float]]:
+        """The cached table if it is still within its TTL, or within the retry backoff of a failed refresh."""
+        if self._rates is None:
+            return None
+        now = time.monotonic()
+        if now - self._fetched_at < self.ttl_seconds:
+            metrics.incr("currency.rates.hits")
+            return self._rates
+        if now < self._retry_at:
+            metrics.incr("currency.rates.stale_served")
+            return self._rates
+        return None
+
+    def _store(self, data: dict) -> Dict[str, float]:
+        rates = data.get("conversion_rates")
+        if not rates:
+            raise CustomException("No conversion rates found in API response.")
+        self._rates = {code.upper(): float(rate) for code, rate in rates.items()}
+        self._fetched_at = time.monotonic()
+        metrics.incr("currency.rates.fetches")
+        logger.info(f"Fetched {len(self._rates)} exchange rates against {self.base_currency}.")
+        return self._rates
+
+    def _stale_or_raise(self, error: Exception) -> Dict[str, float]:
+        """Keep serving the last table when a refresh fails; fail only without one."""
+        if self._rates is None:
+            raise error
+        self._retry_at = time.monotonic() + self.retry_seconds
+        metrics.incr("currency.rates.stale_served")
+        logger.warning(
+            f"Exchange rate refresh failed, using the previous table for the next {self.retry_seconds}s: {error}"
+        )
+        return self._rates
+
+    def get_rates(self) -> Dict[str, float]:
+        """
+        Rates of every currency against the base currency, from cache when fresh.
+
+        Raises
+        ------
+        CustomException
+            If the table cannot be fetched and none was cached before.
+        """
+        rates = self._fresh_rates()
+        if rates is not None:
+            return rates
+        with self._refresh_lock:
+            # Another thread may have refreshed the table while we waited
+            rates = self._fresh_rates()
+            if rates is not None:
+                return rates
+            try:
+                response = http_client.request("GET", f"{self.base_url}/{self.base_currency}")
+                if response.status_code != 200:
+                    raise CustomException(f"API call failed with status {response.status_code}: {response.text}")
+                return self._store(response.json())
+            except Exception as e:
+                return self._stale_or_raise(e)
+
+    async def aget_rates(self) -> Dict[str, float]:
+        """
+        Async twin of `get_rates`; concurrent refreshes share one request.
+        """
+        rates = self._fresh_rates()
+        if rates is not None:
+            return rates
+
+        async def refresh() -> Dict[str, float]:
+            try:
+                response = await http_client.arequest("GET", f"{self.base_url}/{self.base_currency}")
+                if response.status_code != 200:
+                    raise CustomException(f"API call failed with status {response.status_code}: {response.text}")
+                return self._store(response.json())
+            except Exception as e:
+                return self._stale_or_raise(e)
+
+        return await self._refresh_flight.run(self.base_currency, refresh)
+
+    @staticmethod
+    def cross_rate(rates: Dict[str, float], from_currency: str, to_currency: str) -> float:
+        """
+        Rate from `from_currency` to `to_currency` derived from a base-currency table.
+
+        Raises
+        ------
+        CustomException
+            If either currency is missing from the table.
+        """
+        from_currency, to_currency = from_currency.upper(), to_currency.upper()
+        for code in (from_currency, to_currency):
+            if code not in rates:
+                raise CustomException(f"{code} not found in exchange rates.")
+        return rates[to_currency] / rates[from_currency]
+
+    @staticmethod
+    def convert_with_rates(rates: Dict[str, float], amounts: Sequence[float],
+                           from_currencies: Sequence[str], to_currencies: Sequence[str]) -> List[Optional[float]]:
+        """
+        Convert many amounts at once as one array operation over a rates table.
+
+        Parameters
+        ----------
+        rates : Dict[str, float]
+            Rates of every currency against a common base.
+        amounts, from_currencies, to_currencies : Sequence
+            Equal-length amounts and currency codes, one entry per conversion.
+
+        Returns
+        -------
+        List[Optional[float]]
+            Converted amounts in input order; None where a currency code is unknown.
+        """
+        codes = list(rates)
+        index = {code: i for i, code in enumerate(codes)}
+        table = np.append(np.array([rates[code] for code in codes], dtype=float), np.nan)
+        missing = len(codes)  # unknown codes index the trailing NaN
+        from_idx = np.array([index.get(code.upper(), missing) for code in from_currencies], dtype=int)
+        to_idx = np.array([index.get(code.upper(), missing) for code in to_currencies], dtype=int)
+        converted = np.asarray(amounts, dtype=float) * table[to_idx] / table[from_idx]
+        return [None if np.isnan(value) else float(value) for value in converted]
+
+    def convert_many(self, amounts: Sequence[float], from_currencies: Sequence[str],
+                     to_currencies: Sequence[str]) -> List[Optional[float]]:
+        """
+        Convert many amounts with a single rates lookup (see `convert_with_rates`).
+        """
+        return self.convert_with_rates(self.get_rates(), amounts, from_currencies, to_currencies)
+
+    async def aconvert_many(self, amounts: Sequence[float], from_currencies: Sequence[str],
+                            to_currencies: Sequence[str]) -> List[Optional[float]]:
+        """
+        Async twin of `convert_many`.
+        """
+        return self.convert_with_rates(await self.aget_rates(), amounts, from_currencies, to_currencies)
+
     def convert(self, amount: float, from_currency: str, to_currency: str) -> float:
         """
         Convert the amount from one currency to another.
@@ -47,21 +217,40 @@ class CurrencyConverter:
         """
         try:
             logger.info(f"Converting {amount} from {from_currency} to {to_currency}")
-            url = f"{self.base_url}/{from_currency.upper()}"
-            response = requests.get(url)
-            if response.status_code != 200:
-                raise CustomException(f"API call failed with status {response.status_code}: {response.text}")
+            converted_amount = amount * self.cross_rate(self.get_rates(), from_currency, to_currency)
+            logger.info(f"Converted amount: {converted_amount}")
+            return converted_amount
 
-            data = response.json()
-            rates = data.get("conversion_rates")
-            if not rates:
-                raise CustomException("No conversion rates found in API response.")
+        except Exception as e:
+            logger.exception("Currency conversion failed.")
+            raise CustomException(f"Error converting currency: {e}")
+
+    async def aconvert(self, amount: float, from_currency: str, to_currency: str) -> float:
+        """
+        Asynchronously convert the amount from one currency to another.
+
+        Parameters
+        ----------
+        amount : float
+            The amount of money to convert.
+        from_currency : str
+            Currency code to convert from (e.g., "USD").
+        to_currency : str
+            Currency code to convert to (e.g., "EUR").
 
-            to_currency = to_currency.upper()
-            if to_currency not in rates:
-                raise CustomException(f"{to_currency} not found in exchange rates.")
+        Returns
+        -------
+        float
+            Converted amount in the target currency.
 
-            converted_amount = amount * rates[to_currency]
+        Raises
+        ------
+        CustomException
+            If API call fails or target currency is not found.
+        """
+        try:
+            logger.info(f"Converting (async) {amount} from {from_currency} to {to_currency}")
+            converted_amount = amount * self.cross_rate(await self.aget_rates(), from_currency, to_currency)
             logger.info(f"Converted amount: {converted_amount}")
             return converted_amount
 
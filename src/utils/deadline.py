@@ -0,0 +1,77 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Absolute `time.monotonic()` by which the current request must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised when the current request's deadline has passed.
+    """
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """
+    Give the code in the block (and the tasks and threads it starts with a
+    copied context) a deadline `seconds` from now.
+
+    A nested scope can only shorten the deadline, never extend it. `None`
+    keeps the enclosing deadline.
+
+    Example:
+        with deadline_scope(120):
+            await travel_agent.ainvoke(...)   # tools see remaining() <= 120
+    """
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Seconds left before the current deadline (may be negative), or None when
+    no deadline is set.
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def bound_timeout(timeout: float) -> float:
+    """
+    Clamp a per-call timeout (e.g. for an HTTP request) to the time left.
+
+    Parameters
+    ----------
+    timeout : float
+        The call's own timeout in seconds.
+
+    Returns
+    -------
+    float
+        `timeout`, or the remaining time if that is shorter.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the deadline has already passed.
+    """
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("Request deadline exceeded.")
+    return min(timeout, left)
@@ -0,0 +1,151 @@
+import asyncio
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Optional
+from langchain_core.runnables import Runnable, RunnableConfig
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+class HedgedLLM:
+    """
+    Hedged requests around a chat model (or any runnable) to cut tail latency.
+
+    The primary call is sent first. If it has not answered within the
+    configured percentile of its recent latency, a duplicate is sent to the
+    backup (the same model or a fallback model) and the first successful
+    answer wins; the other call is cancelled. A primary that fails before the
+    hedge delay is retried on the backup straight away.
+
+    On the sync path a losing call cannot be interrupted; its thread finishes
+    in the background and its result is discarded.
+
+    Example:
+        llm = HedgedLLM(llm_with_tools, fallback_with_tools, name="synthesis", percentile=95)
+        response = llm.invoke(messages)
+    """
+
+    def __init__(self, primary: Runnable, backup: Optional[Runnable] = None, name: str = "llm",
+                 percentile: float = 95, min_samples: int = 20, initial_delay: float = 8.0,
+                 max_workers: int = 8):
+        """
+        Parameters
+        ----------
+        primary : Runnable
+            The model normally used.
+        backup : Runnable, optional
+            Target of the duplicate request, by default `primary` itself.
+        name : str, optional
+            Metrics prefix (`hedge.<name>.*`), by default "llm".
+        percentile : float, optional
+            Latency percentile of recent primary calls after which to hedge, by default 95.
+        min_samples : int, optional
+            Primary calls to observe before the percentile is trusted, by default 20.
+        initial_delay : float, optional
+            Hedge delay in seconds until `min_samples` calls were observed, by default 8.
+        max_workers : int, optional
+            Thread pool size for the sync path, by default 8.
+        """
+        self.primary = primary
+        self.backup = (backup or primary).with_config(tags=["hedge"])
+        self.name = name
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"hedge-{name}")
+
+    def close(self) -> None:
+        """Stop the sync path's thread pool; losing calls still running finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before sending the duplicate."""
+        tracker = metrics.tracker(f"hedge.{self.name}.primary_ms")
+        if len(tracker) < self.min_samples:
+            return self.initial_delay
+        return tracker.percentile(self.percentile) / 1000
+
+    def _watch_primary(self, started: float):
+        """
+        Callback recording how long a successful primary call took (the
+        unhedged latency). Failed and cancelled calls are left out: a fast
+        failure or a cancelled loser would pull the hedge delay down.
+        """
+        def record(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            metrics.observe(f"hedge.{self.name}.primary_ms", (time.perf_counter() - started) * 1000)
+        return record
+
+    def _finish(self, started: float, response, hedged: bool, backup_won: bool):
+        prefix = f"hedge.{self.name}"
+        metrics.incr(f"{prefix}.requests")
+        if hedged:
+            metrics.incr(f"{prefix}.hedged")
+        if backup_won:
+            metrics.incr(f"{prefix}.backup_wins")
+            logger.info(f"Hedged {self.name} request won by the duplicate.")
+        metrics.observe(f"{prefix}.latency_ms", (time.perf_counter() - started) * 1000)
+
+        requests = metrics.counter(f"{prefix}.requests")
+        hedged_total = metrics.counter(f"{prefix}.hedged")
+        metrics.set_gauge(f"{prefix}.hedge_rate", round(hedged_total / requests, 4))
+        if hedged_total:
+            metrics.set_gauge(f"{prefix}.win_rate", round(metrics.counter(f"{prefix}.backup_wins") / hedged_total, 4))
+        return response
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        """Hedged `invoke`, running both calls on the thread pool."""
+        started = time.perf_counter()
+        primary: Future = self._executor.submit(
+            contextvars.copy_context().run, self.primary.invoke, input, config, **kwargs
+        )
+        primary.add_done_callback(self._watch_primary(started))
+
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done and primary.exception() is None:
+            return self._finish(started, primary.result(), hedged=False, backup_won=False)
+
+        logger.info(f"Hedging {self.name} request after {time.perf_counter() - started:.2f}s.")
+        backup: Future = self._executor.submit(
+            contextvars.copy_context().run, self.backup.invoke, input, config, **kwargs
+        )
+        pending, errors = {primary, backup}, []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    return self._finish(started, future.result(), hedged=True, backup_won=future is backup)
+                errors.append(future.exception())
+        raise errors[0]
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs) -> Any:
+        """Hedged `ainvoke`; the losing call is cancelled."""
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(self.primary.ainvoke(input, config, **kwargs))
+        primary.add_done_callback(self._watch_primary(started))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done and primary.exception() is None:
+                return self._finish(started, primary.result(), hedged=False, backup_won=False)
+
+            logger.info(f"Hedging {self.name} request after {time.perf_counter() - started:.2f}s.")
+            backup = asyncio.ensure_future(self.backup.ainvoke(input, config, **kwargs))
+            tasks.append(backup)
+            pending, errors = set(tasks), []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return self._finish(started, task.result(), hedged=True, backup_won=task is backup)
+                    errors.append(task.exception())
+            raise errors[0]
+        finally:
+            # Cancel the loser (or both, if the caller gave up)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
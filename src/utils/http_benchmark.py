@@ -0,0 +1,133 @@
+"""
+Benchmark of the connection-setup cost the shared HTTP clients save.
+
+Sends the same GET sequentially with a fresh connection per call (what a bare
+`requests.get` / per-call `httpx.AsyncClient` does) and through the shared
+pooled clients of `src.utils.http_client`, and prints per-call latency.
+
+    python -m src.utils.http_benchmark                     # local keep-alive server (TCP setup only)
+    python -m src.utils.http_benchmark https://api.openweathermap.org/ -n 50   # TCP + TLS setup
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Set
+import httpx
+import numpy as np
+import requests
+from src.utils import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients may keep the connection open
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs stall kept-alive calls
+    disable_nagle_algorithm = True
+    connections: Set[tuple] = set()
+
+    def do_GET(self):
+        _Handler.connections.add(self.client_address)
+        body = json.dumps({"ok": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _local_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _summary(name: str, timings: List[float], connections: Optional[int]) -> str:
+    ms = np.asarray(timings) * 1000
+    opened = "" if connections is None else f"  connections={connections}"
+    return (f"{name:<16} n={len(ms):<5} mean={ms.mean():8.2f}ms  p50={np.percentile(ms, 50):8.2f}ms  "
+            f"p95={np.percentile(ms, 95):8.2f}ms{opened}")
+
+
+def _time_sync(call: Callable[[], object], n: int) -> List[float]:
+    timings = []
+    for _ in range(n):
+        started = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def _time_async(call, n: int) -> List[float]:
+    timings = []
+    for _ in range(n):
+        started = time.perf_counter()
+        await call()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+async def _fresh_async(url: str):
+    async with httpx.AsyncClient() as client:
+        return await client.get(url)
+
+
+def run(url: str, n: int, local: bool) -> List[str]:
+    """Run every mode against `url` and return one summary line per mode."""
+
+    def connections() -> Optional[int]:
+        if not local:
+            return None
+        opened = len(_Handler.connections)
+        _Handler.connections.clear()
+        return opened
+
+    # One warm-up call per client so DNS and imports are not counted
+    requests.get(url, timeout=10)
+    http_client.request("GET", url)
+    connections()
+
+    lines = [
+        _summary("sync fresh", _time_sync(lambda: requests.get(url, timeout=10), n), connections()),
+        _summary("sync pooled", _time_sync(lambda: http_client.request("GET", url), n), connections()),
+    ]
+
+    async def run_async():
+        await http_client.arequest("GET", url)
+        connections()
+        fresh = _summary("async fresh", await _time_async(lambda: _fresh_async(url), n), connections())
+        pooled = _summary(
+            "async pooled", await _time_async(lambda: http_client.arequest("GET", url), n), connections()
+        )
+        await http_client.aclose_async_client()
+        return [fresh, pooled]
+
+    lines.extend(asyncio.run(run_async()))
+    return lines
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("url", nargs="?", help="URL to GET (default: a local keep-alive server)")
+    parser.add_argument("-n", "--requests", type=int, default=200, help="calls per mode (default: 200)")
+    args = parser.parse_args(argv)
+
+    server = None if args.url else _local_server()
+    url = args.url or f"http://127.0.0.1:{server.server_address[1]}/"
+    try:
+        print(f"GET {url} x{args.requests} per mode")
+        for line in run(url, args.requests, local=server is not None):
+            print(line)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+import asyncio
+import random
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.utils.deadline import bound_timeout, remaining
+from src.utils.metrics import metrics
+from src.logger import logger
+
+
+# Methods that may be resent without changing the outcome; POST is never retried
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class DeadlineRetry(Retry):
+    """
+    urllib3 `Retry` whose waits (backoff and Retry-After) are capped at
+    `backoff_max` and at the time left before the request deadline, so a
+    large Retry-After cannot hold a sync call past its deadline.
+    """
+
+    def _capped(self, seconds: float) -> float:
+        left = remaining()
+        cap = self.backoff_max if left is None else min(self.backoff_max, left)
+        return max(0.0, min(seconds, cap))
+
+    def get_retry_after(self, response) -> Optional[float]:
+        seconds = super().get_retry_after(response)
+        return None if seconds is None else self._capped(seconds)
+
+    def get_backoff_time(self) -> float:
+        return self._capped(super().get_backoff_time())
+
+
+@dataclass(frozen=True)
+class HttpSettings:
+    """
+    Pool, timeout and retry settings of the shared clients (`http` in config.yaml).
+    """
+
+    timeout_seconds: float = 10.0
+    connect_timeout_seconds: float = 5.0
+    max_hosts: int = 10
+    per_host: int = 20
+    max_connections: int = 100
+    max_keepalive: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    retries: int = 2
+    backoff_factor: float = 0.3
+    max_backoff_seconds: float = 4.0
+    jitter_seconds: float = 0.3
+
+    @classmethod
+    def from_config(cls, config=None) -> "HttpSettings":
+        """
+        Read the `http` section, keeping the defaults for anything missing (or
+        when the config file cannot be loaded, e.g. outside the repo root).
+        """
+        if config is None:
+            try:
+                from src.utils.models import ConfigLoader
+                config = ConfigLoader()
+            except Exception:
+                logger.warning("HTTP client settings not loaded from config, using defaults.")
+                return cls()
+        defaults = cls()
+        return cls(
+            timeout_seconds=config.get("http", "timeout_seconds", default=defaults.timeout_seconds),
+            connect_timeout_seconds=config.get(
+                "http", "connect_timeout_seconds", default=defaults.connect_timeout_seconds
+            ),
+            max_hosts=config.get("http", "pool", "max_hosts", default=defaults.max_hosts),
+            per_host=config.get("http", "pool", "per_host", default=defaults.per_host),
+            max_connections=config.get("http", "pool", "max_connections", default=defaults.max_connections),
+            max_keepalive=config.get("http", "pool", "max_keepalive", default=defaults.max_keepalive),
+            keepalive_expiry_seconds=config.get(
+                "http", "pool", "keepalive_expiry_seconds", default=defaults.keepalive_expiry_seconds
+            ),
+            retries=config.get("http", "retries", "total", default=defaults.retries),
+            backoff_factor=config.get("http", "retries", "backoff_factor", default=defaults.backoff_factor),
+            max_backoff_seconds=config.get(
+                "http", "retries", "max_backoff_seconds", default=defaults.max_backoff_seconds
+            ),
+            jitter_seconds=config.get("http", "retries", "jitter_seconds", default=defaults.jitter_seconds),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number `attempt` (1-based): capped exponential plus jitter."""
+        delay = min(self.max_backoff_seconds, self.backoff_factor * (2 ** (attempt - 1)))
+        return delay + random.uniform(0, self.jitter_seconds)
+
+
+_settings: Optional[HttpSettings] = None
+_session: Optional[requests.Session] = None
+_async_client: Optional[httpx.AsyncClient] = None
+_lock = threading.Lock()
+
+
+def get_settings() -> HttpSettings:
+    """Settings of the shared clients, loaded from config on first use."""
+    global _settings
+    if _settings is None:
+        _settings = HttpSettings.from_config()
+    return _settings
+
+
+def configure(settings: HttpSettings) -> None:
+    """
+    Replace the settings; clients created afterwards use them. Call before the
+    first request (e.g. at startup) - existing clients are not rebuilt.
+    """
+    global _settings
+    _settings = settings
+
+
+def request_timeout(timeout: Optional[float] = None) -> Tuple[float, float]:
+    """
+    `(connect, read)` timeout for a call, clamped to the request deadline.
+
+    Parameters
+    ----------
+    timeout : float, optional
+        Read timeout in seconds, by default the configured `timeout_seconds`.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the deadline has already passed.
+    """
+    settings = get_settings()
+    read = bound_timeout(settings.timeout_seconds if timeout is None else timeout)
+    return min(settings.connect_timeout_seconds, read), read
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide `requests.Session`, creating it on first use.
+
+    Its adapters keep up to `per_host` connections alive to each of
+    `max_hosts` hosts, and retry idempotent requests on connection errors and
+    429/5xx responses with jittered exponential backoff (honouring
+    Retry-After, capped at `max_backoff_seconds` and the request deadline).
+    Non-idempotent requests are only retried when the
+    connection could not be opened, so nothing is sent twice.
+
+    Returns
+    -------
+    requests.Session
+        Shared synchronous HTTP session.
+    """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                settings = get_settings()
+                retry = DeadlineRetry(
+                    total=settings.retries,
+                    backoff_factor=settings.backoff_factor,
+                    backoff_max=settings.max_backoff_seconds,
+                    backoff_jitter=settings.jitter_seconds,
+                    allowed_methods=IDEMPOTENT_METHODS,
+                    status_forcelist=RETRY_STATUSES,
+                    respect_retry_after_header=True,
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=settings.max_hosts,
+                    pool_maxsize=settings.per_host,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+                logger.debug("Shared requests.Session created.")
+    return _session
+
+
+def request(method: str, url: str, timeout: Union[None, float, Tuple[float, float]] = None,
+            **kwargs) -> requests.Response:
+    """
+    Send a request through the shared session.
+
+    Parameters
+    ----------
+    method, url : str
+        As for `requests.request`.
+    timeout : float or (connect, read) tuple, optional
+        A float is the read timeout (see `request_timeout`); a tuple is used
+        as is. By default the configured timeouts, clamped to the deadline.
+    **kwargs
+        Passed to `requests.Session.request`.
+
+    Returns
+    -------
+    requests.Response
+        The final response (after any retries).
+    """
+    if not isinstance(timeout, tuple):
+        timeout = request_timeout(timeout)
+    metrics.incr("http.requests")
+    return get_session().request(method, url, timeout=timeout, **kwargs)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Return the process-wide `httpx.AsyncClient`, creating it on first use.
+
+    Sharing one client keeps upstream connections alive between tool calls
+    instead of opening a new TCP+TLS connection per request.
+
+    Returns
+    -------
+    httpx.AsyncClient
+        Shared asynchronous HTTP client.
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        settings = get_settings()
+        _async_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.timeout_seconds, connect=settings.connect_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive,
+                keepalive_expiry=settings.keepalive_expiry_seconds,
+            ),
+        )
+        logger.debug("Shared httpx.AsyncClient created.")
+    return _async_client
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def arequest(method: str, url: str, timeout: Optional[float] = None, **kwargs) -> httpx.Response:
+    """
+    Async twin of `request`, on the shared `httpx.AsyncClient`.
+
+    Idempotent requests are retried on transport errors and 429/5xx
+    responses with jittered exponential backoff (or the server's
+    Retry-After), as long as the request deadline leaves time for the wait.
+
+    Raises
+    ------
+    httpx.TransportError
+        When the last attempt could not reach the server.
+    DeadlineExceeded
+        If the deadline has already passed.
+    """
+    settings = get_settings()
+    retries = settings.retries if method.upper() in IDEMPOTENT_METHODS else 0
+    attempt = 0
+    while True:
+        connect, read = request_timeout(timeout)
+        metrics.incr("http.requests")
+        response, error = None, None
+        try:
+            response = await get_async_client().request(
+                method, url, timeout=httpx.Timeout(read, connect=connect), **kwargs
+            )
+            if response.status_code not in RETRY_STATUSES or attempt >= retries:
+                return response
+            delay = _retry_after(response) or settings.backoff(attempt + 1)
+            reason = f"status {response.status_code}"
+        except httpx.TransportError as e:
+            if attempt >= retries:
+                raise
+            delay, reason, error = settings.backoff(attempt + 1), type(e).__name__, e
+
+        left = remaining()
+        if left is not None and left <= delay:
+            # No time for another attempt; report the last outcome
+            if error is not None:
+                raise error
+            return response
+        attempt += 1
+        metrics.incr("http.retries")
+        logger.warning(f"Retrying {method} {url} in {delay:.2f}s after {reason} (attempt {attempt}/{retries}).")
+        await asyncio.sleep(delay)
+
+
+def close_session() -> None:
+    """
+    Close the shared synchronous session.
+    """
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            logger.debug("Shared requests.Session closed.")
+        _session = None
+
+
+async def aclose_async_client() -> None:
+    """
+    Close the shared HTTP clients (called on application shutdown).
+    """
+    global _async_client
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+        logger.debug("Shared httpx.AsyncClient closed.")
+    _async_client = None
+    close_session()
@@ -0,0 +1,215 @@
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional
+from src.logger import logger
+from src.utils.metrics import metrics
+from src.utils.sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          TEXT PRIMARY KEY,
+    query       TEXT NOT NULL,
+    thread_id   TEXT,
+    status      TEXT NOT NULL,
+    answer      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs (updated_at);
+"""
+
+# Job lifecycle: queued -> running -> succeeded | failed
+PENDING_STATUSES = ("queued", "running")
+
+
+class JobStore(SQLiteStore):
+    """
+    Persistent record of asynchronous plan jobs with retention limits.
+
+    Example:
+        store = JobStore(".cache/jobs.sqlite3", max_age_seconds=604800, max_jobs=10000)
+        job_id = store.create("3 day trip to Goa", thread_id="user-42")
+        store.update(job_id, "succeeded", answer=plan)
+        store.get(job_id)
+    """
+
+    def __init__(self, path: str, max_age_seconds: float = 604800, max_jobs: int = 10000):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file.
+        max_age_seconds : float, optional
+            Finished jobs older than this are deleted, by default one week.
+        max_jobs : int, optional
+            Oldest finished jobs beyond this count are deleted, by default 10000.
+        """
+        super().__init__(path, SCHEMA)
+        self.max_age_seconds = max_age_seconds
+        self.max_jobs = max_jobs
+        # Stores created before jobs could continue a session lack the column
+        if "thread_id" not in {row["name"] for row in self.execute("PRAGMA table_info(jobs)")}:
+            self.execute("ALTER TABLE jobs ADD COLUMN thread_id TEXT")
+
+    def create(self, query: str, thread_id: Optional[str] = None) -> str:
+        """Record a new queued job (a turn of session `thread_id`, if given) and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self.execute(
+            "INSERT INTO jobs (id, query, thread_id, status, created_at, updated_at) "
+            "VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, query, thread_id, now, now),
+        )
+        return job_id
+
+    def update(self, job_id: str, status: str, answer: Optional[str] = None,
+               error: Optional[str] = None) -> None:
+        """Move a job to a new status, storing its answer or error."""
+        self.execute(
+            "UPDATE jobs SET status = ?, answer = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, answer, error, time.time(), job_id),
+        )
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return the job as a dict, or None if it does not exist (or was pruned)."""
+        rows = self.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return dict(rows[0]) if rows else None
+
+    def pending(self) -> List[str]:
+        """Ids of jobs left queued or running, oldest first (e.g. after a restart)."""
+        rows = self.execute(
+            "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at", PENDING_STATUSES
+        )
+        return [row["id"] for row in rows]
+
+    def prune(self) -> int:
+        """
+        Apply the retention limits to finished jobs.
+
+        Returns
+        -------
+        int
+            Number of deleted jobs.
+        """
+        deleted = self.execute_count(
+            "DELETE FROM jobs WHERE status NOT IN (?, ?) AND updated_at < ?",
+            (*PENDING_STATUSES, time.time() - self.max_age_seconds),
+        )
+        deleted += self.execute_count(
+            "DELETE FROM jobs WHERE id IN ("
+            "SELECT id FROM jobs WHERE status NOT IN (?, ?) "
+            "ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (*PENDING_STATUSES, self.max_jobs),
+        )
+        if deleted:
+            metrics.incr("jobs.pruned", deleted)
+            logger.debug(f"Job store pruned {deleted} finished jobs.")
+        return deleted
+
+
+class JobWorkerPool:
+    """
+    Fixed pool of asyncio workers that run queued jobs through `handler`.
+
+    Example:
+        pool = JobWorkerPool(store, handler=lambda query, thread_id: answer(query, thread_id), workers=4)
+        pool.start()
+        pool.submit(store.create(query))
+        await pool.stop()
+    """
+
+    def __init__(self, store: JobStore, handler: Callable[[str, Optional[str]], Awaitable[str]],
+                 workers: int = 4):
+        """
+        Parameters
+        ----------
+        store : JobStore
+            Where job state is read and written.
+        handler : Callable[[str, Optional[str]], Awaitable[str]]
+            Coroutine function turning a query and its session's thread id
+            (None outside a session) into its final answer.
+        workers : int, optional
+            Number of concurrent workers, by default 4.
+        """
+        self.store = store
+        self.handler = handler
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        """Start the workers and re-queue jobs interrupted by a previous shutdown."""
+        for job_id in self.store.pending():
+            self._queue.put_nowait(job_id)
+        if self._queue.qsize():
+            logger.info(f"Re-queued {self._queue.qsize()} unfinished jobs.")
+        self._tasks = [asyncio.create_task(self._work(i)) for i in range(self.workers)]
+        metrics.set_gauge("jobs.queue_depth", self._queue.qsize())
+
+    def submit(self, job_id: str) -> None:
+        """Queue a job created in the store."""
+        self._queue.put_nowait(job_id)
+        metrics.incr("jobs.submitted")
+        metrics.set_gauge("jobs.queue_depth", self._queue.qsize())
+
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    async def stop(self) -> None:
+        """Cancel the workers; unfinished jobs stay pending in the store."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _work(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            metrics.set_gauge("jobs.queue_depth", self._queue.qsize())
+            try:
+                await self._run(worker_id, job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # A store error (e.g. SQLite busy or disk full) must not kill the worker
+                logger.exception(f"Worker {worker_id} could not process job {job_id}.")
+                metrics.incr("jobs.worker_errors")
+                await self._mark_failed(job_id, "Internal error while processing the job.")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, worker_id: int, job_id: str) -> None:
+        """Run one job and record its outcome."""
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None:
+            return
+        logger.info(f"Worker {worker_id} running job {job_id}.")
+        await asyncio.to_thread(self.store.update, job_id, "running")
+        started = time.perf_counter()
+        try:
+            answer = await self.handler(job["query"], job["thread_id"])
+            await asyncio.to_thread(self.store.update, job_id, "succeeded", answer)
+            metrics.incr("jobs.succeeded")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed.")
+            await self._mark_failed(job_id, getattr(e, "error_message", str(e)))
+        metrics.observe("jobs.run_ms", (time.perf_counter() - started) * 1000)
+        try:
+            await asyncio.to_thread(self.store.prune)
+        except Exception:
+            logger.exception("Pruning finished jobs failed.")
+
+    async def _mark_failed(self, job_id: str, error: str) -> None:
+        """Record a job as failed; a store error here is logged, not raised."""
+        try:
+            await asyncio.to_thread(self.store.update, job_id, "failed", None, error)
+            metrics.incr("jobs.failed")
+        except Exception:
+            logger.exception(f"Could not mark job {job_id} as failed.")
@@ -0,0 +1,386 @@
+"""
+Local BM25 index over every place-search result the agent has received.
+
+    python -m src.utils.knowledge_index stats
+    python -m src.utils.knowledge_index search "beaches near panjim" --place goa --category attractions
+    python -m src.utils.knowledge_index compact --max-age-days 180
+    python -m src.utils.knowledge_index rebuild
+"""
+import argparse
+import hashlib
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+import numpy as np
+from src.logger import logger
+from src.utils.metrics import metrics
+from src.utils.single_flight import normalize_query
+from src.utils.sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    key         TEXT NOT NULL UNIQUE,
+    place       TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    title       TEXT NOT NULL DEFAULT '',
+    url         TEXT NOT NULL DEFAULT '',
+    content     TEXT NOT NULL,
+    length      INTEGER NOT NULL,
+    fetched_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_place ON documents (place, category, fetched_at);
+CREATE TABLE IF NOT EXISTS postings (
+    term    TEXT NOT NULL,
+    doc_id  INTEGER NOT NULL,
+    tf      INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+"""
+
+_TOKEN = re.compile(r"[^\W_]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in into is it its of on or that the their there these this "
+    "to was were what which with you your top best around near".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords and single characters."""
+    return [token for token in _TOKEN.findall(str(text).casefold())
+            if len(token) > 1 and token not in _STOPWORDS]
+
+
+def _documents_from_result(result: Any) -> List[Dict[str, str]]:
+    """Split a place-search result (answer text, Tavily response or hit list) into documents."""
+    if isinstance(result, str):
+        return [{"title": "", "url": "", "content": result}] if result.strip() else []
+    documents = []
+    if isinstance(result, dict):
+        if result.get("answer"):
+            documents.append({"title": "", "url": "", "content": str(result["answer"])})
+        hits = result.get("results") or []
+    else:
+        hits = result if isinstance(result, list) else []
+    for hit in hits:
+        if isinstance(hit, dict) and hit.get("content"):
+            documents.append({
+                "title": str(hit.get("title") or ""),
+                "url": str(hit.get("url") or ""),
+                "content": str(hit["content"]),
+            })
+    return documents
+
+
+class KnowledgeIndex(SQLiteStore):
+    """
+    Persistent inverted index of place-search results, ranked with BM25.
+
+    Documents (Tavily answers and hits) are stored with their place,
+    category and fetch time; their term frequencies form an inverted index
+    in the same database. Queries read the postings of their terms and score
+    the candidate documents with BM25 as NumPy array operations.
+
+    Example:
+        index = KnowledgeIndex(".cache/knowledge.sqlite3")
+        index.add("Goa", "attractions", tavily_result)
+        hits = index.search("beaches and forts", place="Goa", category="attractions", top_k=5)
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file.
+        k1, b : float, optional
+            BM25 term-frequency saturation and length normalization, by default 1.5 and 0.75.
+        """
+        super().__init__(path, SCHEMA)
+        self.k1 = k1
+        self.b = b
+
+    @staticmethod
+    def _doc_key(place: str, category: str, document: Dict[str, str]) -> str:
+        raw = "\x1f".join([place, category, document["url"], document["content"]])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _index_documents(self, doc_ids: List[int], texts: List[str]) -> None:
+        """Write the postings of freshly stored documents."""
+        rows = []
+        for doc_id, text in zip(doc_ids, texts):
+            rows.extend((term, doc_id, tf) for term, tf in Counter(tokenize(text)).items())
+        if rows:
+            self.execute_many("INSERT OR IGNORE INTO postings (term, doc_id, tf) VALUES (?, ?, ?)", rows)
+
+    def add(self, place: str, category: str, result: Any, fetched_at: Optional[float] = None) -> int:
+        """
+        Index a place-search result.
+
+        Parameters
+        ----------
+        place, category : str
+            What was searched.
+        result : Any
+            The search result (answer text, Tavily response or list of hits).
+        fetched_at : float, optional
+            When the result was fetched from upstream (e.g. the creation time
+            of the search-cache entry it was served from), by default now.
+            Already-indexed documents of the result move forward to this
+            time, never back.
+
+        Returns
+        -------
+        int
+            Number of new documents.
+        """
+        place = normalize_query(place)
+        documents = _documents_from_result(result)
+        if not place or not documents:
+            return 0
+        now = time.time() if fetched_at is None else fetched_at
+        keyed = {self._doc_key(place, category, document): document for document in documents}
+        marks = ",".join("?" * len(keyed))
+        existing = {row["key"] for row in self.execute(f"SELECT key FROM documents WHERE key IN ({marks})", keyed)}
+        if existing:
+            self.execute(f"UPDATE documents SET fetched_at = MAX(fetched_at, ?) WHERE key IN ({marks})", (now, *keyed))
+
+        new = {key: document for key, document in keyed.items() if key not in existing}
+        if not new:
+            return 0
+        self.execute_many(
+            "INSERT OR IGNORE INTO documents (key, place, category, title, url, content, length, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (key, place, category, doc["title"], doc["url"], doc["content"],
+                 len(tokenize(f"{doc['title']} {doc['content']}")), now)
+                for key, doc in new.items()
+            ],
+        )
+        rows = self.execute(f"SELECT id, key FROM documents WHERE key IN ({','.join('?' * len(new))})", new)
+        self._index_documents(
+            [row["id"] for row in rows], [f"{new[row['key']]['title']} {new[row['key']]['content']}" for row in rows]
+        )
+        metrics.incr("knowledge.documents_added", len(new))
+        return len(new)
+
+    def age(self, place: str, category: str) -> Optional[float]:
+        """Seconds since the newest document of a place and category was fetched, or None without any."""
+        rows = self.execute(
+            "SELECT MAX(fetched_at) AS fetched_at FROM documents WHERE place = ? AND category = ?",
+            (normalize_query(place), category),
+        )
+        fetched_at = rows[0]["fetched_at"] if rows else None
+        return None if fetched_at is None else time.time() - fetched_at
+
+    def search(self, query: str, place: Optional[str] = None, category: Optional[str] = None,
+               top_k: int = 8) -> List[Dict[str, Any]]:
+        """
+        Rank documents against a free-text query with BM25.
+
+        Parameters
+        ----------
+        query : str
+            Search text.
+        place, category : str, optional
+            Restrict the results to one place and/or category.
+        top_k : int, optional
+            Number of documents returned, by default 8.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            Documents with `title`, `url`, `content`, `place`, `category`,
+            `fetched_at` and `score`, best first.
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        filters, params = [], []
+        if place:
+            filters.append("d.place = ?")
+            params.append(normalize_query(place))
+        if category:
+            filters.append("d.category = ?")
+            params.append(category)
+        marks = ",".join("?" * len(terms))
+
+        stats = self.execute("SELECT COUNT(*) AS n, AVG(length) AS avgdl FROM documents")[0]
+        if not stats["n"]:
+            return []
+        df_rows = self.execute(
+            f"SELECT term, COUNT(*) AS df FROM postings WHERE term IN ({marks}) GROUP BY term", terms
+        )
+        rows = self.execute(
+            f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p JOIN documents d ON d.id = p.doc_id "
+            f"WHERE p.term IN ({marks}){''.join(' AND ' + f for f in filters)}",
+            (*terms, *params),
+        )
+        if not rows:
+            return []
+
+        # BM25: idf(t) * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl)), summed per document
+        n_docs, avgdl = stats["n"], max(stats["avgdl"] or 1.0, 1.0)
+        term_index = {term: i for i, term in enumerate(terms)}
+        df = np.zeros(len(terms))
+        for row in df_rows:
+            df[term_index[row["term"]]] = row["df"]
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+        term_ids = np.fromiter((term_index[row["term"]] for row in rows), dtype=np.int64, count=len(rows))
+        doc_ids = np.fromiter((row["doc_id"] for row in rows), dtype=np.int64, count=len(rows))
+        tf = np.fromiter((row["tf"] for row in rows), dtype=float, count=len(rows))
+        dl = np.fromiter((row["length"] for row in rows), dtype=float, count=len(rows))
+        contributions = idf[term_ids] * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))
+
+        unique_docs, doc_index = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(doc_index, weights=contributions)
+        best = np.argsort(-scores, kind="stable")[:top_k]
+        ranked = {int(unique_docs[i]): float(scores[i]) for i in best}
+
+        documents = self.execute(
+            "SELECT id, place, category, title, url, content, fetched_at FROM documents "
+            f"WHERE id IN ({','.join('?' * len(ranked))})",
+            list(ranked),
+        )
+        results = [dict(row, score=round(ranked[row["id"]], 4)) for row in documents]
+        for result in results:
+            result.pop("id")
+        return sorted(results, key=lambda result: -result["score"])
+
+    def recent(self, place: str, category: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Newest documents of a place and category."""
+        rows = self.execute(
+            "SELECT place, category, title, url, content, fetched_at FROM documents "
+            "WHERE place = ? AND category = ? ORDER BY fetched_at DESC LIMIT ?",
+            (normalize_query(place), category, limit),
+        )
+        return [dict(row, score=0.0) for row in rows]
+
+    def rebuild(self) -> int:
+        """
+        Recompute every document's length and postings (e.g. after a tokenizer change).
+
+        Returns
+        -------
+        int
+            Number of documents indexed.
+        """
+        documents = self.execute("SELECT id, title, content FROM documents")
+        self.execute("DELETE FROM postings")
+        self.execute_many(
+            "UPDATE documents SET length = ? WHERE id = ?",
+            [(len(tokenize(f"{row['title']} {row['content']}")), row["id"]) for row in documents],
+        )
+        self._index_documents([row["id"] for row in documents],
+                              [f"{row['title']} {row['content']}" for row in documents])
+        logger.info(f"Knowledge index rebuilt over {len(documents)} documents.")
+        return len(documents)
+
+    def compact(self, max_age_seconds: Optional[float] = None) -> Dict[str, int]:
+        """
+        Drop superseded and old documents, then reclaim space.
+
+        A document is superseded when a newer one of the same place and
+        category has the same URL, or, for answer texts without a URL, when
+        a newer answer exists.
+
+        Parameters
+        ----------
+        max_age_seconds : float, optional
+            Also drop documents fetched longer ago than this.
+
+        Returns
+        -------
+        Dict[str, int]
+            Counts of `superseded`, `expired` and remaining `documents`.
+        """
+        superseded = self.execute_count(
+            "DELETE FROM documents WHERE id IN ("
+            "SELECT id FROM (SELECT id, ROW_NUMBER() OVER ("
+            "PARTITION BY place, category, url ORDER BY fetched_at DESC, id DESC) AS rank FROM documents) "
+            "WHERE rank > 1)"
+        )
+        expired = 0
+        if max_age_seconds is not None:
+            expired = self.execute_count(
+                "DELETE FROM documents WHERE fetched_at < ?", (time.time() - max_age_seconds,)
+            )
+        self.execute("DELETE FROM postings WHERE doc_id NOT IN (SELECT id FROM documents)")
+        self.execute("VACUUM")
+        remaining = self.execute("SELECT COUNT(*) AS n FROM documents")[0]["n"]
+        logger.info(f"Knowledge index compacted: {superseded} superseded, {expired} expired, {remaining} left.")
+        return {"superseded": superseded, "expired": expired, "documents": remaining}
+
+    def stats(self) -> Dict[str, Any]:
+        """Document, place and term counts, and documents per category."""
+        totals = self.execute(
+            "SELECT COUNT(*) AS documents, COUNT(DISTINCT place) AS places, "
+            "MIN(fetched_at) AS oldest, MAX(fetched_at) AS newest FROM documents"
+        )[0]
+        terms = self.execute("SELECT COUNT(DISTINCT term) AS n FROM postings")[0]["n"]
+        categories = self.execute("SELECT category, COUNT(*) AS n FROM documents GROUP BY category ORDER BY category")
+        return {
+            "documents": totals["documents"],
+            "places": totals["places"],
+            "terms": terms,
+            "oldest": totals["oldest"],
+            "newest": totals["newest"],
+            "categories": {row["category"]: row["n"] for row in categories},
+        }
+
+
+def _format_time(timestamp: Optional[float]) -> str:
+    return "-" if timestamp is None else time.strftime("%Y-%m-%d %H:%M", time.localtime(timestamp))
+
+
+def main(argv=None) -> None:
+    from src.utils.models import ConfigLoader
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", help="index database (default: knowledge.path in config.yaml)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="recompute the inverted index from the stored documents")
+    compact = commands.add_parser("compact", help="drop superseded/old documents and reclaim space")
+    compact.add_argument("--max-age-days", type=float, help="also drop documents older than this")
+    commands.add_parser("stats", help="show index size")
+    search = commands.add_parser("search", help="run a BM25 query")
+    search.add_argument("query")
+    search.add_argument("--place")
+    search.add_argument("--category")
+    search.add_argument("-k", "--top-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    config = ConfigLoader()
+    index = KnowledgeIndex(args.path or config.get("knowledge", "path", default=".cache/knowledge.sqlite3"))
+    try:
+        if args.command == "rebuild":
+            print(f"Indexed {index.rebuild()} documents.")
+        elif args.command == "compact":
+            max_age_days = args.max_age_days
+            if max_age_days is None:
+                retention = config.get("knowledge", "retention_seconds")
+                max_age_days = retention / 86400 if retention else None
+            result = index.compact(None if max_age_days is None else max_age_days * 86400)
+            print(f"Removed {result['superseded']} superseded and {result['expired']} expired documents; "
+                  f"{result['documents']} left.")
+        elif args.command == "stats":
+            stats = index.stats()
+            print(f"documents: {stats['documents']}  places: {stats['places']}  terms: {stats['terms']}")
+            print(f"fetched:   {_format_time(stats['oldest'])} .. {_format_time(stats['newest'])}")
+            for category, count in stats["categories"].items():
+                print(f"  {category:<16} {count}")
+        elif args.command == "search":
+            for hit in index.search(args.query, place=args.place, category=args.category, top_k=args.top_k):
+                snippet = re.sub(r"\s+", " ", hit["content"])[:160]
+                print(f"{hit['score']:7.3f}  [{hit['place']} / {hit['category']}] {hit['title'] or hit['url'] or '(answer)'}")
+                print(f"         {snippet}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
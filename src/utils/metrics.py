@@ -0,0 +1,127 @@
+import threading
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+
+def _pick(samples: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, int(round(p / 100.0 * (len(samples) - 1)))))
+    return samples[index]
+
+
+class LatencyTracker:
+    """
+    Keeps a sliding window of recent latency samples (in milliseconds)
+    and reports summary percentiles over that window.
+    """
+
+    def __init__(self, window: int = 1024):
+        """
+        Parameters
+        ----------
+        window : int, optional
+            Number of most recent samples kept, by default 1024.
+        """
+        self._samples = deque(maxlen=window)
+        self._count = 0
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value_ms: float) -> None:
+        """Record a single latency sample."""
+        with self._lock:
+            self._samples.append(float(value_ms))
+            self._count += 1
+            self._total += float(value_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Return the p-th percentile (0-100) of the current window,
+        or None if no samples were recorded yet.
+        """
+        with self._lock:
+            samples = sorted(self._samples)
+        return _pick(samples, p)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """Summary of all samples seen and percentiles of the current window."""
+        with self._lock:
+            samples = sorted(self._samples)
+            count, total = self._count, self._total
+
+        def pick(p: float) -> Optional[float]:
+            value = _pick(samples, p)
+            return round(value, 2) if value is not None else None
+
+        return {
+            "count": count,
+            "mean_ms": round(total / count, 2) if count else None,
+            "p50_ms": pick(50),
+            "p95_ms": pick(95),
+            "p99_ms": pick(99),
+            "max_ms": round(samples[-1], 2) if samples else None,
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide, thread-safe registry of counters, gauges and latency trackers.
+
+    Example:
+        metrics.incr("query.requests")
+        metrics.observe("query.latency_ms", 1234.5)
+        metrics.snapshot()
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._gauges: Dict[str, float] = {}
+        self._latencies: Dict[str, LatencyTracker] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: float = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set a gauge to an absolute value."""
+        with self._lock:
+            self._gauges[name] = value
+
+    def tracker(self, name: str) -> LatencyTracker:
+        """Return (creating if needed) the latency tracker registered under `name`."""
+        with self._lock:
+            if name not in self._latencies:
+                self._latencies[name] = LatencyTracker()
+            return self._latencies[name]
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """Record a latency sample."""
+        self.tracker(name).observe(value_ms)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> dict:
+        """Return a JSON-serialisable view of every metric."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            latencies = dict(self._latencies)
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "latencies": {name: tracker.snapshot() for name, tracker in latencies.items()},
+        }
+
+
+metrics = MetricsRegistry()
@@ -48,6 +48,20 @@ class ConfigLoader:
         """Allow dictionary-style access to config dictionary."""
         return self.config.get(key)
 
+    def get(self, *keys: str, default: Any = None) -> Any:
+        """
+        Nested lookup that tolerates missing sections.
+
+        Example:
+            config.get("server", "batch", "max_concurrency", default=8)
+        """
+        node = self.config
+        for key in keys:
+            if not isinstance(node, dict) or key not in node:
+                return default
+            node = node[key]
+        return default if node is None else node
+
 
 class ModelLoader(BaseModel):
     """
@@ -69,10 +83,27 @@ class ModelLoader(BaseModel):
             logger.exception("❌ Failed to initialize ConfigLoader inside ModelLoader")
             raise CustomException(f"Config initialization failed: {e}")
 
-    def load_llm(self):
+    def model_name_for(self, role: Optional[str] = None) -> str:
+        """
+        Model configured for a role (`llm.roles.<role>.model_name`), falling
+        back to `llm.groq.model_name`.
+        """
+        if self.config is None:
+            self.config = ConfigLoader()
+        default = self.config.get("llm", "groq", "model_name")
+        if role is None:
+            return default
+        return self.config.get("llm", "roles", role, "model_name", default=default)
+
+    def load_llm(self, role: Optional[str] = None):
         """
         Load and return the Groq LLM instance.
 
+        Args:
+            role (str, optional): Model role from `llm.roles` in config.yaml
+                (e.g. "router", "synthesis"). Without a role, or for a role
+                that is not configured, `llm.groq.model_name` is used.
+
         Returns:
             ChatGroq: Initialized Groq chat model instance.
 
@@ -80,13 +111,8 @@ class ModelLoader(BaseModel):
             CustomException: If required configuration or dependencies are missing.
         """
         try:
-            if self.config is None:
-                self.config = ConfigLoader()
-
             # Extract model name safely
-            model_name = (
-                self.config['llm']['groq']['model_name']
-            )
+            model_name = self.model_name_for(role)
 
             if not model_name:
                 logger.error("❌ 'model_name' missing in config under llm.groq")
@@ -100,8 +126,11 @@ class ModelLoader(BaseModel):
             if not groq_api_key:
                 logger.warning("⚠️ GROQ_API_KEY not found in environment variables.")
 
-            logger.info(f"🔄 Loading Groq LLM with model: {model_name}")
-            llm = ChatGroq(model=model_name, api_key=groq_api_key)
+            # Optional per-role generation limit
+            max_tokens = self.config.get("llm", "roles", role, "max_tokens") if role else None
+
+            logger.info(f"🔄 Loading Groq LLM with model: {model_name}" + (f" (role: {role})" if role else ""))
+            llm = ChatGroq(model=model_name, api_key=groq_api_key, max_tokens=max_tokens)
             logger.info("✅ Groq LLM loaded successfully.")
             return llm
 
@@ -1,5 +1,12 @@
+import asyncio
+import contextvars
 import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple, Union
 from langchain_tavily import TavilySearch
+from src.utils.search_cache import SearchCache
+from src.utils.metrics import metrics
 from src.logger import logger
 from src.exception import CustomException
 from dotenv import load_dotenv
@@ -10,38 +17,199 @@ class TavilyPlaceSearchTool:
     """
     Wrapper around Tavily Search for retrieving attractions, restaurants,
     activities, and transportation options for a given place.
+
+    One `TavilySearch` client is created on first use and shared by every
+    query, sync and async. With a `SearchCache`, category searches are
+    answered from disk while their entry is within the category's TTL.
+    Concurrent searches of the same category and place, from threads or
+    coroutines, share one upstream query.
+
+    Example:
+        search = TavilyPlaceSearchTool()
+        hotels = search.search("hotels", "Goa")
+        overview = await search.asearch_many("Goa")   # every category concurrently
     """
 
-    def __init__(self):
+    # Search query template for each place category
+    QUERY_TEMPLATES = {
+        "attractions": "top attractive places in and around {place}",
+        "restaurants": "what are the top 10 restaurants and eateries in and around {place}.",
+        "activities": "activities in and around {place}",
+        "transportation": "What are the different modes of transportations available in {place}",
+        "hotels": "hotels in {place}",
+    }
+
+    def __init__(self, max_workers: int = 10, cache: Optional[SearchCache] = None):
         """
         Initialize TavilyPlaceSearchTool.
+
+        Parameters
+        ----------
+        max_workers : int, optional
+            Thread pool size for concurrent category searches (sync path), by default 10.
+        cache : SearchCache, optional
+            Persistent cache of category search results.
         """
+        self.cache = cache
+        self._client: Optional[TavilySearch] = None
+        self._client_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tavily")
+        # In-flight searches by (category, normalized place), joined by sync and async callers alike
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
         logger.info("TavilyPlaceSearchTool initialized successfully.")
 
+    def close(self) -> None:
+        """Stop the thread pool; searches already running finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def client(self) -> TavilySearch:
+        """The shared TavilySearch client, created on first use."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = TavilySearch(topic="general", include_answer="advanced")
+                    logger.debug("Shared TavilySearch client created.")
+        return self._client
+
     def tavily_search_attractions(self, place: str) -> dict:
         """Search for top attractions in and around the place."""
-        return self._run_query(f"top attractive places in and around {place}")
+        return self.search("attractions", place)
 
     def tavily_search_restaurants(self, place: str) -> dict:
         """Search for top 10 restaurants in and around the place."""
-        return self._run_query(
-            f"what are the top 10 restaurants and eateries in and around {place}."
-        )
+        return self.search("restaurants", place)
 
     def tavily_search_activity(self, place: str) -> dict:
         """Search for popular activities in and around the place."""
-        return self._run_query(f"activities in and around {place}")
+        return self.search("activities", place)
 
     def tavily_search_transportation(self, place: str) -> dict:
         """Search for available modes of transportation in the place."""
-        return self._run_query(
-            f"What are the different modes of transportations available in {place}"
-        )
+        return self.search("transportation", place)
 
     def tavily_search_hotels(self, place: str) -> dict:
         """Search for hotels in the place."""
-        return self._run_query(f"hotels in {place}")
+        return self.search("hotels", place)
+
+    def _cached(self, category: str, place: str):
+        try:
+            return self.cache.get(place, category)
+        except Exception:
+            # The cache only saves quota; never fail a search over it
+            logger.exception(f"Search cache lookup failed for {category} in {place}.")
+            return None
+
+    def _store(self, category: str, place: str, result) -> None:
+        try:
+            self.cache.set(place, category, result)
+        except Exception:
+            logger.exception(f"Could not cache {category} search for {place}.")
+
+    def _join(self, category: str, place: str) -> Tuple[str, Future, bool]:
+        """
+        The in-flight search of a category and place, or a new one led by the
+        caller: returns its key, its future and whether the caller leads it.
+        """
+        key = SearchCache.make_key(place, category)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                metrics.incr("search.singleflight.coalesced")
+                return key, future, False
+            future = self._inflight[key] = Future()
+            # Running futures cannot be cancelled, so a caller that gives up never cancels the others
+            future.set_running_or_notify_cancel()
+        metrics.incr("search.singleflight.leaders")
+        return key, future, True
+
+    def _land(self, key: str, future: Future, result=None, error: Optional[BaseException] = None) -> None:
+        """Hand the leader's outcome to every joined caller."""
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
+        if error is None:
+            future.set_result(result)
+        else:
+            # A cancelled leader must not cancel the callers that joined it
+            future.set_exception(
+                error if isinstance(error, Exception) else CustomException(f"Search cancelled: {key!r}")
+            )
+
+    def search(self, category: str, place: str) -> dict:
+        """Search a category (see `QUERY_TEMPLATES`) for the place."""
+        key, future, leader = self._join(category, place)
+        if not leader:
+            return future.result()
+        try:
+            result = self._cached(category, place) if self.cache is not None else None
+            if result is None:
+                result = self._run_query(self.QUERY_TEMPLATES[category].format(place=place))
+                if self.cache is not None:
+                    self._store(category, place, result)
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
+
+    async def asearch(self, category: str, place: str) -> dict:
+        """Asynchronously search a category (see `QUERY_TEMPLATES`) for the place."""
+        key, future, leader = self._join(category, place)
+        if not leader:
+            return await asyncio.shield(asyncio.wrap_future(future))
+        try:
+            result = await asyncio.to_thread(self._cached, category, place) if self.cache is not None else None
+            if result is None:
+                result = await self._arun_query(self.QUERY_TEMPLATES[category].format(place=place))
+                if self.cache is not None:
+                    await asyncio.to_thread(self._store, category, place, result)
+        except BaseException as e:
+            self._land(key, future, error=e)
+            raise
+        self._land(key, future, result)
+        return result
 
+    def search_many(self, place: str, categories: Optional[Iterable[str]] = None) -> Dict[str, Union[dict, Exception]]:
+        """
+        Search several categories for the place concurrently.
+
+        Parameters
+        ----------
+        place : str
+            The place to research.
+        categories : Iterable[str], optional
+            Categories to search, by default all of `QUERY_TEMPLATES`.
+
+        Returns
+        -------
+        Dict[str, Union[dict, Exception]]
+            Result per category, in the order given; a failed category maps
+            to its exception instead of failing the others.
+        """
+        categories = list(categories or self.QUERY_TEMPLATES)
+        futures = {
+            category: self._executor.submit(contextvars.copy_context().run, self.search, category, place)
+            for category in categories
+        }
+        results = {}
+        for category, future in futures.items():
+            try:
+                results[category] = future.result()
+            except Exception as e:
+                results[category] = e
+        return results
+
+    async def asearch_many(self, place: str,
+                           categories: Optional[Iterable[str]] = None) -> Dict[str, Union[dict, Exception]]:
+        """
+        Async twin of `search_many`.
+        """
+        categories = list(categories or self.QUERY_TEMPLATES)
+        results = await asyncio.gather(
+            *(self.asearch(category, place) for category in categories), return_exceptions=True
+        )
+        return dict(zip(categories, results))
 
     def _run_query(self, query: str) -> dict:
         """
@@ -49,8 +217,23 @@ class TavilyPlaceSearchTool:
         """
         try:
             logger.info(f"Running TavilySearch query: {query}")
-            tavily_tool = TavilySearch(topic="general", include_answer="advanced")
-            result = tavily_tool.invoke({"query": query})
+            result = self.client.invoke({"query": query})
+
+            if isinstance(result, dict) and result.get("answer"):
+                return result["answer"]
+
+            return result
+        except Exception as e:
+            logger.exception(f"TavilySearch query failed: {query}")
+            raise CustomException(f"TavilySearch query error: {e}")
+
+    async def _arun_query(self, query: str) -> dict:
+        """
+        Execute a query using TavilySearch without blocking the event loop.
+        """
+        try:
+            logger.info(f"Running TavilySearch query (async): {query}")
+            result = await self.client.ainvoke({"query": query})
 
             if isinstance(result, dict) and result.get("answer"):
                 return result["answer"]
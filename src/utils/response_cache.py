@@ -0,0 +1,134 @@
+import hashlib
+import time
+from typing import Optional, Tuple
+from src.logger import logger
+from src.utils.metrics import metrics
+from src.utils.single_flight import normalize_query
+from src.utils.sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    query       TEXT NOT NULL,
+    answer      TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access);
+"""
+
+
+class ResponseCache(SQLiteStore):
+    """
+    Persistent cache of full `/query` answers with TTL and LRU size eviction.
+
+    Keys combine the normalized query, the LLM model name and a hash of the
+    system prompt, so changing either one naturally misses the old entries.
+
+    Example:
+        cache = ResponseCache(".cache/responses.sqlite3", ttl_seconds=86400, max_entries=5000)
+        key = cache.make_key("3 day trip to Goa", "openai/gpt-oss-20b", SYSTEM_PROMPT.content)
+        cache.set(key, "3 day trip to Goa", answer)
+        cached = cache.get(key)  # (answer, age_seconds) or None
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, max_entries: int = 5000):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file.
+        ttl_seconds : float, optional
+            Entries older than this are treated as missing, by default one day.
+        max_entries : int, optional
+            Least-recently-used entries beyond this count are evicted, by default 5000.
+        """
+        super().__init__(path, SCHEMA)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(query: str, model_name: str, system_prompt: str) -> str:
+        """
+        Build the cache key for a query under the given model and system prompt.
+        """
+        prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+        raw = "\x1f".join([normalize_query(query), model_name or "", prompt_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached answer.
+
+        Returns
+        -------
+        tuple of (str, float) or None
+            The answer and its age in seconds, or None on a miss/expired entry.
+        """
+        now = time.time()
+        rows = self.execute("SELECT answer, created_at FROM responses WHERE key = ?", (key,))
+        if not rows or now - rows[0]["created_at"] > self.ttl_seconds:
+            if rows:
+                self.execute("DELETE FROM responses WHERE key = ?", (key,))
+                metrics.incr("cache.response.expired")
+            metrics.incr("cache.response.misses")
+            return None
+
+        self.execute(
+            "UPDATE responses SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+        )
+        metrics.incr("cache.response.hits")
+        return rows[0]["answer"], now - rows[0]["created_at"]
+
+    def set(self, key: str, query: str, answer: str) -> None:
+        """
+        Store an answer, then evict expired and least-recently-used entries.
+        """
+        now = time.time()
+        self.execute(
+            "INSERT OR REPLACE INTO responses (key, query, answer, created_at, last_access, hits) "
+            "VALUES (?, ?, ?, ?, ?, 0)",
+            (key, query, answer, now, now),
+        )
+        self.evict(now)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Remove expired entries and trim the table to `max_entries` by LRU.
+
+        Returns
+        -------
+        int
+            Number of evicted entries.
+        """
+        now = now or time.time()
+        evicted = self.execute_count(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        evicted += self.execute_count(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        if evicted:
+            metrics.incr("cache.response.evictions", evicted)
+            logger.debug(f"Response cache evicted {evicted} entries.")
+        return evicted
+
+    def invalidate(self, key: Optional[str] = None) -> int:
+        """
+        Delete one entry by key, or every entry when `key` is None.
+
+        Returns
+        -------
+        int
+            Number of deleted entries.
+        """
+        if key is None:
+            deleted = self.execute_count("DELETE FROM responses")
+        else:
+            deleted = self.execute_count("DELETE FROM responses WHERE key = ?", (key,))
+        logger.info(f"Response cache invalidated {deleted} entries.")
+        return deleted
@@ -0,0 +1,172 @@
+import json
+import time
+from typing import Any, Dict, Optional
+from src.logger import logger
+from src.utils.metrics import metrics
+from src.utils.single_flight import normalize_query
+from src.utils.sqlite_store import SQLiteStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS searches (
+    key         TEXT PRIMARY KEY,
+    place       TEXT NOT NULL,
+    category    TEXT NOT NULL,
+    result      TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_searches_last_access ON searches (last_access);
+CREATE INDEX IF NOT EXISTS idx_searches_category ON searches (category, created_at);
+"""
+
+
+class SearchCache(SQLiteStore):
+    """
+    Persistent cache of place-search results, keyed on normalized place and category.
+
+    Each category has its own TTL (attractions change over months, hotel
+    availability over hours). Once the stored results exceed `max_bytes`,
+    the least-recently-used entries are evicted.
+
+    Example:
+        cache = SearchCache(".cache/searches.sqlite3", ttl_seconds={"hotels": 21600}, max_bytes=64 << 20)
+        result = cache.get("Paris", "attractions")   # None on a miss
+        cache.set("Paris", "attractions", result)
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[Dict[str, float]] = None,
+                 default_ttl_seconds: float = 86400, max_bytes: int = 64 << 20):
+        """
+        Parameters
+        ----------
+        path : str
+            SQLite database file.
+        ttl_seconds : Dict[str, float], optional
+            Per-category TTLs; other categories use `default_ttl_seconds`.
+        default_ttl_seconds : float, optional
+            TTL of categories without an entry, by default one day.
+        max_bytes : int, optional
+            Total size of stored results beyond which LRU entries are evicted,
+            by default 64 MiB.
+        """
+        super().__init__(path, SCHEMA)
+        self.ttl_seconds = dict(ttl_seconds or {})
+        self.default_ttl_seconds = default_ttl_seconds
+        self.max_bytes = max_bytes
+        # Running total of stored result sizes, so writes only evict once over budget
+        self._bytes = self._stored_bytes()
+
+    def _stored_bytes(self) -> int:
+        return self.execute("SELECT COALESCE(SUM(size), 0) AS bytes FROM searches")[0]["bytes"]
+
+    def ttl_for(self, category: str) -> float:
+        """TTL in seconds of a category."""
+        return float(self.ttl_seconds.get(category, self.default_ttl_seconds))
+
+    @staticmethod
+    def make_key(place: str, category: str) -> str:
+        return f"{category}\x1f{normalize_query(place)}"
+
+    def _record(self, category: str, hit: bool) -> None:
+        prefix = f"cache.search.{category}"
+        metrics.incr(f"{prefix}.hits" if hit else f"{prefix}.misses")
+        hits, misses = metrics.counter(f"{prefix}.hits"), metrics.counter(f"{prefix}.misses")
+        metrics.set_gauge(f"{prefix}.hit_ratio", round(hits / (hits + misses), 4))
+
+    def get(self, place: str, category: str) -> Optional[Any]:
+        """
+        Look up the cached result of a place search.
+
+        Returns
+        -------
+        Any or None
+            The stored result, or None on a miss or expired entry.
+        """
+        key = self.make_key(place, category)
+        now = time.time()
+        rows = self.execute("SELECT result, size, created_at FROM searches WHERE key = ?", (key,))
+        if not rows or now - rows[0]["created_at"] > self.ttl_for(category):
+            if rows and self.execute_count("DELETE FROM searches WHERE key = ?", (key,)):
+                self._bytes -= rows[0]["size"]
+                metrics.incr("cache.search.expired")
+            self._record(category, hit=False)
+            return None
+
+        self.execute("UPDATE searches SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key))
+        self._record(category, hit=True)
+        return json.loads(rows[0]["result"])
+
+    def created_at(self, place: str, category: str) -> Optional[float]:
+        """When the stored result of a place search was fetched, or None without one."""
+        rows = self.execute("SELECT created_at FROM searches WHERE key = ?", (self.make_key(place, category),))
+        return rows[0]["created_at"] if rows else None
+
+    def set(self, place: str, category: str, result: Any) -> None:
+        """
+        Store a search result (empty results are skipped), evicting once the
+        stored results exceed `max_bytes`.
+        """
+        if not result:
+            return
+        now = time.time()
+        key = self.make_key(place, category)
+        payload = json.dumps(result, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        replaced = self.execute("SELECT size FROM searches WHERE key = ?", (key,))
+        self.execute(
+            "INSERT OR REPLACE INTO searches (key, place, category, result, size, created_at, last_access, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+            (key, place, category, payload, size, now, now),
+        )
+        self._bytes += size - (replaced[0]["size"] if replaced else 0)
+        if self._bytes > self.max_bytes:
+            self.evict(now)
+        else:
+            metrics.set_gauge("cache.search.bytes", self._bytes)
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """
+        Remove entries past their category's TTL, then trim the stored
+        results to `max_bytes` by LRU.
+
+        Returns
+        -------
+        int
+            Number of evicted entries.
+        """
+        now = now or time.time()
+        evicted = 0
+        for category, ttl in self.ttl_seconds.items():
+            evicted += self.execute_count(
+                "DELETE FROM searches WHERE category = ? AND created_at < ?", (category, now - ttl)
+            )
+        placeholders = ",".join("?" * len(self.ttl_seconds))
+        evicted += self.execute_count(
+            f"DELETE FROM searches WHERE category NOT IN ({placeholders}) AND created_at < ?",
+            (*self.ttl_seconds, now - self.default_ttl_seconds),
+        )
+        # Keep the most recently used entries whose running size fits the budget
+        evicted += self.execute_count(
+            "DELETE FROM searches WHERE key IN ("
+            "SELECT key FROM (SELECT key, SUM(size) OVER (ORDER BY last_access DESC, key) AS running "
+            "FROM searches) WHERE running > ?)",
+            (self.max_bytes,),
+        )
+        if evicted:
+            metrics.incr("cache.search.evictions", evicted)
+            logger.debug(f"Search cache evicted {evicted} entries.")
+        self._bytes = self._stored_bytes()
+        metrics.set_gauge("cache.search.bytes", self._bytes)
+        return evicted
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Entries, stored bytes and lifetime hits per category."""
+        rows = self.execute(
+            "SELECT category, COUNT(*) AS entries, SUM(size) AS bytes, SUM(hits) AS hits "
+            "FROM searches GROUP BY category"
+        )
+        return {row["category"]: {"entries": row["entries"], "bytes": row["bytes"], "hits": row["hits"]}
+                for row in rows}
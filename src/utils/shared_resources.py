@@ -0,0 +1,113 @@
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+def _close(resource: Any) -> None:
+    close = getattr(resource, "close", None)
+    if close is None:
+        return
+    try:
+        close()
+    except Exception as e:
+        logger.warning(f"Closing shared resource {resource!r} failed: {e}")
+
+
+class SharedResources:
+    """
+    Process-wide caches and stores shared by every GraphBuilder of the process.
+
+    Resources are keyed by their kind and settings. A rebuilt agent (e.g.
+    `/admin/reload`) asking for a resource with the same settings gets the
+    instance the previous agent already filled, so warm caches and open
+    SQLite connections survive the reload. Each resource counts the leases
+    holding it and is closed when the last one is released, e.g. once a
+    reload changed its settings and the previous agent is closed.
+
+    Example:
+        resources = SharedResources()
+        lease = resources.lease()
+        cache = lease.acquire("weather.current", {"ttl_seconds": 600}, lambda: TTLCache(...))
+        lease.release()  # closes `cache` unless another lease still holds it
+    """
+
+    def __init__(self):
+        self._items: Dict[Tuple[str, str], List[Any]] = {}  # key -> [resource, holders]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(kind: str, settings: dict) -> Tuple[str, str]:
+        return kind, json.dumps(settings, sort_keys=True, default=str)
+
+    def _acquire(self, key: Tuple[str, str], factory: Callable[[], Any]) -> Any:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                item = self._items[key] = [factory(), 0]
+                metrics.incr("resources.created")
+            else:
+                metrics.incr("resources.reused")
+            item[1] += 1
+            return item[0]
+
+    def _release(self, key: Tuple[str, str]) -> None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return
+            item[1] -= 1
+            if item[1] > 0:
+                return
+            del self._items[key]
+        logger.info(f"Closing shared {key[0]} no longer used by any agent.")
+        _close(item[0])
+
+    def lease(self) -> "ResourceLease":
+        """A new set of acquisitions that is released as a whole."""
+        return ResourceLease(self)
+
+    def close(self) -> None:
+        """Close every resource, whoever still holds it (process shutdown)."""
+        with self._lock:
+            items = list(self._items.values())
+            self._items.clear()
+        for resource, _ in items:
+            _close(resource)
+
+
+class ResourceLease:
+    """
+    The resources one GraphBuilder acquired from a `SharedResources`.
+    """
+
+    def __init__(self, resources: SharedResources):
+        self._resources = resources
+        self._keys: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def acquire(self, kind: str, settings: dict, factory: Callable[[], Any]) -> Any:
+        """
+        The shared resource of this kind and settings, created with `factory()`
+        when no lease holds one yet.
+        """
+        key = SharedResources._key(kind, settings)
+        resource = self._resources._acquire(key, factory)
+        with self._lock:
+            self._keys.append(key)
+        return resource
+
+    def release(self) -> None:
+        """Give up every acquired resource; idempotent."""
+        with self._lock:
+            keys, self._keys = self._keys, []
+        for key in keys:
+            self._resources._release(key)
+
+
+def acquire(lease: Optional[ResourceLease], kind: str, settings: dict, factory: Callable[[], Any]) -> Any:
+    """`lease.acquire(...)`, or a private `factory()` instance without a lease."""
+    if lease is None:
+        return factory()
+    return lease.acquire(kind, settings, factory)
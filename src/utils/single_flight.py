@@ -0,0 +1,91 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict
+from src.logger import logger
+from src.utils.metrics import metrics
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a user query so trivially different spellings share a key.
+
+    Collapses whitespace, case-folds and drops trailing punctuation, e.g.
+    "3 Day trip to  Goa!" -> "3 day trip to goa".
+    """
+    text = re.sub(r"\s+", " ", query or "").strip().casefold()
+    return text.rstrip(" .!?")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key (the leader) starts the work; callers that
+    arrive while it is still running await the same task and receive the
+    same result or exception. The shared task is only cancelled once every
+    waiter has gone away.
+
+    Example:
+        flight = SingleFlight("query.singleflight")
+        answer = await flight.run("3 day trip to goa", lambda: run_query(agent, query))
+    """
+
+    def __init__(self, metrics_prefix: str = "singleflight"):
+        """
+        Parameters
+        ----------
+        metrics_prefix : str, optional
+            Prefix for the `leaders` / `coalesced` counters, by default "singleflight".
+        """
+        self.metrics_prefix = metrics_prefix
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop the in-flight entry once its task finishes."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+            self._waiters.pop(key, None)
+        metrics.set_gauge(f"{self.metrics_prefix}.inflight_keys", len(self._inflight))
+        # Mark the exception as retrieved when every waiter has left early
+        if not task.cancelled():
+            task.exception()
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run `factory()` for `key`, or join the execution already in flight.
+
+        Parameters
+        ----------
+        key : str
+            Coalescing key; callers with equal keys share one execution.
+        factory : Callable[[], Awaitable]
+            Produces the coroutine to run when no execution is in flight.
+
+        Returns
+        -------
+        Any
+            Result of the shared execution.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda done: self._forget(key, done))
+            metrics.incr(f"{self.metrics_prefix}.leaders")
+            metrics.set_gauge(f"{self.metrics_prefix}.inflight_keys", len(self._inflight))
+        else:
+            metrics.incr(f"{self.metrics_prefix}.coalesced")
+            logger.info(f"Coalescing request onto in-flight execution: {key!r}")
+
+        self._waiters[key] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._inflight.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    logger.info(f"All waiters left, cancelling in-flight execution: {key!r}")
+                    task.cancel()
+            raise
@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+from typing import Iterable, List
+from src.logger import logger
+from src.exception import CustomException
+
+
+class SQLiteStore:
+    """
+    Thin, thread-safe wrapper around a single SQLite connection on local disk.
+
+    Subclasses pass their table definitions as `schema`; statements are run
+    in autocommit mode under one lock, so the store can be shared between
+    the event loop's worker threads.
+    """
+
+    def __init__(self, path: str, schema: str):
+        """
+        Parameters
+        ----------
+        path : str
+            Database file path; parent directories are created if needed.
+        schema : str
+            SQL script creating the tables/indexes (should use IF NOT EXISTS).
+        """
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self.path = path
+            self._lock = threading.Lock()
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(schema)
+            logger.info(f"SQLite store opened at {path}")
+        except Exception as e:
+            logger.exception(f"Failed to open SQLite store at {path}")
+            raise CustomException(f"SQLite store error: {e}")
+
+    def execute(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        """Run one statement and return all resulting rows."""
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def execute_count(self, sql: str, params: Iterable = ()) -> int:
+        """Run one statement and return the number of affected rows."""
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).rowcount
+
+    def execute_many(self, sql: str, rows: Iterable[Iterable]) -> None:
+        """Run one statement for every row of parameters in a single transaction."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(sql, (tuple(row) for row in rows))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        with self._lock:
+            self._conn.close()
+        logger.info(f"SQLite store closed at {self.path}")
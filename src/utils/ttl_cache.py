@@ -0,0 +1,268 @@
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from src.logger import logger
+from src.utils.metrics import metrics
+from src.utils.single_flight import SingleFlight
+
+
+class _Entry:
+    __slots__ = ("value", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, fresh_until: float, stale_until: float):
+        self.value = value
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class _KeyLock:
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.users = 0
+
+
+class TTLCache:
+    """
+    In-memory cache of upstream lookups with stale-while-revalidate.
+
+    An entry is served as a hit for `ttl_seconds`. For `stale_seconds` after
+    that it is still served immediately, while a single background refresh
+    fetches the new value. Older entries are reloaded in the foreground;
+    if that reload fails, the old value is served rather than the error.
+    Concurrent loads of one key share a single upstream call. Empty results
+    (failed lookups) are not cached.
+
+    With `align=True` entries expire at the next multiple of `ttl_seconds`
+    (wall clock, UTC), matching upstreams that publish on a fixed cadence.
+
+    Example:
+        cache = TTLCache("weather.current", ttl_seconds=600, stale_seconds=300)
+        data = cache.get("goa", lambda: fetch_current("Goa"))
+        data = await cache.aget("goa", lambda: afetch_current("Goa"))
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, stale_seconds: float = 0,
+                 max_entries: int = 1000, align: bool = False):
+        """
+        Parameters
+        ----------
+        name : str
+            Metrics prefix (`<name>.hits`, `<name>.misses`, ...).
+        ttl_seconds : float
+            How long an entry counts as fresh.
+        stale_seconds : float, optional
+            How long after that it is served while refreshing, by default 0.
+        max_entries : int, optional
+            Least-recently-used entries beyond this are evicted, by default 1000.
+        align : bool, optional
+            Expire entries on `ttl_seconds` boundaries instead of `ttl_seconds`
+            after the fetch, by default False.
+        """
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.align = align
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Only keys with a load in progress or waiting; dropped when the last user leaves
+        self._key_locks: Dict[Hashable, _KeyLock] = {}
+        self._refreshing: Dict[Hashable, Any] = {}
+        self._flight = SingleFlight(f"{name}.singleflight")
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stats = {event: 0 for event in ("hits", "stale_hits", "misses", "refreshes",
+                                              "refresh_failures", "stale_served")}
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            self._stats[event] += 1
+            lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"]
+            served = self._stats["hits"] + self._stats["stale_hits"]
+        metrics.incr(f"{self.name}.{event}")
+        if lookups:
+            metrics.set_gauge(f"{self.name}.hit_rate", round(served / lookups, 4))
+
+    def stats(self) -> Dict[str, float]:
+        """Event counts, current size and hit rate (fresh and stale hits over lookups)."""
+        with self._lock:
+            stats = dict(self._stats, entries=len(self._entries))
+        lookups = stats["hits"] + stats["stale_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + stats["stale_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _lookup(self, key: Hashable):
+        """The entry for `key` and whether it is "fresh", "stale" or "expired" (None when absent)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, None
+            self._entries.move_to_end(key)
+        if now < entry.fresh_until:
+            return entry, "fresh"
+        if now < entry.stale_until:
+            return entry, "stale"
+        return entry, "expired"
+
+    def peek(self, key: Hashable) -> Any:
+        """The value for `key` if it is fresh or within the stale window, else None (not counted in stats)."""
+        entry, state = self._lookup(key)
+        return entry.value if state in ("fresh", "stale") else None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value for `key` (falsy values are ignored)."""
+        if not value:
+            return
+        now = time.time()
+        if self.align and self.ttl_seconds > 0:
+            fresh_until = (now // self.ttl_seconds + 1) * self.ttl_seconds
+        else:
+            fresh_until = now + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = _Entry(value, fresh_until, fresh_until + self.stale_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _served_after_failure(self, key: Hashable, entry: Optional[_Entry], error: Exception) -> Any:
+        if entry is None:
+            raise error
+        self._count("stale_served")
+        logger.warning(f"{self.name}: reload of {key!r} failed, serving the previous value: {error}")
+        return entry.value
+
+    def close(self) -> None:
+        """Stop the background refresh pool; a later stale hit starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._refreshing.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    # Sync path
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            self.set(key, loader())
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_failures")
+            logger.warning(f"{self.name}: background refresh of {key!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{self.name}-refresh")
+            self._refreshing[key] = True
+        # No request context: the refresh must not inherit the caller's deadline
+        self._executor.submit(self._refresh, key, loader)
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Cached value for `key`, calling `loader()` on a miss.
+
+        Parameters
+        ----------
+        key : Hashable
+            Already-normalized cache key.
+        loader : Callable[[], Any]
+            Fetches the value from upstream.
+
+        Returns
+        -------
+        Any
+            The cached or freshly loaded value.
+        """
+        entry, state = self._lookup(key)
+        if state == "fresh":
+            self._count("hits")
+            return entry.value
+        if state == "stale":
+            self._count("stale_hits")
+            self._refresh_in_background(key, loader)
+            return entry.value
+
+        with self._lock:
+            key_lock = self._key_locks.get(key)
+            if key_lock is None:
+                key_lock = self._key_locks[key] = _KeyLock()
+            key_lock.users += 1
+        try:
+            with key_lock.lock:
+                # Another thread may have loaded it while we waited
+                entry, state = self._lookup(key)
+                if state in ("fresh", "stale"):
+                    self._count("hits")
+                    return entry.value
+                self._count("misses")
+                try:
+                    value = loader()
+                except Exception as e:
+                    return self._served_after_failure(key, entry, e)
+                self.set(key, value)
+                return value
+        finally:
+            with self._lock:
+                key_lock.users -= 1
+                if not key_lock.users:
+                    del self._key_locks[key]
+
+    # Async path
+
+    async def _arefresh(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            self.set(key, await loader())
+            self._count("refreshes")
+        except Exception as e:
+            self._count("refresh_failures")
+            logger.warning(f"{self.name}: background refresh of {key!r} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _arefresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            # Started from an empty context so it does not inherit the caller's deadline
+            self._refreshing[key] = contextvars.Context().run(asyncio.ensure_future, self._arefresh(key, loader))
+
+    async def aget(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async twin of `get`; `loader` returns an awaitable.
+        """
+        entry, state = self._lookup(key)
+        if state == "fresh":
+            self._count("hits")
+            return entry.value
+        if state == "stale":
+            self._count("stale_hits")
+            self._arefresh_in_background(key, loader)
+            return entry.value
+
+        self._count("misses")
+
+        async def load() -> Any:
+            value = await loader()
+            self.set(key, value)
+            return value
+
+        try:
+            return await self._flight.run(str(key), load)
+        except Exception as e:
+            return self._served_after_failure(key, entry, e)
@@ -1,31 +1,359 @@
+import asyncio
+import contextvars
+import re
+import unicodedata
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import httpx
+import numpy as np
 import requests
+from src.utils import http_client
+from src.utils.deadline import DeadlineExceeded
+from src.utils.metrics import metrics
+from src.utils.ttl_cache import TTLCache
 from src.logger import logger
 from src.exception import CustomException
 
 
+# 3-hour slots in OpenWeatherMap's free 5-day forecast (the most it returns)
+FORECAST_SLOTS = 40
+# Most city ids OpenWeatherMap's /group endpoint accepts per request
+GROUP_MAX_IDS = 20
+
+
+def normalize_city(city: str) -> str:
+    """
+    Cache key for a city name: accents, case, punctuation and spacing are
+    ignored, e.g. "  São Paulo, BR " -> "sao paulo,br".
+    """
+    text = unicodedata.normalize("NFKD", str(city))
+    text = "".join(char for char in text if not unicodedata.combining(char)).casefold()
+    text = re.sub(r"[^\w\s,]", " ", text)
+    text = re.sub(r"\s*,\s*", ",", text)
+    return re.sub(r"\s+", " ", text).strip(" ,")
+
+
+def daily_forecast(forecast_data: dict) -> List[Dict]:
+    """
+    Reduce a 3-hourly forecast payload to one row per local calendar day.
+
+    Slots are grouped by date in the city's timezone; temperatures,
+    precipitation (rain + snow) and precipitation probability are aggregated
+    per day as array operations.
+
+    Parameters
+    ----------
+    forecast_data : dict
+        OpenWeatherMap `/forecast` response.
+
+    Returns
+    -------
+    List[Dict]
+        Rows in date order with `date`, `min_c`, `max_c`, `precip_mm`,
+        `pop` (highest precipitation probability, 0-1), `conditions` (most
+        frequent description) and `slots` (number of 3-hour slots covered).
+    """
+    slots = (forecast_data or {}).get("list") or []
+    if not slots:
+        return []
+    offset = (forecast_data.get("city") or {}).get("timezone", 0)
+
+    local_day = (np.array([slot["dt"] for slot in slots], dtype=np.int64) + offset) // 86400
+    temp_min = np.array([slot.get("main", {}).get("temp_min", np.nan) for slot in slots], dtype=float)
+    temp_max = np.array([slot.get("main", {}).get("temp_max", np.nan) for slot in slots], dtype=float)
+    precip = np.array(
+        [(slot.get("rain") or {}).get("3h", 0.0) + (slot.get("snow") or {}).get("3h", 0.0) for slot in slots],
+        dtype=float,
+    )
+    pop = np.array([slot.get("pop", 0.0) for slot in slots], dtype=float)
+
+    days, day_index = np.unique(local_day, return_inverse=True)
+    mins = np.full(len(days), np.inf)
+    np.fmin.at(mins, day_index, temp_min)
+    maxs = np.full(len(days), -np.inf)
+    np.fmax.at(maxs, day_index, temp_max)
+    precip_mm = np.bincount(day_index, weights=precip, minlength=len(days))
+    pop_max = np.zeros(len(days))
+    np.maximum.at(pop_max, day_index, pop)
+    counts = np.bincount(day_index, minlength=len(days))
+
+    conditions = [Counter() for _ in days]
+    for i, slot in zip(day_index, slots):
+        description = (slot.get("weather") or [{}])[0].get("description")
+        if description:
+            conditions[i][description] += 1
+
+    return [
+        {
+            "date": datetime.fromtimestamp(int(day) * 86400, tz=timezone.utc).date(),
+            "min_c": round(float(mins[i]), 1),
+            "max_c": round(float(maxs[i]), 1),
+            "precip_mm": round(float(precip_mm[i]), 1),
+            "pop": round(float(pop_max[i]), 2),
+            "conditions": conditions[i].most_common(1)[0][0] if conditions[i] else "N/A",
+            "slots": int(counts[i]),
+        }
+        for i, day in enumerate(days)
+    ]
+
+
 class WeatherForecastTool:
     """
     A utility class for fetching current and forecast weather data
     using the OpenWeatherMap API.
 
+    When caches are given, lookups are keyed on the normalized city name
+    and served from them (see `TTLCache`); otherwise every call hits the API.
+
     Example:
         weather_tool = WeatherForecastTool(api_key="YOUR_API_KEY")
         current = weather_tool.get_current_weather("Mumbai")
         forecast = weather_tool.get_forecast_weather("Delhi")
+
+        # Inside a coroutine
+        current = await weather_tool.aget_current_weather("Mumbai")
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, current_cache: Optional[TTLCache] = None,
+                 forecast_cache: Optional[TTLCache] = None):
         """
         Initialize the WeatherForecastTool.
 
         Args:
             api_key (str): OpenWeatherMap API key.
+            current_cache (TTLCache, optional): Cache for current conditions.
+            forecast_cache (TTLCache, optional): Cache for forecasts.
         """
         self.api_key = api_key
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        self.current_cache = current_cache
+        self.forecast_cache = forecast_cache
+        # Normalized city name -> OpenWeatherMap city id, learnt from earlier responses
+        self._city_ids: Dict[str, int] = {}
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="weather")
         logger.debug("WeatherForecastTool initialized with provided API key.")
 
+    def close(self) -> None:
+        """Stop the thread pool; lookups already running finish in the background."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     def get_current_weather(self, place: str) -> dict:
+        """
+        Current weather of a place, from the cache when one is configured.
+
+        Args:
+            place (str): City or location name.
+
+        Returns:
+            dict: Weather data if successful, otherwise empty dict.
+
+        Raises:
+            CustomException: If the API call fails and nothing is cached.
+        """
+        if self.current_cache is None:
+            return self._fetch_current_weather(place)
+        return self.current_cache.get(normalize_city(place), lambda: self._fetch_current_weather(place))
+
+    async def aget_current_weather(self, place: str) -> dict:
+        """
+        Async twin of `get_current_weather`.
+        """
+        if self.current_cache is None:
+            return await self._afetch_current_weather(place)
+        return await self.current_cache.aget(normalize_city(place), lambda: self._afetch_current_weather(place))
+
+    def get_forecast_weather(self, place: str) -> dict:
+        """
+        Weather forecast for a place, from the cache when one is configured.
+
+        Args:
+            place (str): City or location name.
+
+        Returns:
+            dict: Forecast weather data if successful, otherwise empty dict.
+
+        Raises:
+            CustomException: If the API call fails and nothing is cached.
+        """
+        if self.forecast_cache is None:
+            return self._fetch_forecast_weather(place)
+        return self.forecast_cache.get(normalize_city(place), lambda: self._fetch_forecast_weather(place))
+
+    async def aget_forecast_weather(self, place: str) -> dict:
+        """
+        Async twin of `get_forecast_weather`.
+        """
+        if self.forecast_cache is None:
+            return await self._afetch_forecast_weather(place)
+        return await self.forecast_cache.aget(normalize_city(place), lambda: self._afetch_forecast_weather(place))
+
+    def get_current_and_forecast(self, place: str) -> Tuple[dict, dict]:
+        """
+        Current weather and the full 5-day forecast of a place, fetched concurrently.
+
+        Returns:
+            Tuple[dict, dict]: Current weather and forecast data (each empty on failure).
+
+        Raises:
+            CustomException: If either API call fails and nothing is cached.
+        """
+        forecast = self._executor.submit(contextvars.copy_context().run, self.get_forecast_weather, place)
+        current = self.get_current_weather(place)
+        return current, forecast.result()
+
+    async def aget_current_and_forecast(self, place: str) -> Tuple[dict, dict]:
+        """
+        Async twin of `get_current_and_forecast`.
+        """
+        current, forecast = await asyncio.gather(
+            self.aget_current_weather(place), self.aget_forecast_weather(place)
+        )
+        return current, forecast
+
+    @staticmethod
+    def _unique_places(places: List[str]) -> List[str]:
+        """Drop blank and duplicate (after normalization) city names, keeping the first spelling."""
+        unique = {}
+        for place in places:
+            key = normalize_city(place)
+            if key and key not in unique:
+                unique[key] = place.strip()
+        return list(unique.values())
+
+    def _remember_city_id(self, place: str, city_id) -> None:
+        if city_id:
+            self._city_ids[normalize_city(place)] = int(city_id)
+
+    def _group_batches(self, places: List[str]) -> List[Dict[int, str]]:
+        """
+        Places with a learnt city id and nothing cached, as batches of
+        city id -> place for the /group endpoint.
+        """
+        ids = {}
+        for place in places:
+            key = normalize_city(place)
+            if key in self._city_ids and (self.current_cache is None or self.current_cache.peek(key) is None):
+                ids[self._city_ids[key]] = place
+        items = list(ids.items())
+        return [dict(items[i:i + GROUP_MAX_IDS]) for i in range(0, len(items), GROUP_MAX_IDS)]
+
+    def _store_group(self, batch: Dict[int, str], data: dict) -> Dict[str, dict]:
+        """Map a /group response back to places, caching each city's entry."""
+        results = {}
+        for item in data.get("list") or []:
+            place = batch.get(item.get("id"))
+            if place is None:
+                continue
+            results[place] = item
+            if self.current_cache is not None:
+                self.current_cache.set(normalize_city(place), item)
+        metrics.incr("weather.group.requests")
+        metrics.incr("weather.group.cities", len(results))
+        return results
+
+    def _current_or_empty(self, place: str) -> dict:
+        try:
+            return self.get_current_weather(place)
+        except Exception as e:
+            logger.warning(f"Current weather for {place} unavailable: {e}")
+            return {}
+
+    async def _acurrent_or_empty(self, place: str) -> dict:
+        try:
+            return await self.aget_current_weather(place)
+        except Exception as e:
+            logger.warning(f"Current weather for {place} unavailable: {e}")
+            return {}
+
+    def get_current_weather_many(self, places: List[str]) -> Dict[str, dict]:
+        """
+        Current weather of several places at once.
+
+        Cached places are served from the cache. Places whose city id is
+        already known are fetched together through the /group endpoint (one
+        request per 20 cities); the rest are fetched concurrently, one
+        request each. A place that cannot be fetched maps to an empty dict.
+
+        Args:
+            places (List[str]): City or location names.
+
+        Returns:
+            Dict[str, dict]: Weather data per place, in input order (duplicates removed).
+        """
+        places = self._unique_places(places)
+        batches = self._group_batches(places)
+        grouped = {place for batch in batches for place in batch.values()}
+
+        def submit_each(pending: List[str]) -> dict:
+            return {
+                place: self._executor.submit(contextvars.copy_context().run, self._current_or_empty, place)
+                for place in pending
+            }
+
+        # Cities without a known id are fetched while the group requests run
+        singles = submit_each([place for place in places if place not in grouped])
+        results: Dict[str, dict] = {}
+        for batch in batches:
+            try:
+                results.update(self._store_group(batch, self._fetch_group(list(batch))))
+            except Exception as e:
+                logger.warning(f"Group weather request failed, fetching cities one by one: {e}")
+        retries = submit_each([place for place in grouped if place not in results])
+        results.update({place: future.result() for place, future in {**singles, **retries}.items()})
+        return {place: results[place] for place in places}
+
+    async def aget_current_weather_many(self, places: List[str]) -> Dict[str, dict]:
+        """
+        Async twin of `get_current_weather_many`.
+        """
+        places = self._unique_places(places)
+        batches = self._group_batches(places)
+        grouped = {place for batch in batches for place in batch.values()}
+        singles = [place for place in places if place not in grouped]
+
+        async def fetch_each(pending: List[str]) -> Dict[str, dict]:
+            return dict(zip(pending, await asyncio.gather(*(self._acurrent_or_empty(place) for place in pending))))
+
+        *responses, single_results = await asyncio.gather(
+            *(self._afetch_group(list(batch)) for batch in batches), fetch_each(singles), return_exceptions=True
+        )
+        results: Dict[str, dict] = dict(single_results)
+        for batch, data in zip(batches, responses):
+            if isinstance(data, Exception):
+                logger.warning(f"Group weather request failed, fetching cities one by one: {data}")
+                continue
+            results.update(self._store_group(batch, data))
+        results.update(await fetch_each([place for place in places if place not in results]))
+        return {place: results[place] for place in places}
+
+    def _fetch_group(self, city_ids: List[int]) -> dict:
+        """
+        Fetch the current weather of up to 20 cities by id in one request.
+
+        Raises:
+            CustomException: If the API call fails.
+        """
+        params = {"id": ",".join(map(str, city_ids)), "appid": self.api_key, "units": "metric"}
+        logger.info(f"Fetching current weather for {len(city_ids)} cities in one group request")
+        response = http_client.request("GET", f"{self.base_url}/group", params=params)
+        if response.status_code != 200:
+            raise CustomException(f"Group request failed with status {response.status_code}: {response.text}")
+        return response.json()
+
+    async def _afetch_group(self, city_ids: List[int]) -> dict:
+        """
+        Async twin of `_fetch_group`.
+        """
+        params = {"id": ",".join(map(str, city_ids)), "appid": self.api_key, "units": "metric"}
+        logger.info(f"Fetching current weather (async) for {len(city_ids)} cities in one group request")
+        response = await http_client.arequest("GET", f"{self.base_url}/group", params=params)
+        if response.status_code != 200:
+            raise CustomException(f"Group request failed with status {response.status_code}: {response.text}")
+        return response.json()
+
+    def _fetch_current_weather(self, place: str) -> dict:
         """
         Fetch the current weather of a place.
 
@@ -42,11 +370,13 @@ class WeatherForecastTool:
             url = f"{self.base_url}/weather"
             params = {"q": place, "appid": self.api_key, "units": "metric"}
             logger.info(f"Fetching current weather for: {place}")
-            response = requests.get(url, params=params, timeout=10)
+            response = http_client.request("GET", url, params=params)
 
             if response.status_code == 200:
                 logger.info(f"✅ Current weather fetched successfully for {place}")
-                return response.json()
+                data = response.json()
+                self._remember_city_id(place, data.get("id"))
+                return data
             else:
                 logger.error(
                     f"❌ Failed to fetch current weather for {place}. "
@@ -54,6 +384,8 @@ class WeatherForecastTool:
                 )
                 return {}
 
+        except DeadlineExceeded:
+            raise
         except requests.RequestException as e:
             logger.exception(f"❌ Network/API error while fetching current weather for {place}")
             raise CustomException(f"API request error: {e}")
@@ -61,9 +393,49 @@ class WeatherForecastTool:
             logger.exception("❌ Unexpected error in get_current_weather")
             raise CustomException(f"Unexpected error: {e}")
 
-    def get_forecast_weather(self, place: str) -> dict:
+    async def _afetch_current_weather(self, place: str) -> dict:
         """
-        Fetch the weather forecast for a place (next few intervals).
+        Asynchronously fetch the current weather of a place.
+
+        Args:
+            place (str): City or location name.
+
+        Returns:
+            dict: Weather data if successful, otherwise empty dict.
+
+        Raises:
+            CustomException: If the API call fails.
+        """
+        try:
+            url = f"{self.base_url}/weather"
+            params = {"q": place, "appid": self.api_key, "units": "metric"}
+            logger.info(f"Fetching current weather (async) for: {place}")
+            response = await http_client.arequest("GET", url, params=params)
+
+            if response.status_code == 200:
+                logger.info(f"✅ Current weather fetched successfully for {place}")
+                data = response.json()
+                self._remember_city_id(place, data.get("id"))
+                return data
+            else:
+                logger.error(
+                    f"❌ Failed to fetch current weather for {place}. "
+                    f"Status: {response.status_code}, Response: {response.text}"
+                )
+                return {}
+
+        except DeadlineExceeded:
+            raise
+        except httpx.HTTPError as e:
+            logger.exception(f"❌ Network/API error while fetching current weather for {place}")
+            raise CustomException(f"API request error: {e}")
+        except Exception as e:
+            logger.exception("❌ Unexpected error in aget_current_weather")
+            raise CustomException(f"Unexpected error: {e}")
+
+    def _fetch_forecast_weather(self, place: str) -> dict:
+        """
+        Fetch the 5-day weather forecast for a place (3-hour intervals).
 
         Args:
             place (str): City or location name.
@@ -79,15 +451,17 @@ class WeatherForecastTool:
             params = {
                 "q": place,
                 "appid": self.api_key,
-                "cnt": 10,  # Limit forecast count
+                "cnt": FORECAST_SLOTS,
                 "units": "metric",
             }
             logger.info(f"Fetching forecast weather for: {place}")
-            response = requests.get(url, params=params, timeout=10)
+            response = http_client.request("GET", url, params=params)
 
             if response.status_code == 200:
                 logger.info(f"✅ Forecast weather fetched successfully for {place}")
-                return response.json()
+                data = response.json()
+                self._remember_city_id(place, (data.get("city") or {}).get("id"))
+                return data
             else:
                 logger.error(
                     f"❌ Failed to fetch forecast weather for {place}. "
@@ -95,9 +469,56 @@ class WeatherForecastTool:
                 )
                 return {}
 
+        except DeadlineExceeded:
+            raise
         except requests.RequestException as e:
             logger.exception(f"❌ Network/API error while fetching forecast for {place}")
             raise CustomException(f"API request error: {e}")
         except Exception as e:
             logger.exception("❌ Unexpected error in get_forecast_weather")
             raise CustomException(f"Unexpected error: {e}")
+
+    async def _afetch_forecast_weather(self, place: str) -> dict:
+        """
+        Asynchronously fetch the 5-day weather forecast for a place (3-hour intervals).
+
+        Args:
+            place (str): City or location name.
+
+        Returns:
+            dict: Forecast weather data if successful, otherwise empty dict.
+
+        Raises:
+            CustomException: If the API call fails.
+        """
+        try:
+            url = f"{self.base_url}/forecast"
+            params = {
+                "q": place,
+                "appid": self.api_key,
+                "cnt": FORECAST_SLOTS,
+                "units": "metric",
+            }
+            logger.info(f"Fetching forecast weather (async) for: {place}")
+            response = await http_client.arequest("GET", url, params=params)
+
+            if response.status_code == 200:
+                logger.info(f"✅ Forecast weather fetched successfully for {place}")
+                data = response.json()
+                self._remember_city_id(place, (data.get("city") or {}).get("id"))
+                return data
+            else:
+                logger.error(
+                    f"❌ Failed to fetch forecast weather for {place}. "
+                    f"Status: {response.status_code}, Response: {response.text}"
+                )
+                return {}
+
+        except DeadlineExceeded:
+            raise
+        except httpx.HTTPError as e:
+            logger.exception(f"❌ Network/API error while fetching forecast for {place}")
+            raise CustomException(f"API request error: {e}")
+        except Exception as e:
+            logger.exception("❌ Unexpected error in aget_forecast_weather")
+            raise CustomException(f"Unexpected error: {e}")
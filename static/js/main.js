@@ -88,21 +88,112 @@ function setLoading(loading) {
   inputEl.disabled = loading
 }
 
-async function sendQuery(query) {
+// Parse one Server-Sent Event frame ("event: x\ndata: {...}") into { event, data }
+function parseSseFrame(frame) {
+  let event = "message"
+  const dataLines = []
+  for (const line of frame.split("\n")) {
+    if (line.startsWith("event:")) event = line.slice(6).trim()
+    else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim())
+  }
+  if (!dataLines.length) return null
   try {
-    const res = await fetch("/query", {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ query }),
-    })
-    const data = await res.json()
-    if (!res.ok) {
-      throw new Error(data?.error || "Unknown error")
+    return { event, data: JSON.parse(dataLines.join("\n")) }
+  } catch {
+    return null
+  }
+}
+
+const JOB_POLL_INTERVAL_MS = 2000
+const JOB_MAX_WAIT_MS = 15 * 60 * 1000
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
+// Submit the query as a background job and poll until it finishes.
+// Falls back to streaming /query when the backend has job mode disabled.
+async function sendQuery(query, onProgress = () => {}) {
+  const res = await fetch("/jobs", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query }),
+  })
+  if (res.status === 404) return streamQuery(query, onProgress)
+  const job = await res.json().catch(() => ({}))
+  if (!res.ok) throw new Error(job?.error || "Unknown error")
+
+  const startedAt = Date.now()
+  while (Date.now() - startedAt < JOB_MAX_WAIT_MS) {
+    await sleep(JOB_POLL_INTERVAL_MS)
+    const pollRes = await fetch(`/jobs/${encodeURIComponent(job.job_id)}`)
+    const data = await pollRes.json().catch(() => ({}))
+    if (!pollRes.ok) throw new Error(data?.error || "Unknown error")
+
+    if (data.status === "succeeded") return data.answer || "No answer returned."
+    if (data.status === "failed") throw new Error(data.error || "Plan generation failed.")
+
+    const elapsed = Math.round((Date.now() - startedAt) / 1000)
+    onProgress(`✨ Crafting your personalized travel plans... (${data.status}, ${elapsed}s)`)
+  }
+  throw new Error("Timed out waiting for the travel plan.")
+}
+
+// Stream the answer from /query, calling onProgress(text) as tokens arrive
+async function streamQuery(query, onProgress = () => {}) {
+  const res = await fetch("/query", {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ query }),
+  })
+  if (!res.ok || !res.body) {
+    const data = await res.json().catch(() => ({}))
+    throw new Error(data?.error || "Unknown error")
+  }
+
+  const reader = res.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+  let streamed = ""
+  // Plans streamed concurrently (parallel-plans topology), kept apart by section
+  const sections = {}
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary
+    while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+      const frame = parseSseFrame(buffer.slice(0, boundary))
+      buffer = buffer.slice(boundary + 2)
+      if (!frame) continue
+
+      if (frame.event === "token") {
+        if (frame.data.section) {
+          sections[frame.data.section] = (sections[frame.data.section] || "") + (frame.data.content || "")
+          streamed = Object.keys(sections).sort().map((name) => sections[name]).join("\n\n---\n\n")
+        } else {
+          streamed += frame.data.content || ""
+        }
+        onProgress(streamed)
+      } else if (frame.event === "tool_start") {
+        if (!streamed) onProgress(`✨ Looking up ${frame.data.tool.replace(/_/g, " ")}...`)
+      } else if (frame.event === "done") {
+        return frame.data.answer || streamed || "No answer returned."
+      } else if (frame.event === "error") {
+        throw new Error(frame.data.detail || "Unknown error")
+      }
     }
-    return data?.answer || "No answer returned."
-  } catch (err) {
-    throw err
   }
+  if (streamed) return streamed
+  throw new Error("Stream ended before an answer was received.")
+}
+
+// Live-update the last assistant bubble without touching saved history
+function renderProgress(text) {
+  const bubbles = chatEl?.querySelectorAll(".msg.assistant .bubble")
+  if (!bubbles || !bubbles.length) return
+  bubbles[bubbles.length - 1].innerHTML = marked.parse(text)
+  chatEl.scrollTop = chatEl.scrollHeight
 }
 
 function applyTheme(theme) {
@@ -214,7 +305,7 @@ document.addEventListener("DOMContentLoaded", () => {
       setLoading(true)
 
       try {
-        const answer = await sendQuery(query)
+        const answer = await sendQuery(query, renderProgress)
         // Replace last assistant placeholder message with final answer
         const messages = loadChat()
         // Find and replace last assistant (placeholder)
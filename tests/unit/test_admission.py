@@ -0,0 +1,80 @@
+import asyncio
+import pytest
+from src.utils.admission import AdmissionController, AdmissionRejected
+
+
+def test_admits_up_to_max_concurrent():
+    async def main():
+        admission = AdmissionController(max_concurrent=2, max_queue=4, queue_timeout=1, metrics_prefix="test.adm1")
+        running, peak = 0, 0
+
+        async def run():
+            nonlocal running, peak
+            async with admission.admit():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(run() for _ in range(6)))
+        return peak, admission._in_flight, admission._waiting
+
+    assert asyncio.run(main()) == (2, 0, 0)
+
+
+def test_rejects_with_429_when_the_queue_is_full():
+    async def main():
+        admission = AdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1, metrics_prefix="test.adm2")
+        admitted_at = await admission.acquire()
+        queued = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+        admission.release(admitted_at)
+        admission.release(await queued)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.status_code == 429
+    assert 1 <= rejected.retry_after <= 60
+
+
+def test_rejects_with_503_after_the_queue_timeout():
+    async def main():
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=0.01, metrics_prefix="test.adm3")
+        admitted_at = await admission.acquire()
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire()
+        waiting = admission._waiting
+        admission.release(admitted_at)
+        return rejected.value.status_code, waiting
+
+    assert asyncio.run(main()) == (503, 0)
+
+
+def test_slot_is_released_when_the_block_raises():
+    async def main():
+        admission = AdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1, metrics_prefix="test.adm4")
+        with pytest.raises(ValueError):
+            async with admission.admit():
+                raise ValueError("graph failed")
+        async with admission.admit():
+            return admission._in_flight
+
+    assert asyncio.run(main()) == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def main():
+        admission = AdmissionController(max_concurrent=1, max_queue=4, queue_timeout=5, metrics_prefix="test.adm5")
+        admitted_at = await admission.acquire()
+        waiter = asyncio.ensure_future(admission.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        waiting = admission._waiting
+        admission.release(admitted_at)
+        return waiting, admission._semaphore._value
+
+    assert asyncio.run(main()) == (0, 1)
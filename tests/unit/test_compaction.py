@@ -0,0 +1,91 @@
+import json
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from src.agent.compaction import ToolOutputCompactor, _clean_text, _truncate, _url_key
+
+
+def _search_message(payload: dict, name: str = "search_hotels", id: str = "t1") -> ToolMessage:
+    return ToolMessage(content=json.dumps(payload), tool_call_id=id, name=name, id=id)
+
+
+def test_clean_text_strips_chrome_markdown_and_whitespace():
+    text = "Accept all cookies\n[Goa beaches](https://x.test)   are   great\n\n\n![img](a.png)Read more"
+    assert _clean_text(text) == "Goa beaches are great"
+
+
+def test_url_key_ignores_scheme_www_query_and_trailing_slash():
+    assert _url_key("https://www.Example.com/goa/?utm=1#top") == _url_key("http://example.com/goa")
+
+
+def test_truncate_prefers_a_word_boundary():
+    truncated = _truncate("alpha beta gamma delta", 12)
+    assert truncated == "alpha beta…"
+    assert _truncate("short", 12) == "short"
+
+
+def test_search_hits_keep_only_used_fields_and_drop_duplicates():
+    payload = {
+        "category": "hotels",
+        "place": "Goa",
+        "results": {
+            "answer": "Stay near Baga.",
+            "images": ["a.png"],
+            "response_time": 1.2,
+            "results": [
+                {"title": "A", "url": "https://a.test/x", "content": "Hotel A by the beach", "score": 0.9,
+                 "raw_content": "x" * 5000},
+                {"title": "A again", "url": "http://www.a.test/x/", "content": "Other text"},
+                {"title": "B", "url": "https://b.test", "content": "hotel a BY the beach!"},
+                {"title": "C", "url": "https://c.test", "content": "Hotel C in Panjim"},
+            ],
+        },
+    }
+    compactor = ToolOutputCompactor(default_max_tokens=800)
+    compacted = json.loads(compactor.compact(_search_message(payload), set(), set()))
+
+    assert compacted["results"]["answer"] == "Stay near Baga."
+    assert compacted["results"]["results"] == [
+        {"title": "A", "url": "https://a.test/x", "content": "Hotel A by the beach"},
+        {"title": "C", "url": "https://c.test", "content": "Hotel C in Panjim"},
+    ]
+
+
+def test_payload_is_fitted_to_the_category_budget():
+    hits = [{"title": f"H{i}", "url": f"https://h{i}.test", "content": f"hit {i} " + "word " * 200} for i in range(6)]
+    payload = {"category": "hotels", "results": {"results": hits}}
+    compactor = ToolOutputCompactor(default_max_tokens=2000, max_tokens={"hotels": 100})
+    content = compactor.compact(_search_message(payload), set(), set())
+    assert len(content) <= 100 * 4
+    assert json.loads(content)["results"]["results"]
+
+
+def test_plain_text_results_are_truncated_to_the_tool_budget():
+    message = ToolMessage(content="sunny " * 500, tool_call_id="w", name="get_current_weather")
+    compactor = ToolOutputCompactor(default_max_tokens=800, max_tokens={"get_current_weather": 10})
+    assert len(compactor.compact(message, set(), set())) <= 40
+
+
+def test_content_that_cannot_shrink_is_kept_as_is():
+    message = ToolMessage(content="22°C", tool_call_id="w", name="get_current_weather")
+    assert ToolOutputCompactor().compact(message, set(), set()) == "22°C"
+
+
+def test_run_compacts_only_the_latest_turn_and_counts_savings():
+    noisy = {"category": "hotels", "results": {"results": [
+        {"title": "A", "url": "https://a.test", "content": "Hotel A", "raw_content": "x" * 4000, "score": 0.5},
+    ]}}
+    old = _search_message(noisy, id="old")
+    new = _search_message(noisy, id="new")
+    failed = ToolMessage(content="x" * 4000, tool_call_id="f", name="search_hotels", id="f", status="error")
+    state = {
+        "messages": [
+            HumanMessage(content="Goa"), AIMessage(content=""), old,
+            AIMessage(content=""), new, failed,
+        ],
+        "compaction_tokens_saved": 5,
+    }
+
+    update = ToolOutputCompactor().run(state)
+
+    assert [message.id for message in update["messages"]] == ["new"]
+    assert "raw_content" not in update["messages"][0].content
+    assert update["compaction_tokens_saved"] > 5
@@ -0,0 +1,102 @@
+import pytest
+from src.exception import CustomException
+from src.utils import currency_converter as currency_module
+from src.utils.currency_converter import CurrencyConverter
+
+
+RATES = {"USD": 1.0, "EUR": 0.5, "INR": 80.0}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, rates=None):
+        self.status_code = status_code
+        self.text = "error"
+        self._rates = rates
+
+    def json(self):
+        return {"conversion_rates": self._rates}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Counts rate fetches; set `state["response"]` to change what the API returns."""
+    state = {"calls": 0, "response": FakeResponse(rates=RATES), "now": 1000.0}
+
+    def request(method, url, **kwargs):
+        state["calls"] += 1
+        response = state["response"]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(currency_module.http_client, "request", request)
+    monkeypatch.setattr(currency_module.time, "monotonic", lambda: state["now"])
+    return state
+
+
+def test_cross_rate_goes_through_the_base_currency():
+    assert CurrencyConverter.cross_rate(RATES, "eur", "INR") == 160.0
+    assert CurrencyConverter.cross_rate(RATES, "INR", "INR") == 1.0
+
+
+def test_cross_rate_rejects_unknown_codes():
+    with pytest.raises(CustomException):
+        CurrencyConverter.cross_rate(RATES, "EUR", "XYZ")
+
+
+def test_one_fetch_serves_every_pair_within_the_ttl(upstream):
+    converter = CurrencyConverter("key", ttl_seconds=60)
+    assert converter.convert(10, "EUR", "INR") == 1600.0
+    assert converter.convert(2, "USD", "EUR") == 1.0
+    assert upstream["calls"] == 1
+
+    upstream["now"] += 61
+    converter.convert(1, "USD", "INR")
+    assert upstream["calls"] == 2
+
+
+def test_failed_refresh_serves_the_previous_table_and_backs_off(upstream):
+    converter = CurrencyConverter("key", ttl_seconds=60, retry_seconds=30)
+    converter.get_rates()
+    upstream["now"] += 61
+    upstream["response"] = FakeResponse(status_code=500)
+
+    assert converter.get_rates() == RATES
+    assert converter.get_rates() == RATES
+    assert upstream["calls"] == 2  # no retry inside the backoff window
+
+    upstream["now"] += 31
+    upstream["response"] = FakeResponse(rates={"USD": 1.0, "EUR": 0.25})
+    assert converter.get_rates() == {"USD": 1.0, "EUR": 0.25}
+    assert upstream["calls"] == 3
+
+
+def test_first_fetch_failure_raises(upstream):
+    upstream["response"] = ConnectionError("down")
+    converter = CurrencyConverter("key")
+    with pytest.raises(ConnectionError):
+        converter.get_rates()
+    with pytest.raises(CustomException):
+        converter.convert(1, "USD", "EUR")
+
+
+def test_convert_with_rates_matches_pairwise_conversion():
+    amounts, sources, targets = [10, 3, 160], ["EUR", "usd", "INR"], ["INR", "EUR", "EUR"]
+    converted = CurrencyConverter.convert_with_rates(RATES, amounts, sources, targets)
+    expected = [amount * CurrencyConverter.cross_rate(RATES, source, target)
+                for amount, source, target in zip(amounts, sources, targets)]
+    assert converted == pytest.approx(expected)
+    assert all(isinstance(value, float) for value in converted)
+
+
+def test_convert_with_rates_returns_none_for_unknown_codes():
+    converted = CurrencyConverter.convert_with_rates(RATES, [1, 2, 3], ["USD", "XYZ", "EUR"], ["INR", "USD", "ABC"])
+    assert converted == [80.0, None, None]
+    assert CurrencyConverter.convert_with_rates(RATES, [], [], []) == []
+
+
+def test_convert_many_uses_one_rates_lookup(upstream):
+    converter = CurrencyConverter("key")
+    assert converter.convert_many([1, 2], ["USD", "EUR"], ["INR", "USD"]) == [80.0, 4.0]
+    assert converter.convert_many([5], ["INR"], ["INR"]) == [5.0]
+    assert upstream["calls"] == 1
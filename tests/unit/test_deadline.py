@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from src.utils import deadline as deadline_module
+from src.utils.deadline import DeadlineExceeded, bound_timeout, deadline_scope, remaining
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(deadline_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_no_deadline_by_default():
+    assert remaining() is None
+    assert bound_timeout(30) == 30
+
+
+def test_scope_sets_and_restores_the_deadline(clock):
+    with deadline_scope(10):
+        assert remaining() == 10
+        clock[0] += 4
+        assert remaining() == 6
+    assert remaining() is None
+
+
+def test_none_keeps_the_enclosing_deadline(clock):
+    with deadline_scope(None):
+        assert remaining() is None
+    with deadline_scope(10), deadline_scope(None):
+        assert remaining() == 10
+
+
+def test_nested_scope_only_shortens(clock):
+    with deadline_scope(10):
+        with deadline_scope(60):
+            assert remaining() == 10
+        with deadline_scope(3):
+            assert remaining() == 3
+        assert remaining() == 10
+
+
+def test_bound_timeout_clamps_and_raises_after_the_deadline(clock):
+    with deadline_scope(5):
+        assert bound_timeout(30) == 5
+        assert bound_timeout(2) == 2
+        clock[0] += 5
+        with pytest.raises(DeadlineExceeded):
+            bound_timeout(30)
+
+
+def test_tasks_inherit_the_deadline(clock):
+    async def child():
+        return remaining()
+
+    async def main():
+        with deadline_scope(8):
+            return await asyncio.create_task(child())
+
+    assert asyncio.run(main()) == 8
@@ -0,0 +1,101 @@
+import asyncio
+import sqlite3
+from src.utils import job_store as job_store_module
+from src.utils.job_store import JobStore, JobWorkerPool
+
+
+def test_job_lifecycle(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("trip to Goa", thread_id="t1")
+    job = store.get(job_id)
+    assert (job["query"], job["thread_id"], job["status"]) == ("trip to Goa", "t1", "queued")
+    store.update(job_id, "succeeded", answer="plan")
+    job = store.get(job_id)
+    assert (job["status"], job["answer"], job["error"]) == ("succeeded", "plan", None)
+    assert store.get("missing") is None
+    store.close()
+
+
+def test_pending_lists_unfinished_jobs_oldest_first(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    first, second, done = (store.create(query) for query in ("a", "b", "c"))
+    store.update(second, "running")
+    store.update(done, "failed", error="boom")
+    assert store.pending() == [first, second]
+    store.close()
+
+
+def test_prune_applies_age_and_count_limits_to_finished_jobs(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(job_store_module.time, "time", lambda: now[0])
+    store = JobStore(str(tmp_path / "jobs.sqlite3"), max_age_seconds=100, max_jobs=2)
+    old = store.create("old")
+    store.update(old, "succeeded", answer="x")
+    queued = store.create("still queued")
+    now[0] += 200
+    recent = [store.create(f"q{i}") for i in range(3)]
+    for i, job_id in enumerate(recent):
+        now[0] += 1
+        store.update(job_id, "succeeded", answer=str(i))
+
+    assert store.prune() == 2  # `old` by age, then the oldest recent one by count
+    assert store.get(old) is None and store.get(recent[0]) is None
+    assert store.get(recent[1]) and store.get(recent[2])
+    assert store.get(queued)["status"] == "queued"
+    store.close()
+
+
+def test_store_without_thread_id_column_is_migrated(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE jobs (id TEXT PRIMARY KEY, query TEXT NOT NULL, status TEXT NOT NULL, "
+        "answer TEXT, error TEXT, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+    )
+    conn.close()
+    store = JobStore(path)
+    assert store.get(store.create("q", thread_id="t"))["thread_id"] == "t"
+    store.close()
+
+
+def test_worker_pool_runs_jobs_and_records_failures(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def handler(query, thread_id):
+        if query == "bad":
+            raise ValueError("no plan")
+        return f"{query}/{thread_id}"
+
+    async def main():
+        pool = JobWorkerPool(store, handler, workers=2)
+        pool.start()
+        good, bad = store.create("good", thread_id="t1"), store.create("bad")
+        pool.submit(good)
+        pool.submit(bad)
+        await pool._queue.join()
+        await pool.stop()
+        return store.get(good), store.get(bad)
+
+    good, bad = asyncio.run(main())
+    assert (good["status"], good["answer"]) == ("succeeded", "good/t1")
+    assert (bad["status"], bad["error"]) == ("failed", "no plan")
+    store.close()
+
+
+def test_worker_pool_requeues_unfinished_jobs_on_start(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    interrupted = store.create("interrupted")
+    store.update(interrupted, "running")
+
+    async def handler(query, thread_id):
+        return "resumed"
+
+    async def main():
+        pool = JobWorkerPool(store, handler, workers=1)
+        pool.start()
+        await pool._queue.join()
+        await pool.stop()
+
+    asyncio.run(main())
+    assert store.get(interrupted)["answer"] == "resumed"
+    store.close()
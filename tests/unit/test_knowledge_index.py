@@ -0,0 +1,120 @@
+import math
+import pytest
+from src.utils import knowledge_index as knowledge_index_module
+from src.utils.knowledge_index import KnowledgeIndex, tokenize
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(knowledge_index_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def index(tmp_path, clock):
+    index = KnowledgeIndex(str(tmp_path / "knowledge.sqlite3"))
+    yield index
+    index.close()
+
+
+def _hits(*contents):
+    return {"results": [{"title": "", "url": f"https://x.test/{i}", "content": content}
+                        for i, content in enumerate(contents)]}
+
+
+def _bm25(query, documents, k1=1.5, b=0.75):
+    """Reference BM25 over tokenized documents, one score per document."""
+    tokenized = [tokenize(document) for document in documents]
+    avgdl = sum(map(len, tokenized)) / len(tokenized)
+    scores = []
+    for tokens in tokenized:
+        score = 0.0
+        for term in set(tokenize(query)):
+            df = sum(term in other for other in tokenized)
+            tf = tokens.count(term)
+            if tf:
+                idf = math.log(1 + (len(tokenized) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(tokens) / avgdl))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_drops_stopwords_and_single_characters():
+    assert tokenize("The best beaches near Panjim, a 5-star stay!") == ["beaches", "panjim", "star", "stay"]
+
+
+def test_search_scores_match_bm25(index):
+    documents = [
+        "Baga beach is a lively beach with shacks",
+        "Fort Aguada overlooks the sea",
+        "Calangute beach and Baga beach are crowded in December",
+        "Spice plantations near Ponda",
+    ]
+    assert index.add("Goa", "attractions", _hits(*documents)) == 4
+
+    results = index.search("baga beach", top_k=10)
+
+    scores = _bm25("baga beach", documents)
+    expected = sorted((score, document) for score, document in zip(scores, documents) if score)[::-1]
+    assert [result["content"] for result in results] == [document for _, document in expected]
+    assert [result["score"] for result in results] == pytest.approx([score for score, _ in expected], abs=1e-4)
+
+
+def test_search_filters_by_place_and_category_and_limits(index):
+    index.add("Goa", "attractions", _hits("beach forts", "beach shacks"))
+    index.add("Goa", "hotels", _hits("beach resort"))
+    index.add("Pune", "attractions", "beach? no, hill forts")
+
+    assert {result["category"] for result in index.search("beach", place="goa")} == {"attractions", "hotels"}
+    assert sorted(result["place"] for result in index.search("forts", category="attractions")) == ["goa", "pune"]
+    assert len(index.search("beach", place="Goa", category="attractions", top_k=1)) == 1
+    assert index.search("the of", place="Goa") == []
+    assert index.search("volcano") == []
+
+
+def test_add_skips_known_documents_and_moves_fetched_at_forward(index, clock):
+    result = {"answer": "Goa has beaches.", **_hits("Baga beach")}
+    assert index.add("Goa", "attractions", result, fetched_at=clock.now - 500) == 2
+    assert index.age("goa", "attractions") == 500
+
+    assert index.add("Goa", "attractions", result, fetched_at=clock.now - 900) == 0
+    assert index.age("Goa", "attractions") == 500
+    assert index.add("Goa", "attractions", result) == 0
+    assert index.age("Goa", "attractions") == 0
+    assert index.stats()["documents"] == 2
+    assert index.age("Goa", "hotels") is None
+
+
+def test_empty_results_are_not_indexed(index):
+    assert index.add("Goa", "attractions", None) == 0
+    assert index.add("Goa", "attractions", "   ") == 0
+    assert index.add("", "attractions", "Baga beach") == 0
+    assert index.search("beach") == []
+
+
+def test_compact_drops_superseded_and_expired_documents(index, clock):
+    index.add("Goa", "attractions", {"results": [{"url": "https://a.test", "content": "old beach guide"}]},
+              fetched_at=clock.now - 100)
+    index.add("Goa", "attractions", {"results": [{"url": "https://a.test", "content": "new beach guide"}]})
+    index.add("Goa", "hotels", "ancient resort", fetched_at=clock.now - 10_000)
+
+    assert index.compact(max_age_seconds=1000) == {"superseded": 1, "expired": 1, "documents": 1}
+    assert [result["content"] for result in index.search("beach guide resort")] == ["new beach guide"]
+
+
+def test_rebuild_recreates_postings(index):
+    index.add("Goa", "attractions", _hits("Baga beach", "Aguada fort"))
+    before = index.search("beach fort")
+    index.execute("DELETE FROM postings")
+    assert index.search("beach fort") == []
+    assert index.rebuild() == 2
+    assert index.search("beach fort") == before
@@ -0,0 +1,91 @@
+import pytest
+from src.exception import CustomException
+from src.utils import response_cache as response_cache_module
+from src.utils.response_cache import ResponseCache
+from src.utils.sqlite_store import SQLiteStore
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(response_cache_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / "responses.sqlite3"), ttl_seconds=100, max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_sqlite_store_runs_statements_and_batches(tmp_path):
+    store = SQLiteStore(str(tmp_path / "nested" / "store.sqlite3"), "CREATE TABLE IF NOT EXISTS t (v INTEGER);")
+    store.execute_many("INSERT INTO t (v) VALUES (?)", [(1,), (2,), (3,)])
+    assert [row["v"] for row in store.execute("SELECT v FROM t ORDER BY v")] == [1, 2, 3]
+    assert store.execute_count("DELETE FROM t WHERE v > ?", (1,)) == 2
+    store.close()
+
+
+def test_sqlite_store_rolls_back_a_failed_batch(tmp_path):
+    store = SQLiteStore(str(tmp_path / "store.sqlite3"), "CREATE TABLE IF NOT EXISTS t (v INTEGER UNIQUE);")
+    with pytest.raises(Exception):
+        store.execute_many("INSERT INTO t (v) VALUES (?)", [(1,), (1,)])
+    assert store.execute("SELECT COUNT(*) AS n FROM t")[0]["n"] == 0
+    store.close()
+
+
+def test_sqlite_store_wraps_open_errors(tmp_path):
+    with pytest.raises(CustomException):
+        SQLiteStore(str(tmp_path / "store.sqlite3"), "NOT SQL")
+
+
+def test_make_key_depends_on_normalized_query_model_and_prompt():
+    key = ResponseCache.make_key("3 day trip to Goa", "model-a", "prompt")
+    assert ResponseCache.make_key("  3 DAY trip to goa! ", "model-a", "prompt") == key
+    assert ResponseCache.make_key("3 day trip to Goa", "model-b", "prompt") != key
+    assert ResponseCache.make_key("3 day trip to Goa", "model-a", "other prompt") != key
+
+
+def test_get_returns_answer_and_age(cache, clock):
+    cache.set("k", "query", "answer")
+    clock.now += 30
+    assert cache.get("k") == ("answer", 30)
+    assert cache.get("missing") is None
+
+
+def test_expired_entries_miss_and_are_deleted(cache, clock):
+    cache.set("k", "query", "answer")
+    clock.now += 101
+    assert cache.get("k") is None
+    assert cache.execute("SELECT COUNT(*) AS n FROM responses")[0]["n"] == 0
+
+
+def test_least_recently_used_entry_is_evicted(cache, clock):
+    cache.set("a", "qa", "A")
+    clock.now += 1
+    cache.set("b", "qb", "B")
+    clock.now += 1
+    cache.get("a")  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("c", "qc", "C")
+    assert cache.get("b") is None
+    assert cache.get("a")[0] == "A"
+    assert cache.get("c")[0] == "C"
+
+
+def test_invalidate_one_or_all(cache):
+    cache.set("a", "qa", "A")
+    cache.set("b", "qb", "B")
+    assert cache.invalidate("a") == 1
+    assert cache.get("a") is None
+    assert cache.invalidate() == 1
+    assert cache.get("b") is None
@@ -0,0 +1,105 @@
+import json
+import pytest
+from src.utils import search_cache as search_cache_module
+from src.utils.search_cache import SearchCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(search_cache_module.time, "time", clock)
+    return clock
+
+
+def _result(label: str, size: int = 100) -> dict:
+    return {"place": label, "results": "x" * size}
+
+
+def _size(result: dict) -> int:
+    return len(json.dumps(result, ensure_ascii=False).encode("utf-8"))
+
+
+@pytest.fixture
+def make_cache(tmp_path, clock):
+    caches = []
+
+    def make(**kwargs):
+        cache = SearchCache(str(tmp_path / "searches.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_results_are_keyed_on_normalized_place_and_category(make_cache):
+    cache = make_cache()
+    cache.set("Goa", "hotels", _result("goa"))
+    assert cache.get("  goa! ", "hotels") == _result("goa")
+    assert cache.get("Goa", "restaurants") is None
+    cache.set("Goa", "activities", [])
+    assert cache.get("Goa", "activities") is None
+
+
+def test_each_category_has_its_own_ttl(make_cache, clock):
+    cache = make_cache(ttl_seconds={"hotels": 60}, default_ttl_seconds=600)
+    cache.set("Goa", "hotels", _result("hotels"))
+    cache.set("Goa", "attractions", _result("attractions"))
+    clock.now += 61
+    assert cache.get("Goa", "hotels") is None
+    assert cache.get("Goa", "attractions") == _result("attractions")
+    assert cache.created_at("Goa", "hotels") is None
+    assert cache.created_at("Goa", "attractions") == clock.now - 61
+
+
+def test_writes_evict_least_recently_used_only_over_budget(make_cache, clock):
+    size = _size(_result("a"))
+    cache = make_cache(max_bytes=3 * size)
+    for place in ("a", "b", "c"):
+        cache.set(place, "hotels", _result(place))
+        clock.now += 1
+    assert cache.stats()["hotels"]["entries"] == 3
+
+    cache.get("a", "hotels")  # "b" is now the least recently used
+    clock.now += 1
+    cache.set("d", "hotels", _result("d"))
+
+    assert cache.get("b", "hotels") is None
+    assert all(cache.get(place, "hotels") for place in ("a", "c", "d"))
+    assert cache._bytes == 3 * size
+
+
+def test_replacing_an_entry_updates_the_byte_count(make_cache):
+    cache = make_cache()
+    cache.set("Goa", "hotels", _result("goa", size=100))
+    cache.set("Goa", "hotels", _result("goa", size=10))
+    assert cache._bytes == _size(_result("goa", size=10)) == cache.stats()["hotels"]["bytes"]
+
+
+def test_evict_drops_expired_entries_of_every_category(make_cache, clock):
+    cache = make_cache(ttl_seconds={"hotels": 60}, default_ttl_seconds=600)
+    cache.set("Goa", "hotels", _result("hotels"))
+    cache.set("Goa", "attractions", _result("attractions"))
+    cache.set("Goa", "cafes", _result("cafes"))
+    clock.now += 601
+    cache.set("Pune", "cafes", _result("fresh"))
+
+    assert cache.evict(clock.now) == 3
+    assert list(cache.stats()) == ["cafes"]
+    assert cache._bytes == _size(_result("fresh"))
+
+
+def test_byte_count_survives_a_restart(make_cache):
+    cache = make_cache()
+    cache.set("Goa", "hotels", _result("goa"))
+    cache.close()
+    assert make_cache()._bytes == _size(_result("goa"))
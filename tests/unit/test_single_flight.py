@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from src.utils.single_flight import SingleFlight, normalize_query
+
+
+def test_normalize_query_ignores_case_spacing_and_trailing_punctuation():
+    assert normalize_query("  3 Day trip to  Goa!? ") == "3 day trip to goa"
+    assert normalize_query("") == ""
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test.singleflight")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "plan"
+
+    async def main():
+        return await asyncio.gather(*(flight.run("goa", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["plan"] * 5
+    assert len(calls) == 1
+    assert flight._inflight == {}
+
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight("test.singleflight")
+
+    async def main():
+        async def work(value):
+            await asyncio.sleep(0.01)
+            return value
+        return await asyncio.gather(flight.run("a", lambda: work(1)), flight.run("b", lambda: work(2)))
+
+    assert asyncio.run(main()) == [1, 2]
+
+
+def test_exception_reaches_every_waiter_and_key_is_released():
+    flight = SingleFlight("test.singleflight")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def main():
+        results = await asyncio.gather(*(flight.run("k", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        # The next call starts a fresh execution
+        return await flight.run("k", lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_shared_execution_survives_until_the_last_waiter_leaves():
+    flight = SingleFlight("test.singleflight")
+    finished = []
+
+    async def work():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.run("k", work))
+        second = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+    assert finished == [True]
+
+
+def test_execution_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight("test.singleflight")
+
+    async def main():
+        cancelled = []
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        waiter = asyncio.ensure_future(flight.run("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        return cancelled
+
+    assert asyncio.run(main()) == [True]
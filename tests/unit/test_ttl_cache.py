@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import time
+import pytest
+from src.utils import ttl_cache as ttl_cache_module
+from src.utils.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ttl_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def _wait_for(condition, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end, "condition not met in time"
+        time.sleep(0.005)
+
+
+def test_fresh_entries_are_hits(clock):
+    cache = TTLCache("test.ttl.fresh", ttl_seconds=60)
+    calls = []
+    assert cache.get("goa", lambda: calls.append(1) or "sunny") == "sunny"
+    clock[0] += 59
+    assert cache.get("goa", lambda: calls.append(1) or "rain") == "sunny"
+    assert calls == [1]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+
+
+def test_stale_entry_is_served_while_one_background_refresh_runs(clock):
+    cache = TTLCache("test.ttl.stale", ttl_seconds=60, stale_seconds=30)
+    cache.set("goa", "old")
+    clock[0] += 70
+    release = threading.Event()
+    calls = []
+
+    def slow_loader():
+        calls.append(1)
+        release.wait(2)
+        return "new"
+
+    assert cache.get("goa", slow_loader) == "old"
+    assert cache.get("goa", slow_loader) == "old"
+    release.set()
+    _wait_for(lambda: cache.stats()["refreshes"] == 1)
+    assert calls == [1]
+    assert cache.peek("goa") == "new"
+    cache.close()
+
+
+def test_expired_entry_reloads_and_falls_back_on_failure(clock):
+    cache = TTLCache("test.ttl.expired", ttl_seconds=60, stale_seconds=30)
+    cache.set("goa", "old")
+    clock[0] += 100
+
+    def fail():
+        raise ConnectionError("down")
+
+    assert cache.get("goa", fail) == "old"
+    assert cache.stats()["stale_served"] == 1
+    assert cache.get("goa", lambda: "new") == "new"
+    with pytest.raises(ConnectionError):
+        cache.get("pune", fail)
+
+
+def test_empty_results_are_not_cached(clock):
+    cache = TTLCache("test.ttl.empty", ttl_seconds=60)
+    assert cache.get("goa", lambda: None) is None
+    assert cache.get("goa", lambda: {}) == {}
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entries_are_evicted(clock):
+    cache = TTLCache("test.ttl.lru", ttl_seconds=60, max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.peek("a")
+    cache.set("c", 3)
+    assert (cache.peek("a"), cache.peek("b"), cache.peek("c")) == (1, None, 3)
+
+
+def test_aligned_entries_expire_on_the_ttl_boundary(clock):
+    clock[0] = 3600 * 100 + 3500
+    cache = TTLCache("test.ttl.align", ttl_seconds=3600, align=True)
+    cache.set("goa", "hourly")
+    clock[0] += 99
+    assert cache.peek("goa") == "hourly"
+    clock[0] += 1
+    assert cache.peek("goa") is None
+
+
+def test_concurrent_misses_share_one_load_and_release_key_locks():
+    cache = TTLCache("test.ttl.keylock", ttl_seconds=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    threads = [threading.Thread(target=cache.get, args=("goa", loader)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert cache._key_locks == {}
+
+
+def test_async_misses_share_one_load_and_stale_hits_refresh(clock):
+    cache = TTLCache("test.ttl.async", ttl_seconds=60, stale_seconds=30)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return f"v{len(calls)}"
+
+    async def main():
+        first = await asyncio.gather(*(cache.aget("goa", loader) for _ in range(4)))
+        clock[0] += 70
+        stale = await cache.aget("goa", loader)
+        await asyncio.sleep(0.05)
+        return first, stale
+
+    first, stale = asyncio.run(main())
+    assert first == ["v1"] * 4
+    assert stale == "v1"
+    assert cache.peek("goa") == "v2"
+
+
+def test_close_stops_the_refresh_pool_and_a_later_refresh_restarts_it(clock):
+    cache = TTLCache("test.ttl.close", ttl_seconds=60, stale_seconds=30)
+    cache.set("goa", "old")
+    clock[0] += 70
+    cache.get("goa", lambda: "new")
+    _wait_for(lambda: cache.peek("goa") == "new")
+    cache.close()
+    assert cache._executor is None
+
+    clock[0] += 70
+    cache.get("goa", lambda: "newer")
+    _wait_for(lambda: cache.peek("goa") == "newer")
+    cache.close()
@@ -0,0 +1,64 @@
+from datetime import date
+from src.utils.weather_info import daily_forecast
+
+
+# 2026-01-01 00:00 UTC
+DAY = 1767225600
+IST = 19800
+
+
+def _slot(dt, temp_min, temp_max, description="clear sky", pop=0.0, rain=None, snow=None):
+    slot = {
+        "dt": dt,
+        "main": {"temp_min": temp_min, "temp_max": temp_max},
+        "weather": [{"description": description}],
+        "pop": pop,
+    }
+    if rain is not None:
+        slot["rain"] = {"3h": rain}
+    if snow is not None:
+        slot["snow"] = {"3h": snow}
+    return slot
+
+
+def test_empty_forecast_has_no_days():
+    assert daily_forecast({}) == []
+    assert daily_forecast(None) == []
+    assert daily_forecast({"list": []}) == []
+
+
+def test_slots_are_aggregated_per_utc_day():
+    forecast = {"list": [
+        _slot(DAY, 20.0, 24.0, "light rain", pop=0.4, rain=1.25),
+        _slot(DAY + 3 * 3600, 22.0, 29.04, "light rain", pop=0.9, rain=0.5, snow=0.25),
+        _slot(DAY + 6 * 3600, 21.5, 27.0, "clear sky"),
+        _slot(DAY + 86400, 18.0, 25.0, "clear sky", pop=0.1),
+    ]}
+
+    first, second = daily_forecast(forecast)
+
+    assert first == {
+        "date": date(2026, 1, 1), "min_c": 20.0, "max_c": 29.0, "precip_mm": 2.0,
+        "pop": 0.9, "conditions": "light rain", "slots": 3,
+    }
+    assert second["date"] == date(2026, 1, 2)
+    assert (second["min_c"], second["max_c"], second["precip_mm"], second["slots"]) == (18.0, 25.0, 0.0, 1)
+
+
+def test_days_follow_the_city_timezone():
+    # 18:00 UTC is 23:30 in IST, 21:00 UTC is already the next local day
+    forecast = {"city": {"timezone": IST}, "list": [
+        _slot(DAY + 18 * 3600, 20.0, 21.0),
+        _slot(DAY + 21 * 3600, 19.0, 20.0),
+    ]}
+    days = daily_forecast(forecast)
+    assert [(day["date"], day["slots"]) for day in days] == [(date(2026, 1, 1), 1), (date(2026, 1, 2), 1)]
+
+
+def test_missing_fields_do_not_break_aggregation():
+    forecast = {"list": [
+        {"dt": DAY, "main": {"temp_min": 10.0}},
+        {"dt": DAY + 3 * 3600, "main": {"temp_max": 15.0}, "rain": None},
+    ]}
+    (day,) = daily_forecast(forecast)
+    assert (day["min_c"], day["max_c"], day["precip_mm"], day["pop"], day["conditions"]) == (10.0, 15.0, 0.0, 0.0, "N/A")